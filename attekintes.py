@@ -0,0 +1,298 @@
+"""
+Áttekintő (kontakt) lapok a már kiszámolt eredményekből, kézi ellenőrzéshez.
+
+A `debug_kep_mentese` laponként egy teljes felbontású képet ír, és a rajzoláshoz újra
+megkeresi a kereteket és a Neptun mezőt. Itt a kiértékelés közben megmaradt adatokból
+(`kerdes_keretek`, `debug_checkboxok`, normalizált szürke lap) kérdésenként kicsinyített,
+szürkeárnyalatos kivágás készül; ez kicsi, így a munkásfolyamatból olcsón visszaküldhető.
+A jelölőnégyzetek kerete (zöld: bejelölt, piros: üres) csak a csempézéskor kerül rá.
+
+Két elrendezés van:
+  - "lapok": laponként egy sor (címke + a kérdések kivágásai), oldalanként `sorok` lap,
+  - "kerdesek": kérdésenként külön csík, benne az összes lap ugyanazon kérdése rácsba
+    rendezve - így egy kérdést a teljes kötegen egyszerre lehet átnézni.
+A megjelölendő (hibás, üres, többszörös vagy bizonytalan) válaszok felirata piros.
+
+Az `EllenorzesiSor` csak a megjelölt kérdések kivágásait menti (kis PNG fájlok egy mappába,
+mellé egy soronkénti JSON index), hogy a felület teljes lapok betöltése nélkül lapozhasson bennük.
+"""
+import json
+import os
+import unicodedata
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import cv2
+import numpy as np
+
+
+# A kivágások kicsinyítése a kanonikus (150 DPI) laphoz képest
+KIVAGAS_SKALA = 0.4
+# A kivágás széle a keret körül (kanonikus pixelben)
+KIVAGAS_MARGO = 6
+
+FELIRAT_MAGASSAG = 16
+FELIRAT_BETU = cv2.FONT_HERSHEY_SIMPLEX
+FELIRAT_MERET = 0.4
+CIMKE_SZELESSEG = 180
+RES = 4
+JPEG_MINOSEG = 80
+
+BEJELOLT_SZIN = (0, 170, 0)
+URES_SZIN = (0, 0, 220)
+FELIRAT_SZIN = (40, 40, 40)
+JELZETT_SZIN = (0, 0, 220)
+
+ELRENDEZESEK = ("lapok", "kerdesek")
+
+# Kivágás: {"tipus": "IH"/"FV", "sorszam", "keret": (x, y, w, h) a kanonikus lapon,
+#           "kep": kicsinyített szürke kivágás, "negyzetek": [(x, y, w, h, bejelolve)] a kivágásban}
+Kivagas = Dict
+
+
+def kerdes_kivagasok(szurke: np.ndarray, kerdes_keretek: Sequence[Tuple[str, int, Tuple[int, int, int, int]]],
+                     negyzetek: Sequence[Tuple], skala: float = KIVAGAS_SKALA,
+                     csak: Optional[Set[Tuple[str, int]]] = None) -> List[Kivagas]:
+    """
+    Kérdésenkénti kicsinyített kivágások a normalizált lapból. A `negyzetek` a kiértékelő
+    `debug_checkboxok` listája; egy négyzet ahhoz a kérdéshez tartozik, amelynek keretébe a
+    középpontja esik. `csak` megadásakor csak ezeknek a (típus, sorszám) kérdéseknek.
+    """
+    magassag, szelesseg = szurke.shape[:2]
+    kivagasok = []
+    for tipus, sorszam, (x, y, w, h) in kerdes_keretek:
+        if csak is not None and (tipus, sorszam) not in csak:
+            continue
+        x0, y0 = max(0, x - KIVAGAS_MARGO), max(0, y - KIVAGAS_MARGO)
+        x1, y1 = min(szelesseg, x + w + KIVAGAS_MARGO), min(magassag, y + h + KIVAGAS_MARGO)
+        if x1 <= x0 or y1 <= y0:
+            continue
+        meret = (max(1, round((x1 - x0) * skala)), max(1, round((y1 - y0) * skala)))
+        kep = cv2.resize(szurke[y0:y1, x0:x1], meret, interpolation=cv2.INTER_AREA)
+
+        sajat = []
+        for nx, ny, nw, nh, bejelolve, *_ in negyzetek:
+            kx, ky = nx + nw / 2, ny + nh / 2
+            if x <= kx < x + w and y <= ky < y + h:
+                sajat.append((round((nx - x0) * skala), round((ny - y0) * skala),
+                              max(1, round(nw * skala)), max(1, round(nh * skala)), bool(bejelolve)))
+        kivagasok.append({"tipus": tipus, "sorszam": sorszam, "keret": (x, y, w, h), "kep": kep, "negyzetek": sajat})
+    return kivagasok
+
+
+def kivagas_rajzolasa(kivagas: Kivagas) -> np.ndarray:
+    """A kivágás színes képe a jelölőnégyzetek keretével."""
+    kep = cv2.cvtColor(kivagas["kep"], cv2.COLOR_GRAY2BGR)
+    for x, y, w, h, bejelolve in kivagas["negyzetek"]:
+        cv2.rectangle(kep, (x, y), (x + w, y + h), BEJELOLT_SZIN if bejelolve else URES_SZIN, 1)
+    return kep
+
+
+def valasz_szovege(tipus: str, valasz) -> str:
+    if tipus == "IH":
+        return str(valasz)
+    if valasz == -1:
+        return "Nincs válasz"
+    if valasz == -2:
+        return "Többszörös"
+    return chr(65 + valasz) if isinstance(valasz, int) and 0 <= valasz < 26 else str(valasz)
+
+
+def jelzes_oka(tipus: str, valasz, bizonyossag: Optional[float], bizonytalan_sav: float) -> Optional[str]:
+    """Miért kell a választ kézzel ellenőrizni (None, ha nem kell)."""
+    if tipus == "IH" and valasz != "Igaz" and valasz != "Hamis":
+        return valasz
+    if tipus == "FV" and valasz == -1:
+        return "Nincs válasz"
+    if tipus == "FV" and valasz == -2:
+        return "Többszörös"
+    if bizonyossag is not None and bizonyossag < bizonytalan_sav:
+        return "Bizonytalan"
+    return None
+
+
+def kerdes_valasza(eredmeny: Dict, tipus: str, sorszam: int) -> Tuple[object, Optional[float]]:
+    """(válasz, bizonyosság) egy kérdésre az eredményből."""
+    mezo = "igaz_hamis" if tipus == "IH" else "feleletvalasztos"
+    return (eredmeny.get(mezo, {}).get(sorszam),
+            (eredmeny.get("bizonyossag") or {}).get(mezo, {}).get(sorszam))
+
+
+def jelzett_kerdesek(eredmeny: Dict, kerdes_keretek: Sequence[Tuple[str, int, Tuple]],
+                     bizonytalan_sav: float) -> Set[Tuple[str, int]]:
+    """A kézi ellenőrzést igénylő kérdések (típus, sorszám) halmaza."""
+    return {(tipus, sorszam) for tipus, sorszam, _ in kerdes_keretek
+            if jelzes_oka(tipus, *kerdes_valasza(eredmeny, tipus, sorszam), bizonytalan_sav)}
+
+
+def _ascii(szoveg: str) -> str:
+    """Az OpenCV betűkészlete csak ASCII: az ékezeteket elhagyjuk."""
+    return unicodedata.normalize("NFKD", szoveg).encode("ascii", "ignore").decode("ascii")
+
+
+def _feliratos(kep: np.ndarray, szoveg: str, szin: Tuple[int, int, int]) -> np.ndarray:
+    """A kép fölé egy fehér feliratsáv."""
+    cella = np.full((kep.shape[0] + FELIRAT_MAGASSAG, kep.shape[1], 3), 255, dtype=np.uint8)
+    cella[FELIRAT_MAGASSAG:] = kep
+    cv2.putText(cella, _ascii(szoveg), (2, FELIRAT_MAGASSAG - 4), FELIRAT_BETU, FELIRAT_MERET, szin, 1, cv2.LINE_AA)
+    return cella
+
+
+def _racs(sorok: List[List[np.ndarray]]) -> np.ndarray:
+    """Cellák rácsba rendezése: oszloponként a legszélesebb, soronként a legmagasabb cella mérete."""
+    oszlopszam = max(len(sor) for sor in sorok)
+    szelessegek = [max((sor[j].shape[1] for sor in sorok if j < len(sor)), default=0) for j in range(oszlopszam)]
+    magassagok = [max(c.shape[0] for c in sor) for sor in sorok]
+    kep = np.full((sum(magassagok) + RES * (len(sorok) + 1), sum(szelessegek) + RES * (oszlopszam + 1), 3),
+                  200, dtype=np.uint8)
+    y = RES
+    for sor, magassag in zip(sorok, magassagok):
+        x = RES
+        for cella, szelesseg in zip(sor, szelessegek):
+            kep[y:y + cella.shape[0], x:x + cella.shape[1]] = cella
+            x += szelesseg + RES
+        y += magassag + RES
+    return kep
+
+
+class Kontaktlap:
+    """
+    Áttekintő oldalak fokozatos építése: a lapokat a kiértékelés sorrendjében kapja, és
+    minden betelt oldalt azonnal kiír (JPEG), így a memóriában csak a félkész oldalak vannak.
+    """
+
+    def __init__(self, mappa: str, elrendezes: str = "lapok", oszlopok: int = 6, sorok: int = 12,
+                 bizonytalan_sav: float = 0.10):
+        """
+        `elrendezes="lapok"` esetén oldalanként `sorok` lap; "kerdesek" esetén kérdésenként
+        `oszlopok` x `sorok` lapos oldalak.
+        """
+        if elrendezes not in ELRENDEZESEK:
+            raise ValueError(f"Ismeretlen elrendezés: {elrendezes}")
+        self.mappa = mappa
+        self.elrendezes = elrendezes
+        self.oszlopok = oszlopok
+        self.sorok = sorok
+        self.bizonytalan_sav = bizonytalan_sav
+        self.fajlok: List[str] = []
+        self._lap_sorok: List[List[np.ndarray]] = []
+        # (típus, sorszám) -> a kérdés még ki nem írt cellái és a kiírt oldalak száma
+        self._kerdes_cellak: Dict[Tuple[str, int], List[np.ndarray]] = {}
+        self._oldalszamok: Dict[object, int] = {}
+        os.makedirs(mappa, exist_ok=True)
+
+    def _cella(self, eredmeny: Dict, kivagas: Kivagas, elotag: str) -> np.ndarray:
+        valasz, bizonyossag = kerdes_valasza(eredmeny, kivagas["tipus"], kivagas["sorszam"])
+        jelzes = jelzes_oka(kivagas["tipus"], valasz, bizonyossag, self.bizonytalan_sav)
+        szoveg = f"{elotag}{valasz_szovege(kivagas['tipus'], valasz)}"
+        if bizonyossag is not None:
+            szoveg += f" ({bizonyossag:.2f})"
+        return _feliratos(kivagas_rajzolasa(kivagas), szoveg, JELZETT_SZIN if jelzes else FELIRAT_SZIN)
+
+    @staticmethod
+    def _lap_cimke(eredmeny: Dict) -> str:
+        return f"{os.path.basename(eredmeny.get('kep_fajl', '?'))} {eredmeny.get('neptun_kod') or ''}".strip()
+
+    def hozzaadas(self, eredmeny: Dict, kivagasok: List[Kivagas]):
+        """Egy lap kivágásainak felvétele (az eredmény szótár a válaszokhoz és a felirathoz kell)."""
+        if not kivagasok:
+            return
+        cimke = self._lap_cimke(eredmeny)
+        if self.elrendezes == "lapok":
+            magassag = max(k["kep"].shape[0] for k in kivagasok)
+            cimke_cella = _feliratos(np.full((magassag, CIMKE_SZELESSEG, 3), 255, dtype=np.uint8), cimke, FELIRAT_SZIN)
+            self._lap_sorok.append([cimke_cella] + [self._cella(eredmeny, k, f"{k['tipus']} {k['sorszam']}: ")
+                                                    for k in kivagasok])
+            if len(self._lap_sorok) >= self.sorok:
+                self._lapok_oldal_irasa()
+            return
+
+        for kivagas in kivagasok:
+            kulcs = (kivagas["tipus"], kivagas["sorszam"])
+            cellak = self._kerdes_cellak.setdefault(kulcs, [])
+            cellak.append(self._cella(eredmeny, kivagas, f"{cimke}: "))
+            if len(cellak) >= self.oszlopok * self.sorok:
+                self._kerdes_oldal_irasa(kulcs)
+
+    def _iras(self, kulcs, nev: str, kep: np.ndarray):
+        self._oldalszamok[kulcs] = self._oldalszamok.get(kulcs, 0) + 1
+        utvonal = os.path.join(self.mappa, f"{nev}_{self._oldalszamok[kulcs]:03d}.jpg")
+        cv2.imwrite(utvonal, kep, [cv2.IMWRITE_JPEG_QUALITY, JPEG_MINOSEG])
+        self.fajlok.append(utvonal)
+
+    def _lapok_oldal_irasa(self):
+        if self._lap_sorok:
+            self._iras("lapok", "lapok", _racs(self._lap_sorok))
+            self._lap_sorok = []
+
+    def _kerdes_oldal_irasa(self, kulcs: Tuple[str, int]):
+        cellak = self._kerdes_cellak.pop(kulcs, [])
+        if cellak:
+            sorok = [cellak[i:i + self.oszlopok] for i in range(0, len(cellak), self.oszlopok)]
+            self._iras(kulcs, f"kerdes_{kulcs[0]}_{kulcs[1]:02d}", _racs(sorok))
+
+    def lezaras(self) -> List[str]:
+        """A félkész oldalak kiírása; visszaadja az összes kiírt fájlt."""
+        self._lapok_oldal_irasa()
+        for kulcs in sorted(self._kerdes_cellak):
+            self._kerdes_oldal_irasa(kulcs)
+        return self.fajlok
+
+
+class EllenorzesiSor:
+    """
+    Kézi ellenőrzési sor egy mappában: a megjelölt kérdések kivágásai tömörített PNG-k, a
+    tételek az `index.jsonl`-be kerülnek (soronként egy JSON, a mappához relatív kivágás
+    útvonallal). A fájlt csak bővítjük, így a sor futás közben is olvasható, és több
+    köteg is gyűjthet ugyanabba a sorba.
+    """
+
+    INDEX = "index.jsonl"
+
+    def __init__(self, mappa: str, bizonytalan_sav: float = 0.10):
+        self.mappa = mappa
+        self.bizonytalan_sav = bizonytalan_sav
+        os.makedirs(mappa, exist_ok=True)
+        self.index_utvonal = os.path.join(mappa, self.INDEX)
+        self.db = len(self.betoltes(mappa))
+        self.uj_tetelek = 0
+
+    def hozzaadas(self, eredmeny: Dict, kivagasok: List[Kivagas]) -> int:
+        """A lap megjelölt kérdéseinek felvétele; visszaadja, hány tétel került a sorba."""
+        lap = os.path.splitext(os.path.basename(eredmeny.get("kep_fajl", "lap")))[0]
+        tetelek = []
+        for kivagas in kivagasok:
+            tipus, sorszam = kivagas["tipus"], kivagas["sorszam"]
+            valasz, bizonyossag = kerdes_valasza(eredmeny, tipus, sorszam)
+            ok = jelzes_oka(tipus, valasz, bizonyossag, self.bizonytalan_sav)
+            if ok is None:
+                continue
+            self.db += 1
+            fajl = f"{self.db:06d}_{lap}_{tipus}{sorszam:02d}.png"
+            cv2.imwrite(os.path.join(self.mappa, fajl), kivagas_rajzolasa(kivagas), [cv2.IMWRITE_PNG_COMPRESSION, 9])
+            tetelek.append({
+                "sorszam": self.db,
+                "kep_fajl": eredmeny.get("kep_fajl"),
+                "neptun_kod": eredmeny.get("neptun_kod"),
+                "tipus": tipus,
+                "kerdes": sorszam,
+                "valasz": valasz,
+                "bizonyossag": bizonyossag,
+                "ok": ok,
+                "keret": list(kivagas["keret"]),
+                "kivagas": fajl,
+            })
+        if tetelek:
+            with open(self.index_utvonal, 'a', encoding='utf-8') as f:
+                for tetel in tetelek:
+                    f.write(json.dumps(tetel, ensure_ascii=False) + "\n")
+            self.uj_tetelek += len(tetelek)
+        return len(tetelek)
+
+    @classmethod
+    def betoltes(cls, mappa: str) -> List[Dict]:
+        """A sor tételei az index alapján (a kivágásokat nem tölti be)."""
+        utvonal = os.path.join(mappa, cls.INDEX)
+        if not os.path.exists(utvonal):
+            return []
+        with open(utvonal, 'r', encoding='utf-8') as f:
+            return [json.loads(sor) for sor in f if sor.strip()]
@@ -0,0 +1,101 @@
+"""
+Újraszkennelt vagy duplán behúzott lapok felismerése perceptuális hash-sel.
+
+A normalizált (kanonikus méretű) lapról két ujjlenyomat készül:
+  - a teljes lap DCT hash-e, amely a különböző űrlapokat / üres oldalakat választja szét,
+  - a Neptun mező DCT hash-e, amely a tanulókat különbözteti meg. Ugyanannak az űrlapnak
+    a kitöltött példányai a teljes lap kis felbontású képén szinte azonosak (a jelölések
+    néhány pixelnyiek), a kézzel írt kód viszont lapról lapra más.
+Két lap akkor duplikátum, ha mindkét hash Hamming-távolsága a küszöb alatt van.
+Üres Neptun mezőnél nincs Neptun hash, az ilyen lapot nem tekintjük duplikátumnak.
+"""
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+# (szélesség, magasság) a DCT előtt, és a megtartott alacsony frekvenciás blokk (sorok, oszlopok)
+LAP_HASH_MERET = (32, 32)
+LAP_HASH_BLOKK = (8, 8)
+NEPTUN_HASH_MERET = (128, 32)
+NEPTUN_HASH_BLOKK = (8, 32)
+
+# A Neptun mező belsejének tintaaránya, ami alatt üresnek tekintjük
+URES_NEPTUN_TINTA = 0.01
+
+# Ujjlenyomat: (lap hash, Neptun hash vagy None)
+Ujjlenyomat = Tuple[int, Optional[int]]
+
+
+def phash(kep: np.ndarray, meret: Tuple[int, int], blokk: Tuple[int, int]) -> int:
+    """DCT alapú perceptuális hash: az alacsony frekvenciás együtthatók a mediánjukhoz mérve (DC nélkül)."""
+    kicsi = cv2.resize(kep, meret, interpolation=cv2.INTER_AREA).astype(np.float32)
+    egyutthatok = cv2.dct(kicsi)[:blokk[0], :blokk[1]].ravel()[1:]
+    bitek = np.packbits(egyutthatok > np.median(egyutthatok))
+    return int.from_bytes(bitek.tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def lap_ujjlenyomata(szurke: np.ndarray, neptun_terulet: Tuple[int, int, int, int]) -> Ujjlenyomat:
+    """A normalizált szürkeárnyalatos lap és a Neptun mező (x, y, w, h) ujjlenyomata."""
+    lap = phash(szurke, LAP_HASH_MERET, LAP_HASH_BLOKK)
+
+    x, y, w, h = neptun_terulet
+    roi = szurke[y:y + h, x:x + w]
+    if roi.size == 0:
+        return lap, None
+    # A keret vonalai ne számítsanak tintának
+    belso = roi[h // 6:h - h // 6, w // 20:w - w // 20]
+    if belso.size == 0 or np.count_nonzero(belso < 128) < URES_NEPTUN_TINTA * belso.size:
+        return lap, None
+    return lap, phash(roi, NEPTUN_HASH_MERET, NEPTUN_HASH_BLOKK)
+
+
+class DuplikatumIndex:
+    """
+    A kötegben már látott lapok ujjlenyomatai. Több szálból (vagy managerrel megosztva, több
+    folyamatból) is hívható: az ellenőrzés és a felvétel egy lépésben, zár alatt történik,
+    így két egyszerre feldolgozott példány közül pontosan az egyik lesz az eredeti.
+    """
+
+    # Küszöbök bitekben (a lap hash 63, a Neptun hash 255 bites)
+    LAP_KUSZOB = 12
+    NEPTUN_KUSZOB = 51
+
+    def __init__(self, kihagyas: bool = False, lap_kuszob: int = LAP_KUSZOB, neptun_kuszob: int = NEPTUN_KUSZOB):
+        """`kihagyas=True` esetén a duplikátumot nem kell tovább kiértékelni, különben csak jelöljük."""
+        self.kihagyas = kihagyas
+        self.lap_kuszob = lap_kuszob
+        self.neptun_kuszob = neptun_kuszob
+        self.lapok: List[Tuple[int, int, str]] = []
+        self.zar = threading.Lock()
+
+    def ellenorzes(self, ujjlenyomat: Ujjlenyomat, nev: str) -> Optional[Dict]:
+        """
+        A lap összevetése a korábbiakkal, és felvétele az indexbe, ha új.
+        Duplikátumnál {"eredeti", "lap_tavolsag", "neptun_tavolsag", "kihagyva"}, különben None.
+        """
+        lap, neptun = ujjlenyomat
+        if neptun is None:
+            return None
+        with self.zar:
+            legjobb = None
+            for korabbi_lap, korabbi_neptun, korabbi_nev in self.lapok:
+                lap_tavolsag = hamming(lap, korabbi_lap)
+                if lap_tavolsag > self.lap_kuszob:
+                    continue
+                neptun_tavolsag = hamming(neptun, korabbi_neptun)
+                if neptun_tavolsag <= self.neptun_kuszob and (legjobb is None or neptun_tavolsag < legjobb["neptun_tavolsag"]):
+                    legjobb = {"eredeti": korabbi_nev, "lap_tavolsag": lap_tavolsag,
+                               "neptun_tavolsag": neptun_tavolsag, "kihagyva": self.kihagyas}
+            if legjobb is None:
+                self.lapok.append((lap, neptun, nev))
+            return legjobb
+
+    def __len__(self) -> int:
+        return len(self.lapok)
@@ -0,0 +1,247 @@
+"""
+Mappafigyelő mód: a szkenner által folyamatosan lerakott képeket érkezésükkor értékeli ki.
+
+A félig megírt fájlokat addig nem dolgozzuk fel, amíg méretük és módosítási idejük
+két lekérdezés között nem változik, és el nem telt a nyugalmi idő. A feldolgozott
+fájlok tartalmának SHA-256 hash-ét egy kis indexfájlba írjuk, így újraindításkor
+a már kiértékelt lapokat kihagyjuk. Az eredmények soronként egy JSON objektumként
+folyamatosan kerülnek az eredményfájlba. Az első hibátlan lapból űrlapmodell készül (lásd
+urlapmodell.py), a további lapokat ehhez ellenőrizzük.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Dict, Tuple
+
+from szolgaltatas import (munkas_inicializalas, munkas_kiertekeles, urlapmodell_betoltese, urlapmodell_mentese,
+                          urlapmodell_munkas)
+
+
+KEP_KITERJESZTESEK = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+# Ennyi sikertelen olvasás után a fájlt (ebben az állapotában) kihagyjuk
+OLVASASI_PROBAK = 5
+
+
+class MappaFigyelo:
+
+    def __init__(self, mappa: str, kimeneti_mappa: str = "eredmenyek", munkasok: int = None,
+                 nyugalmi_ido: float = 2.0, lekerdezesi_ido: float = 1.0, tesseract_path: str = None,
+                 perspektiva: bool = True, zajszures: bool = True, neptun_motor: str = None,
+                 urlapmodell: str = None):
+        """
+        Az `urlapmodell` egy űrlapmodell fájl: ha létezik, a lapokat ehhez ellenőrizzük, ha nem, az
+        első hibátlan lapból fordított modell ide mentődik (így újraindításkor is ugyanaz marad).
+        """
+        self.mappa = os.path.abspath(mappa)
+        self.kimeneti_mappa = kimeneti_mappa
+        self.munkasok = munkasok or os.cpu_count() or 1
+        self.nyugalmi_ido = nyugalmi_ido
+        self.lekerdezesi_ido = lekerdezesi_ido
+        self.tesseract_path = tesseract_path
+        self.perspektiva = perspektiva
+        self.zajszures = zajszures
+        self.neptun_motor = neptun_motor
+        if neptun_motor == "knn":
+            from neptun_felismero import modell_ellenorzese
+            modell_ellenorzese()
+        self.urlapmodell_fajl = urlapmodell
+        self.urlapmodell = urlapmodell_betoltese(urlapmodell)
+
+        if not os.path.exists(kimeneti_mappa):
+            os.makedirs(kimeneti_mappa)
+        self.index_fajl = os.path.join(kimeneti_mappa, "feldolgozott.idx")
+        self.eredmeny_fajl = os.path.join(kimeneti_mappa, "eredmenyek.jsonl")
+
+        # hash -> fájlnév, a korábbi futásokból
+        self.feldolgozott = self._index_betoltese()
+        # útvonal -> (méret, módosítási idő) az előző lekérdezésből
+        self.megfigyelt: Dict[str, Tuple[int, float]] = {}
+        # már elintézett (kiértékelt vagy duplikátumként kihagyott) fájlok ugyanezzel az állapottal
+        self.elintezett: Dict[str, Tuple[int, float]] = {}
+        # útvonal -> sikertelen olvasások száma
+        self.olvasasi_hibak: Dict[str, int] = {}
+
+    def _index_betoltese(self) -> Dict[str, str]:
+        feldolgozott = {}
+        if os.path.exists(self.index_fajl):
+            with open(self.index_fajl, 'r', encoding='utf-8') as f:
+                for sor in f:
+                    reszek = sor.rstrip("\n").split("\t", 1)
+                    if len(reszek) == 2:
+                        feldolgozott[reszek[0]] = reszek[1]
+        return feldolgozott
+
+    def kesz_fajlok(self):
+        """Azok a képfájlok, amelyek írása befejeződött (stabil méret és módosítási idő)."""
+        most = time.time()
+        kesz = []
+        jelenlegi = {}
+
+        try:
+            nevek = sorted(os.listdir(self.mappa))
+        except OSError as e:
+            # Pl. lecsatolt hálózati meghajtó: a következő lekérdezéskor újra próbáljuk
+            print(f"[!] A mappa nem olvasható: {e}")
+            return kesz
+
+        for nev in nevek:
+            if not nev.lower().endswith(KEP_KITERJESZTESEK):
+                continue
+            utvonal = os.path.join(self.mappa, nev)
+            try:
+                allapot = os.stat(utvonal)
+            except OSError:
+                continue  # időközben törölték vagy átnevezték
+            kulcs = (allapot.st_size, allapot.st_mtime)
+            jelenlegi[utvonal] = kulcs
+
+            if self.elintezett.get(utvonal) == kulcs:
+                continue
+            # Debounce: az előző lekérdezés óta nem változott, és a nyugalmi idő is eltelt. Az üres
+            # fájlok is ide kerülnek: az olvasásuk sikertelennek számít (lásd `_sikertelen_olvasas`)
+            if self.megfigyelt.get(utvonal) == kulcs and most - allapot.st_mtime >= self.nyugalmi_ido:
+                kesz.append((utvonal, kulcs))
+
+        self.megfigyelt = jelenlegi
+        return kesz
+
+    def _eredmeny_irasa(self, hash_ertek: str, utvonal: str, eredmeny: Dict):
+        """Eredmény és index azonnali kiírása, hogy leállás esetén se vesszen el."""
+        eredmeny["hash"] = hash_ertek
+        with open(self.eredmeny_fajl, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(eredmeny, ensure_ascii=False) + "\n")
+        with open(self.index_fajl, 'a', encoding='utf-8') as f:
+            f.write(f"{hash_ertek}\t{os.path.basename(utvonal)}\n")
+        self.feldolgozott[hash_ertek] = os.path.basename(utvonal)
+
+    def _sikertelen_olvasas(self, utvonal: str, kulcs: Tuple[int, float], hiba: str):
+        """
+        Sikertelen olvasás (pl. a szkenner még zárolja, vagy még üres a fájl) számlálása. A fájlt nem
+        jelöljük elintézettnek, így a következő lekérdezéskor újra próbáljuk; `OLVASASI_PROBAK` sikertelen
+        próba után kihagyjuk, és hibaként az eredmények közé írjuk (az indexbe nem, hiszen nem dolgoztuk fel).
+        """
+        hibak = self.olvasasi_hibak[utvonal] = self.olvasasi_hibak.get(utvonal, 0) + 1
+        if hibak < OLVASASI_PROBAK:
+            print(f"[!] Nem olvasható, újrapróbálva ({os.path.basename(utvonal)}): {hiba}")
+            return
+        print(f"[!] Nem olvasható, kihagyva ({os.path.basename(utvonal)}): {hiba}")
+        self.elintezett[utvonal] = kulcs
+        del self.olvasasi_hibak[utvonal]
+        with open(self.eredmeny_fajl, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"kep_fajl": utvonal, "hiba": hiba,
+                                "kiertekeles_idopont": datetime.now().strftime("%Y-%m-%d %H:%M:%S")},
+                               ensure_ascii=False) + "\n")
+
+    def _urlapmodell_forditasa(self, keszlet: ProcessPoolExecutor, utvonal: str):
+        """Űrlapmodell az első sikeresen kiértékelt lapból; ha nem hibátlan, a következő lappal próbáljuk."""
+        try:
+            self.urlapmodell = keszlet.submit(urlapmodell_munkas, utvonal, self.perspektiva,
+                                              self.zajszures).result()
+        except Exception as e:
+            print(f"[!] Űrlapmodell nem fordítható ebből a lapból ({os.path.basename(utvonal)}): {e}")
+            return
+        urlapmodell_mentese(self.urlapmodell, self.urlapmodell_fajl, os.path.basename(utvonal))
+
+    def futtatas(self, egyszer: bool = False):
+        """
+        Figyelés indítása. `egyszer=True` esetén a mappában lévő fájlok feldolgozása után kilép
+        (a nyugalmi időt ilyenkor is kivárja).
+        """
+        print(f"[*] Mappa figyelése: {self.mappa}")
+        print(f"[*] Korábban feldolgozott lapok: {len(self.feldolgozott)}")
+
+        folyamatban = {}
+        uresjarat = 0
+
+        with ProcessPoolExecutor(max_workers=self.munkasok, initializer=munkas_inicializalas,
+                                 initargs=(self.tesseract_path, self.neptun_motor)) as keszlet:
+            try:
+                while True:
+                    # Legfeljebb 2 lap várakozik munkásonként, a többi a következő körben jön
+                    if len(folyamatban) < 2 * self.munkasok:
+                        for utvonal, kulcs in self.kesz_fajlok():
+                            if utvonal in (u for u, _, _ in folyamatban.values()):
+                                continue
+                            if len(folyamatban) >= 2 * self.munkasok:
+                                break
+                            try:
+                                with open(utvonal, 'rb') as f:
+                                    adat = f.read()
+                            except OSError as e:
+                                self._sikertelen_olvasas(utvonal, kulcs, str(e))
+                                continue
+                            if not adat:
+                                self._sikertelen_olvasas(utvonal, kulcs, "üres fájl")
+                                continue
+                            self.olvasasi_hibak.pop(utvonal, None)
+                            hash_ertek = hashlib.sha256(adat).hexdigest()
+                            if hash_ertek in self.feldolgozott or \
+                                    hash_ertek in (h for _, _, h in folyamatban.values()):
+                                print(f"   Kihagyva (már feldolgozott): {os.path.basename(utvonal)}")
+                                self.elintezett[utvonal] = kulcs
+                                continue
+                            jovo = keszlet.submit(munkas_kiertekeles, adat, self.tesseract_path,
+                                                  self.perspektiva, self.zajszures, utvonal, self.neptun_motor,
+                                                  urlapmodell=self.urlapmodell)
+                            folyamatban[jovo] = (utvonal, kulcs, hash_ertek)
+
+                    if folyamatban:
+                        uresjarat = 0
+                        kesz, _ = wait(list(folyamatban), timeout=self.lekerdezesi_ido, return_when=FIRST_COMPLETED)
+                        for jovo in kesz:
+                            utvonal, kulcs, hash_ertek = folyamatban.pop(jovo)
+                            self.elintezett[utvonal] = kulcs
+                            try:
+                                eredmeny = jovo.result()
+                            except Exception as e:
+                                print(f"[!] Hiba ({os.path.basename(utvonal)}): {e}")
+                                continue
+                            self._eredmeny_irasa(hash_ertek, utvonal, eredmeny)
+                            print(f"[+] {datetime.now().strftime('%H:%M:%S')} {os.path.basename(utvonal)}: "
+                                  f"{eredmeny.get('neptun_kod')} ({eredmeny['feldolgozasi_ido']:.2f} s)")
+                            if self.urlapmodell is None:
+                                self._urlapmodell_forditasa(keszlet, utvonal)
+                    else:
+                        if egyszer:
+                            # Minden látott fájl elintézve, és a nyugalmi időnél tovább nem jött új
+                            uresjarat += 1
+                            if all(self.elintezett.get(u) == k for u, k in self.megfigyelt.items()) \
+                                    and uresjarat * self.lekerdezesi_ido > self.nyugalmi_ido:
+                                break
+                        time.sleep(self.lekerdezesi_ido)
+            except KeyboardInterrupt:
+                print("\n[*] Figyelés leállítva")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mappafigyelő tesztlap kiértékelés")
+    parser.add_argument("mappa", help="A figyelt mappa (ide teszi a szkenner a képeket)")
+    parser.add_argument("--kimenet", default="eredmenyek", help="Eredmények és index mappája")
+    parser.add_argument("--munkasok", type=int, default=None)
+    parser.add_argument("--nyugalmi-ido", type=float, default=2.0,
+                        help="Ennyi másodpercig változatlan fájlt tekintünk teljesen megírtnak")
+    parser.add_argument("--lekerdezesi-ido", type=float, default=1.0)
+    parser.add_argument("--tesseract-path", default=None)
+    parser.add_argument("--egyszer", action="store_true", help="A meglévő fájlok feldolgozása után kilép")
+    parser.add_argument("--neptun-motor", choices=["tesseract", "knn"], default=None,
+                        help="Neptun kód felismerő (alapértelmezés: tesseract)")
+    parser.add_argument("--urlapmodell", metavar="FAJL", default=None,
+                        help="Űrlapmodell: ha létezik, betölti, különben az első hibátlan lapból ide menti")
+    args = parser.parse_args()
+
+    try:
+        figyelo = MappaFigyelo(args.mappa, args.kimenet, args.munkasok, args.nyugalmi_ido, args.lekerdezesi_ido,
+                               args.tesseract_path, neptun_motor=args.neptun_motor, urlapmodell=args.urlapmodell)
+    except FileNotFoundError as e:
+        print(f"[!] {e}")
+        return
+    figyelo.futtatas(egyszer=args.egyszer)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,803 @@
+"""
+Többlépcsős kiértékelő futószalag korlátos sorokkal.
+
+    olvasók (szálak)  ->  képfeldolgozók (folyamatok)  ->  OCR (szálak)  ->  író (szál)
+
+Az olvasók a lemezről olvassák a képfájlokat, a képfeldolgozók dekódolnak és elvégzik
+a geometriai kiértékelést (igazítás, keretek, jelölőnégyzetek) és előkészítik a Neptun
+kivágást, az OCR szálak futtatják a Tesseractet (külső folyamat, így a szál csak vár),
+az író pedig menti az eredményeket. Így az N+1. lap beolvasása, az N. lap geometriája
+és az N-1. lap OCR-je egyszerre futhat. Minden lépcső párhuzamossága külön állítható.
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.managers import BaseManager
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from attekintes import ELRENDEZESEK, KIVAGAS_SKALA, EllenorzesiSor, Kontaktlap, jelzett_kerdesek, kerdes_kivagasok
+from duplikatum import DuplikatumIndex
+from geometriaprofil import profil_betoltese
+from kalibracio import kalibralas
+from lapgyorsitotar import LapGyorsitotar, LapLeiro, lap_a_gyorsitotarbol, lap_irasa_gyorsitotarba
+from osztott_memoria import KepGyuruPuffer, KepLeiro, kep_a_pufferbol
+from profilozas import Profilozo
+from statisztika import Eredmenystatisztika, javitokulcs_betoltese, osszevetes
+from szolgaltatas import (munkas_inicializalas, ujrahasznalhato_kiertekelo, urlapmodell_betoltese,
+                          urlapmodell_mentese, urlapmodell_munkas)
+from tobboldalas import dolgozatok_osszeallitasa
+from tomor_eredmeny import TomorEredmenyek
+from urlapmodell import Urlapmodell
+
+
+_VEGE = object()
+
+
+class _DuplikatumKezelo(BaseManager):
+    """A duplikátum indexet egy külön folyamat tartja, a munkásfolyamatok proxyn keresztül érik el."""
+
+
+_DuplikatumKezelo.register("DuplikatumIndex", DuplikatumIndex)
+
+
+def _munkas_inicializalas(tesseract_path: str = None, kontur_korlat: int = None):
+    # A munkások csak a geometriát értékelik ki, a Neptun kódot a fő folyamat OCR szálai olvassák
+    munkas_inicializalas(tesseract_path, ocr=False)
+    if kontur_korlat is not None:
+        from kiertekelo import TesztlapKiertekelo
+        TesztlapKiertekelo.KONTUR_KORLAT = kontur_korlat
+
+
+def _kihagyott_duplikatum(eredmeny: Dict) -> bool:
+    return eredmeny.get("duplikatum", {}).get("kihagyva", False)
+
+
+def _ocr_hiba(eredmeny: Dict, e: Exception):
+    """Sikertelen Neptun olvasás rögzítése a lapon; a lap ettől még az íróhoz megy."""
+    print(f"[!] Neptun felismerési hiba ({os.path.basename(eredmeny['kep_fajl'])}): {type(e).__name__}: {e}")
+    eredmeny["neptun_kod"] = "HIBA"
+    eredmeny["ocr_hiba"] = f"{type(e).__name__}: {e}"
+
+
+def _tovabbi_oldal(eredmeny: Dict) -> bool:
+    """Többoldalas dolgozat nem első oldala: nincs rajta Neptun mező."""
+    return eredmeny.get("oldal", {}).get("oldal", 1) > 1
+
+
+def _geometria_es_ocr_elokeszites(kep: np.ndarray, nev: str, perspektiva: bool, zajszures: bool,
+                                  duplikatum_index=None, profilozo: Profilozo = None,
+                                  jeloles_kuszob: float = None,
+                                  kivagas_skala: float = None,
+                                  csak_jelzettek: bool = False,
+                                  geometria_profil: str = None,
+                                  normalizalt: np.ndarray = None,
+                                  gyorsitotar_hely: LapLeiro = None,
+                                  urlapmodell: Urlapmodell = None) -> Tuple[Dict, np.ndarray, List[Tuple], List[Dict]]:
+    """
+    A munkásfolyamat újrahasznált kiértékelőjével (előre lefoglalt pufferekkel) dolgozik.
+    `normalizalt` (a lapgyorsítótárból) megadásakor a `kep` None, és az előfeldolgozás kimarad;
+    `gyorsitotar_hely` megadásakor az előfeldolgozott lap a gyorsítótár e helyére is kiíródik.
+    Kihagyott duplikátumnál nincs Neptun kivágás (None) és nincsenek négyzetek; többoldalas
+    dolgozat további oldalainál sincs Neptun kivágás. Az áttekintő
+    kérdéskivágások (attekintes.py) csak `kivagas_skala` megadásakor készülnek, különben None;
+    `csak_jelzettek=True` esetén csak a kézi ellenőrzést igénylő kérdésekhez. A `geometria_profil`
+    a profilfájl útvonala (lásd geometriaprofil.py); a munkás a beolvasott profilt megjegyzi.
+    Az `urlapmodell` a kötegre fordított űrlapmodell, ehhez ellenőrizzük a lapot.
+    """
+    magassag, szelesseg = (kep if normalizalt is None else normalizalt).shape[:2]
+    kiertekelo = ujrahasznalhato_kiertekelo(magassag, szelesseg, zajszures=zajszures, perspektiva=perspektiva)
+    kiertekelo.profilozo = profilozo
+    kiertekelo.jeloles_kuszob = kiertekelo.JELOLES_KUSZOB if jeloles_kuszob is None else jeloles_kuszob
+    kiertekelo.profil = profil_betoltese(geometria_profil)
+    mentes = None
+    if gyorsitotar_hely is not None:
+        def mentes(szurke):
+            lap_irasa_gyorsitotarba(gyorsitotar_hely, szurke)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            eredmeny = kiertekelo.feldolgozas(kep, nev, ocr=False, urlapmodell=urlapmodell,
+                                              duplikatum_index=duplikatum_index,
+                                              normalizalt=normalizalt, normalizalt_mentes=mentes)
+            if _kihagyott_duplikatum(eredmeny):
+                return eredmeny, None, [], None
+            # A kivágás másolat, így a következő lap nem írja felül, amíg az OCR szál dolgozik vele
+            ocr_kep = None
+            if not _tovabbi_oldal(eredmeny):
+                with kiertekelo._szakasz("neptun_elokeszites"):
+                    ocr_kep = kiertekelo.neptun_ocr_elokeszites()
+            kivagasok = None
+            if kivagas_skala is not None:
+                csak = None
+                if csak_jelzettek:
+                    csak = jelzett_kerdesek(eredmeny, kiertekelo.kerdes_keretek, kiertekelo.BIZONYTALAN_SAV)
+                with kiertekelo._szakasz("attekinto_kivagasok"):
+                    kivagasok = kerdes_kivagasok(kiertekelo.szurke, kiertekelo.kerdes_keretek,
+                                                 kiertekelo.debug_checkboxok, kivagas_skala, csak)
+    finally:
+        kiertekelo.profilozo = None
+    return eredmeny, ocr_kep, list(kiertekelo.debug_checkboxok), kivagasok
+
+
+def kepfeldolgozas_munkas(adat: bytes, nev: str, perspektiva: bool = True, zajszures: bool = True,
+                          duplikatum_index=None, profil: bool = False,
+                          jeloles_kuszob: float = None,
+                          kivagas_skala: float = None,
+                          csak_jelzettek: bool = False,
+                          geometria_profil: str = None,
+                          gyorsitotar_hely: LapLeiro = None,
+                          urlapmodell: Urlapmodell = None) -> Tuple[Dict, np.ndarray, List[Tuple], Dict, List[Dict]]:
+    """
+    Dekódolás és geometriai kiértékelés; az eredmény mellett a binarizált Neptun kivágást,
+    a jelölőnégyzeteket (`debug_checkboxok`), `profil=True` esetén a lap profilozási
+    adatait (`Profilozo.adatok()`, különben None) és `kivagas_skala` megadásakor az áttekintő
+    kérdéskivágásokat (különben None; `csak_jelzettek=True` esetén csak a megjelölt kérdésekét) adja vissza. A `jeloles_kuszob` a kalibrált
+    kitöltési küszöb (None: az alapértelmezett). `gyorsitotar_hely` megadásakor az előfeldolgozott
+    lap a lapgyorsítótár e helyére is kiíródik (lásd lapgyorsitotar.py). Az `urlapmodell` a kötegre
+    fordított űrlapmodell.
+    """
+    import cv2
+
+    kezdes = time.perf_counter()
+    profilozo = Profilozo() if profil else None
+    with profilozo.szakasz(nev, "dekodolas") if profil else contextlib.nullcontext():
+        kep = cv2.imdecode(np.frombuffer(adat, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if kep is None:
+        raise ValueError(f"Nem sikerült betölteni a képet: {nev}")
+    eredmeny, ocr_kep, negyzetek, kivagasok = _geometria_es_ocr_elokeszites(
+        kep, nev, perspektiva, zajszures, duplikatum_index, profilozo, jeloles_kuszob, kivagas_skala, csak_jelzettek,
+        geometria_profil, gyorsitotar_hely=gyorsitotar_hely, urlapmodell=urlapmodell)
+    eredmeny["kep_fajl"] = nev
+    eredmeny["feldolgozasi_ido"] = round(time.perf_counter() - kezdes, 3)
+    return eredmeny, ocr_kep, negyzetek, profilozo.adatok() if profil else None, kivagasok
+
+
+def kepfeldolgozas_pufferbol_munkas(leiro: KepLeiro, nev: str, perspektiva: bool = True, zajszures: bool = True,
+                                    duplikatum_index=None, profil: bool = False,
+                                    jeloles_kuszob: float = None,
+                                    kivagas_skala: float = None,
+                                    csak_jelzettek: bool = False,
+                                    geometria_profil: str = None,
+                                    gyorsitotar_hely: LapLeiro = None,
+                                    urlapmodell: Urlapmodell = None) -> Tuple[Dict, np.ndarray, List[Tuple], Dict, List[Dict]]:
+    """Mint a `kepfeldolgozas_munkas`, de a már dekódolt képet az osztott memóriából olvassa, másolás nélkül."""
+    kezdes = time.perf_counter()
+    profilozo = Profilozo() if profil else None
+    eredmeny, ocr_kep, negyzetek, kivagasok = _geometria_es_ocr_elokeszites(
+        kep_a_pufferbol(leiro), nev, perspektiva, zajszures, duplikatum_index, profilozo, jeloles_kuszob,
+        kivagas_skala, csak_jelzettek, geometria_profil, gyorsitotar_hely=gyorsitotar_hely, urlapmodell=urlapmodell)
+    eredmeny["kep_fajl"] = nev
+    eredmeny["feldolgozasi_ido"] = round(time.perf_counter() - kezdes, 3)
+    return eredmeny, ocr_kep, negyzetek, profilozo.adatok() if profil else None, kivagasok
+
+
+def kepfeldolgozas_gyorsitotarbol_munkas(leiro: LapLeiro, nev: str, perspektiva: bool = True, zajszures: bool = True,
+                                         duplikatum_index=None, profil: bool = False,
+                                         jeloles_kuszob: float = None,
+                                         kivagas_skala: float = None,
+                                         csak_jelzettek: bool = False,
+                                         geometria_profil: str = None,
+                                         urlapmodell: Urlapmodell = None) -> Tuple[Dict, np.ndarray, List[Tuple], Dict, List[Dict]]:
+    """
+    Mint a `kepfeldolgozas_munkas`, de az előfeldolgozott lapot a lapgyorsítótárból olvassa, másolás
+    nélkül: a dekódolás, az igazítás, a normalizálás és a zajszűrés kimarad.
+    """
+    kezdes = time.perf_counter()
+    profilozo = Profilozo() if profil else None
+    eredmeny, ocr_kep, negyzetek, kivagasok = _geometria_es_ocr_elokeszites(
+        None, nev, perspektiva, zajszures, duplikatum_index, profilozo, jeloles_kuszob,
+        kivagas_skala, csak_jelzettek, geometria_profil, normalizalt=lap_a_gyorsitotarbol(leiro),
+        urlapmodell=urlapmodell)
+    eredmeny["kep_fajl"] = nev
+    eredmeny["feldolgozasi_ido"] = round(time.perf_counter() - kezdes, 3)
+    return eredmeny, ocr_kep, negyzetek, profilozo.adatok() if profil else None, kivagasok
+
+
+def kitoltesi_aranyok_munkas(utvonal: str, perspektiva: bool = True, zajszures: bool = True,
+                             geometria_profil: str = None) -> List[float]:
+    """Kalibrációs menet: a lap jelölőnégyzeteinek kitöltési arányai az alapértelmezett küszöbbel kiértékelve."""
+    import cv2
+
+    kep = cv2.imdecode(np.fromfile(utvonal, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if kep is None:
+        raise ValueError(f"Nem sikerült betölteni a képet: {utvonal}")
+    kiertekelo = ujrahasznalhato_kiertekelo(kep.shape[0], kep.shape[1], zajszures=zajszures, perspektiva=perspektiva)
+    kiertekelo.jeloles_kuszob = kiertekelo.JELOLES_KUSZOB
+    kiertekelo.profil = profil_betoltese(geometria_profil)
+    with contextlib.redirect_stdout(io.StringIO()):
+        kiertekelo.feldolgozas(kep, utvonal, ocr=False)
+    return [negyzet[5] for negyzet in kiertekelo.debug_checkboxok]
+
+
+class Futoszalag:
+
+    # Az űrlapmodell fordításához legfeljebb ennyi lapot próbálunk, egyesével
+    URLAPMODELL_MINTAK = 4
+
+    def __init__(self, olvasok: int = 2, kepfeldolgozok: int = None, ocr_szalak: int = 2, sor_meret: int = 8,
+                 kimeneti_mappa: str = "eredmenyek", tesseract_path: str = None,
+                 perspektiva: bool = True, zajszures: bool = True, osztott_memoria: bool = False,
+                 tomor: bool = False, neptun_motor: str = "tesseract", nevsor=None, duplikatumok: str = None,
+                 profilozo: Profilozo = None, kontur_korlat: int = None, kalibracio: int = None,
+                 attekintes: str = None, attekintes_elrendezes: str = "lapok", ellenorzes: str = None,
+                 tobboldalas: bool = False, geometria_profil: str = None, gyorsitotar: str = None,
+                 javitokulcs: Dict = None, urlapmodell: str = None):
+        """
+        `osztott_memoria=True` esetén az olvasók már dekódolják a képet, és osztott memóriás
+        gyűrűpufferen adják át a munkásoknak, így a nagy lapokat nem kell pickle-ölni.
+        `tomor=True` esetén az eredményeket (a jelölőnégyzetekkel együtt) `TomorEredmenyek`
+        tárolóba gyűjti a szótárlista helyett. `neptun_motor="knn"` esetén az OCR szálak a
+        Tesseract helyett a beépített felismerőt használják, a sorban várakozó lapokat egyben osztályozva.
+        Ha `nevsor` (nevsor.Nevsor) meg van adva, a Neptun kódokat a névsorhoz illeszti; újraolvasás
+        csak a nem illeszthető lapoknál történik.
+        `duplikatumok` lehet "jelzes" (a kötegben újra előforduló lapok "duplikatum" kulcsot kapnak)
+        vagy "kihagyas" (ezeket az OCR és a négyzetek kiértékelése előtt el is dobja).
+        `profilozo` megadásakor a munkások laponként profiloznak, és a mérések (az OCR lépcsővel
+        együtt) ebbe gyűlnek; a jelentést a hívó írja ki (`Profilozo.jelentes_irasa`).
+        `kontur_korlat` felülírja a `TesztlapKiertekelo.KONTUR_KORLAT`-ot a munkásokban. A túl zajos
+        (elutasított) lapok nem állítják meg a futást: az `elutasitott_lapok` listába kerülnek
+        (útvonal, ok), és ha van kimeneti mappa, az `elutasitott.txt` fájlba.
+        Ha `kalibracio` meg van adva, egy kalibrációs menet az első `kalibracio` (0 esetén az
+        összes) lap kitöltési arányaiból kalibrálja a jelölési küszöböt (lásd kalibracio.py), és
+        a köteg minden lapját ezzel értékeli. A kalibráció a `kalibracio_eredmeny`-be, a kimeneti
+        mappa `kalibracio.json` fájljába és a tömör eredmények mellé kerül.
+        Ha `attekintes` (mappa) meg van adva, a munkások kérdésenkénti kicsinyített kivágásokat is
+        küldenek, és ezekből kontakt lapok készülnek (`attekintes_elrendezes`: "lapok" vagy
+        "kerdesek", lásd attekintes.py); a kiírt fájlok az `attekinto_fajlok` listába kerülnek.
+        Ha `ellenorzes` (mappa) meg van adva, a megjelölt válaszok (hibás, üres, többszörös,
+        bizonytalan) kivágásai kézi ellenőrzési sorba kerülnek (`attekintes.EllenorzesiSor`);
+        kontakt lapok nélkül a munkások csak ezeket a kérdéseket vágják ki.
+        `tobboldalas=True` esetén az oldaljelölős lapokat (lásd tobboldalas.py) a futás végén
+        füzetenként egy-egy dolgozattá fűzi a beolvasási (útvonal) sorrend alapján: a dolgozatok a
+        `dolgozatok`, a hiányzó / rossz sorrendű oldalak a `oldal_problemak` listába, a kimeneti
+        mappában pedig a `dolgozatok` almappába és az `oldal_problemak.txt` fájlba kerülnek.
+        A lapok így is egyenként, párhuzamosan értékelődnek ki; a további oldalakon nincs OCR.
+        A `geometria_profil` az űrlap geometriai profiljának fájlja (lásd geometriaprofil.py). Itt
+        egyszer ellenőrizzük, a munkások folyamatonként egyszer olvassák be és skálázzák.
+        Ha `gyorsitotar` (mappa) meg van adva, az előfeldolgozott lapok (lásd lapgyorsitotar.py) a
+        képfájl tartalma és az előfeldolgozási beállítások szerint oda kerülnek, és egy későbbi
+        futás (pl. hangolt küszöbökkel) a dekódolás és az igazítás nélkül, közvetlenül a tárolt
+        lapokon értékel. A találatok és hiányok száma a `gyorsitotar_talalatok` / `_hianyok`-ba kerül.
+        Ha `javitokulcs` (a megoldólap eredménye, lásd statisztika.py) meg van adva, az író a lapokat
+        érkezésükkor összeveti vele, és a `statisztika`-ban (`Eredmenystatisztika`) folyamatosan
+        frissíti a pontszám-hisztogramot, a kérdésenkénti statisztikákat és a KR-20-at; a végén a
+        kimeneti mappa `statisztika.json` fájljába menti. Többoldalas módban az összefűzött
+        dolgozatok kerülnek a statisztikába.
+        A köteg lapjait egy űrlapmodellhez (lásd urlapmodell.py) ellenőrizzük: ha az `urlapmodell`
+        fájl létezik, abból töltjük be, különben a futás elején az első hibátlan lapból fordítjuk (és
+        ha a fájl meg van adva, oda mentjük). A modell az `urlapmodell_eredmeny`-be kerül. Többoldalas
+        módban az oldalak űrlapja eltér, ezért ott nincs közös modell.
+        """
+        self.olvasok = olvasok
+        self.kepfeldolgozok = kepfeldolgozok or os.cpu_count() or 1
+        self.ocr_szalak = ocr_szalak
+        self.sor_meret = sor_meret
+        self.kimeneti_mappa = kimeneti_mappa
+        self.tesseract_path = tesseract_path
+        self.perspektiva = perspektiva
+        self.zajszures = zajszures
+        self.osztott_memoria = osztott_memoria
+        self.tomor = tomor
+        self.neptun_motor = neptun_motor
+        self.nevsor = nevsor
+        if neptun_motor == "knn":
+            # Hiányzó modellnél már itt leállunk: az OCR szálban a hiba megakasztaná a futószalagot
+            from neptun_felismero import alap_felismero
+            alap_felismero()
+        if duplikatumok not in (None, "jelzes", "kihagyas"):
+            raise ValueError(f"Ismeretlen duplikátumkezelés: {duplikatumok}")
+        self.duplikatumok = duplikatumok
+        self.profilozo = profilozo
+        self.kontur_korlat = kontur_korlat
+        self.elutasitott_lapok: List[Tuple[str, str]] = []
+        if kalibracio is not None and kalibracio < 0:
+            raise ValueError(f"A kalibrációs lapok száma nem lehet negatív: {kalibracio}")
+        self.kalibracio = kalibracio
+        self.kalibracio_eredmeny: Dict = None
+        if attekintes_elrendezes not in ELRENDEZESEK:
+            raise ValueError(f"Ismeretlen áttekintő elrendezés: {attekintes_elrendezes}")
+        self.attekintes = attekintes
+        self.attekintes_elrendezes = attekintes_elrendezes
+        self.attekinto_fajlok: List[str] = []
+        self.ellenorzes = ellenorzes
+        self.ellenorzesi_tetelek = 0
+        self.tobboldalas = tobboldalas
+        # Hibás profilnál már itt kiderül, ne csak a munkásokban, minden lapnál
+        profil_betoltese(geometria_profil)
+        self.geometria_profil = geometria_profil
+        self.gyorsitotar = gyorsitotar
+        self.gyorsitotar_talalatok = self.gyorsitotar_hianyok = 0
+        self.javitokulcs = javitokulcs
+        self.urlapmodell = urlapmodell
+        self.urlapmodell_eredmeny: Urlapmodell = None
+        self.statisztika: Eredmenystatisztika = None
+        self.dolgozatok: List[Dict] = []
+        self.oldal_problemak: List[str] = []
+
+    def _kalibralas(self, keszlet: ProcessPoolExecutor, utvonalak: List[str]) -> Dict:
+        """Kalibrációs menet a munkáskészleten; a hibás vagy elutasított lapok kimaradnak belőle."""
+        from kiertekelo import TesztlapKiertekelo
+
+        mintak = utvonalak[:self.kalibracio] if self.kalibracio else utvonalak
+        jovok = [keszlet.submit(kitoltesi_aranyok_munkas, utvonal, self.perspektiva, self.zajszures,
+                                self.geometria_profil)
+                 for utvonal in mintak]
+        aranyok, lapok = [], 0
+        for utvonal, jovo in zip(mintak, jovok):
+            try:
+                aranyok.extend(jovo.result())
+                lapok += 1
+            except Exception as e:
+                print(f"[!] Kalibráció: kihagyva ({os.path.basename(utvonal)}): {e}")
+        eredmeny = kalibralas(aranyok, TesztlapKiertekelo.JELOLES_KUSZOB, lapok)
+        if eredmeny["elfogadva"]:
+            print(f"[*] Kalibrált jelölési küszöb: {eredmeny['kuszob']:.3f} ({lapok} lap, {len(aranyok)} négyzet, "
+                  f"elkülönülés: {eredmeny['elkulonules']:.2f})")
+        else:
+            print(f"[!] Kalibráció sikertelen ({eredmeny['ok']}), marad az alapértelmezett küszöb: "
+                  f"{eredmeny['kuszob']:.3f}")
+        return eredmeny
+
+    def _urlapmodell_forditasa(self, keszlet: ProcessPoolExecutor, utvonalak: List[str]) -> Urlapmodell:
+        """
+        Űrlapmodell a köteg első hibátlan lapjából (OCR nélküli geometriai menettel). A lapokat egyesével
+        próbáljuk, és az első sikeresnél megállunk, így jellemzően egyetlen lap geometriája a teljes
+        többletköltség. Ha az első `URLAPMODELL_MINTAK` lap közül egyik sem hibátlan, nincs modell.
+        """
+        mintak = utvonalak[:self.URLAPMODELL_MINTAK]
+        for utvonal in mintak:
+            try:
+                modell = keszlet.submit(urlapmodell_munkas, utvonal, self.perspektiva, self.zajszures,
+                                        self.geometria_profil).result()
+            except Exception as e:
+                print(f"[!] Űrlapmodell: kihagyva ({os.path.basename(utvonal)}): {e}")
+                continue
+            urlapmodell_mentese(modell, self.urlapmodell, os.path.basename(utvonal))
+            return modell
+        print(f"[!] Nincs hibátlan lap az első {len(mintak)} között, a lapok űrlapmodell nélkül értékelődnek ki")
+        return None
+
+    def _dolgozatok_osszefuzese(self, eredmenyek, utvonalak: List[str]):
+        """A lapok összefűzése dolgozatokká (lásd tobboldalas.py), és ha van kimeneti mappa, mentésük."""
+        from kiertekelo import TesztlapKiertekelo
+
+        self.dolgozatok, self.oldal_problemak = dolgozatok_osszeallitasa(eredmenyek, sorrend=utvonalak)
+        for problema in self.oldal_problemak:
+            print(f"[!] {problema}")
+        if self.statisztika is not None:
+            for dolgozat in self.dolgozatok:
+                self.statisztika.hozzaadas(osszevetes(dolgozat, self.javitokulcs))
+        if not self.kimeneti_mappa:
+            return
+        mappa = os.path.join(self.kimeneti_mappa, "dolgozatok")
+        for dolgozat in self.dolgozatok:
+            try:
+                TesztlapKiertekelo.eredmeny_mentese(dolgozat, mappa, csendes=True)
+            except OSError as e:
+                print(f"[!] Mentési hiba ({dolgozat['sorozat']}. füzet): {e}")
+        if self.oldal_problemak:
+            with open(os.path.join(self.kimeneti_mappa, "oldal_problemak.txt"), 'a', encoding='utf-8') as f:
+                for problema in self.oldal_problemak:
+                    f.write(f"{problema}\n")
+
+    def futtatas(self, utvonalak: List[str]) -> Union[List[Dict], TomorEredmenyek]:
+        """A megadott képek kiértékelése. Az eredményeket a befejezés sorrendjében adja vissza."""
+        import cv2
+        from kiertekelo import ElutasitottLap, TesztlapKiertekelo
+
+        profilozo = self.profilozo
+        profil = profilozo is not None
+        # A sorok korlátosak: ha egy lépcső lemarad, az előtte lévők blokkolnak (visszanyomás)
+        utvonal_sor = queue.Queue()
+        nyers_sor = queue.Queue(self.sor_meret)
+        ocr_sor = queue.Queue(self.sor_meret)
+        iro_sor = queue.Queue(self.sor_meret)
+        for utvonal in utvonalak:
+            utvonal_sor.put(utvonal)
+
+        eredmenyek = []
+        tomor = TomorEredmenyek(kapacitas=max(1, len(utvonalak))) if self.tomor else None
+        self.elutasitott_lapok = []
+        self.statisztika = Eredmenystatisztika() if self.javitokulcs is not None else None
+        # Többoldalas módban az egyes lapok csak dolgozatrészek: a statisztika az összefűzés után készül
+        lap_statisztika = self.statisztika if not self.tobboldalas else None
+        # Minden sorban álló és minden éppen feldolgozott lapnak jut egy hely. Az osztott memória (és vele
+        # a resource tracker) az első `submit` előtt jön létre: a munkások ekkor indulnak, és csak így
+        # öröklik a trackert; különben mindegyik sajátot indít, ami kilépéskor megszünteti a puffert
+        puffer = KepGyuruPuffer(self.sor_meret + self.kepfeldolgozok) if self.osztott_memoria else None
+        keszlet = ProcessPoolExecutor(max_workers=self.kepfeldolgozok, initializer=_munkas_inicializalas,
+                                      initargs=(self.tesseract_path, self.kontur_korlat))
+        self.kalibracio_eredmeny = None
+        if self.kalibracio is not None:
+            self.kalibracio_eredmeny = self._kalibralas(keszlet, utvonalak)
+            if tomor is not None:
+                tomor.kalibracio = self.kalibracio_eredmeny
+        jeloles_kuszob = self.kalibracio_eredmeny["kuszob"] if self.kalibracio_eredmeny else None
+        self.urlapmodell_eredmeny = urlapmodell = None
+        if not self.tobboldalas and utvonalak:
+            urlapmodell = urlapmodell_betoltese(self.urlapmodell) or self._urlapmodell_forditasa(keszlet, utvonalak)
+            self.urlapmodell_eredmeny = urlapmodell
+        kontaktlap = ellenorzesi_sor = kivagas_skala = None
+        if self.attekintes:
+            kontaktlap = Kontaktlap(self.attekintes, self.attekintes_elrendezes,
+                                    bizonytalan_sav=TesztlapKiertekelo.BIZONYTALAN_SAV)
+        if self.ellenorzes:
+            ellenorzesi_sor = EllenorzesiSor(self.ellenorzes, bizonytalan_sav=TesztlapKiertekelo.BIZONYTALAN_SAV)
+        if kontaktlap is not None or ellenorzesi_sor is not None:
+            kivagas_skala = KIVAGAS_SKALA
+        csak_jelzettek = kontaktlap is None
+        # Útvonal -> a lap áttekintő kivágásai, amíg a lap az OCR lépcsőn át az íróhoz ér
+        kivagasok_lapok: Dict[str, List[Dict]] = {}
+        lapgyorsitotar = gyorsitotar_kulcs = None
+        if self.gyorsitotar:
+            lapgyorsitotar = LapGyorsitotar(self.gyorsitotar, (TesztlapKiertekelo.KANONIKUS_MAGASSAG,
+                                                                TesztlapKiertekelo.KANONIKUS_SZELESSEG))
+            # Egyszerre legfeljebb ennyi új lap kerülhet be, így a munkásoknak nem kell újraképezniük
+            lapgyorsitotar.bovites(len(utvonalak))
+            gyorsitotar_kulcs = TesztlapKiertekelo.elofeldolgozasi_ujjlenyomat(
+                self.perspektiva, self.zajszures, profil_betoltese(self.geometria_profil))
+        kezelo = duplikatum_index = None
+        if self.duplikatumok:
+            kezelo = _DuplikatumKezelo()
+            kezelo.start()
+            duplikatum_index = kezelo.DuplikatumIndex(kihagyas=self.duplikatumok == "kihagyas")
+
+        def olvaso():
+            while (utvonal := utvonal_sor.get()) is not _VEGE:
+                try:
+                    with open(utvonal, 'rb') as f:
+                        adat = f.read()
+                except OSError as e:
+                    print(f"[!] Nem olvasható: {utvonal}: {e}")
+                    continue
+                
+                # Gyorsítótár: (kulcs, hely, leíró); találatnál a hely None, és a képet nem is dekódoljuk
+                tarolt = None
+                if lapgyorsitotar is not None:
+                    kulcs = f"{lapgyorsitotar.kep_hash(adat)}-{gyorsitotar_kulcs}"
+                    leiro = lapgyorsitotar.keres(kulcs)
+                    if leiro is not None:
+                        nyers_sor.put((utvonal, None, None, (kulcs, None, leiro)))
+                        continue
+                    tarolt = (kulcs, *lapgyorsitotar.foglalas())
+                
+                if puffer is None:
+                    nyers_sor.put((utvonal, adat, None, tarolt))
+                    continue
+                
+                # A dekódolás az olvasó szálon fut (a cv2 elengedi a GIL-t), a munkás csak leírót kap
+                kep = cv2.imdecode(np.frombuffer(adat, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if kep is None or not puffer.elfer(kep):
+                    # Dekódolhatatlan vagy túl nagy kép: a bájtos út kezeli (és jelzi a hibát)
+                    nyers_sor.put((utvonal, adat, None, tarolt))
+                    continue
+                hely = puffer.foglalas()
+                nyers_sor.put((utvonal, puffer.iras(hely, kep), hely, tarolt))
+
+        def kepfeldolgozo():
+            # Egy szál egy munkásfolyamatot tart foglalva, így a készlet sosem telik túl
+            while (elem := nyers_sor.get()) is not _VEGE:
+                utvonal, adat, hely, tarolt = elem
+                gyorsitotar_hely = tarolt[2] if tarolt is not None and tarolt[1] is not None else None
+                try:
+                    if tarolt is not None and tarolt[1] is None:
+                        jovo = keszlet.submit(kepfeldolgozas_gyorsitotarbol_munkas, tarolt[2], utvonal,
+                                              self.perspektiva, self.zajszures, duplikatum_index, profil,
+                                              jeloles_kuszob, kivagas_skala, csak_jelzettek,
+                                              self.geometria_profil, urlapmodell)
+                    elif hely is None:
+                        jovo = keszlet.submit(kepfeldolgozas_munkas, adat, utvonal, self.perspektiva, self.zajszures,
+                                              duplikatum_index, profil, jeloles_kuszob, kivagas_skala,
+                                              csak_jelzettek, self.geometria_profil, gyorsitotar_hely, urlapmodell)
+                    else:
+                        jovo = keszlet.submit(kepfeldolgozas_pufferbol_munkas, adat, utvonal,
+                                              self.perspektiva, self.zajszures, duplikatum_index, profil,
+                                              jeloles_kuszob, kivagas_skala, csak_jelzettek,
+                                              self.geometria_profil, gyorsitotar_hely, urlapmodell)
+                    eredmeny, ocr_kep, negyzetek, lap_profil, kivagasok = jovo.result()
+                    if gyorsitotar_hely is not None:
+                        lapgyorsitotar.rogzites(tarolt[0], tarolt[1])
+                    if lap_profil is not None:
+                        profilozo.egyesites(lap_profil)
+                    if kivagasok is not None:
+                        kivagasok_lapok[eredmeny["kep_fajl"]] = kivagasok
+                    if _kihagyott_duplikatum(eredmeny):
+                        # Nincs mit felismerni: egyenesen az íróhoz megy, ami csak naplózza
+                        iro_sor.put((eredmeny, negyzetek))
+                    elif ocr_kep is None:
+                        # Többoldalas dolgozat további oldala: a Neptun kód az első oldalról jön
+                        eredmeny["ocr_ido"] = 0.0
+                        iro_sor.put((eredmeny, negyzetek))
+                    else:
+                        ocr_sor.put((eredmeny, ocr_kep, negyzetek))
+                except ElutasitottLap as e:
+                    print(f"[!] Elutasítva, kézi feldolgozás szükséges ({os.path.basename(utvonal)}): {e}")
+                    self.elutasitott_lapok.append((utvonal, str(e)))
+                except Exception as e:
+                    print(f"[!] Képfeldolgozási hiba ({os.path.basename(utvonal)}): {e}")
+                finally:
+                    if hely is not None:
+                        puffer.felszabaditas(hely)
+
+        def ocr():
+            # Egy lap hibája ne állítsa le a szálat: különben az ocr_sor megtelik, és a futószalag megáll
+            while (elem := ocr_sor.get()) is not _VEGE:
+                eredmeny, ocr_kep, negyzetek = elem
+                kezdes = time.perf_counter()
+                # Szálból nem szabad a stdout-ot átirányítani (globális): a felismerés csendes módban fut
+                try:
+                    with profilozo.szakasz(eredmeny["kep_fajl"], "neptun_ocr") if profil else contextlib.nullcontext():
+                        if self.nevsor is None:
+                            eredmeny["neptun_kod"] = TesztlapKiertekelo.neptun_ocr(ocr_kep, self.tesseract_path,
+                                                                                  csendes=True)
+                        else:
+                            illesztes = TesztlapKiertekelo.neptun_ocr_nevsorral(ocr_kep, self.nevsor,
+                                                                                self.tesseract_path, csendes=True)
+                            eredmeny["neptun_kod"] = illesztes.pop("neptun_kod")
+                            eredmeny["neptun_illesztes"] = illesztes
+                except Exception as e:
+                    _ocr_hiba(eredmeny, e)
+                eredmeny["ocr_ido"] = round(time.perf_counter() - kezdes, 3)
+                iro_sor.put((eredmeny, negyzetek))
+
+        def knn_ocr():
+            from neptun_felismero import alap_felismero
+            felismero = alap_felismero()
+
+            def koteg_olvasasa(koteg):
+                felismert = felismero.felismeres_kotegben([ocr_kep for _, ocr_kep, _ in koteg],
+                                                          nyers=self.nevsor is not None)
+                if self.nevsor is not None:
+                    # Az illeszthető lapok kész vannak; csak a többit olvassuk újra, egyenként
+                    for (eredmeny, ocr_kep, _), (olvasat, _) in zip(koteg, felismert):
+                        illesztes = TesztlapKiertekelo.neptun_ocr_nevsorral(
+                            ocr_kep, self.nevsor, motor="knn", elso_olvasat=olvasat, csendes=True)
+                        eredmeny["neptun_kod"] = illesztes.pop("neptun_kod")
+                        eredmeny["neptun_illesztes"] = illesztes
+                else:
+                    for (eredmeny, _, _), (neptun_kod, _) in zip(koteg, felismert):
+                        eredmeny["neptun_kod"] = neptun_kod
+
+            vege = False
+            while not vege:
+                elem = ocr_sor.get()
+                if elem is _VEGE:
+                    break
+                # A sorban már várakozó lapokat is felvesszük, és egyetlen osztályozással dolgozzuk fel
+                koteg = [elem]
+                while len(koteg) < self.sor_meret:
+                    try:
+                        elem = ocr_sor.get_nowait()
+                    except queue.Empty:
+                        break
+                    if elem is _VEGE:
+                        vege = True
+                        break
+                    koteg.append(elem)
+                kezdes = time.perf_counter()
+                # A kötegelt osztályozás nem bontható lapokra: a függvényeit lap nélkül mérjük,
+                # a lapokhoz az egy lapra jutó időt írjuk
+                with profilozo.szakasz(None, "neptun_ocr") if profil else contextlib.nullcontext():
+                    # Egy lap hibája ne állítsa le a szálat (különben a futószalag megáll), és ne vigye
+                    # magával a köteg többi lapját: hiba esetén laponként újra, a hibás lap "HIBA" lesz
+                    try:
+                        koteg_olvasasa(koteg)
+                    except Exception:
+                        for elem in koteg:
+                            try:
+                                koteg_olvasasa([elem])
+                            except Exception as e:
+                                _ocr_hiba(elem[0], e)
+                ido = (time.perf_counter() - kezdes) / len(koteg)
+                for eredmeny, _, negyzetek in koteg:
+                    if profil:
+                        profilozo.ido_hozzaadasa(eredmeny["kep_fajl"], "neptun_ocr", ido)
+                    eredmeny["ocr_ido"] = round(ido, 3)
+                    iro_sor.put((eredmeny, negyzetek))
+
+        def lap_irasa(eredmeny: Dict, negyzetek: List[Tuple]):
+            """Egy kész lap felvétele a gyűjteményekbe, mentése és naplózása (az író szálon)."""
+            duplikatum = eredmeny.get("duplikatum")
+            if duplikatum is not None and duplikatum["kihagyva"]:
+                print(f"[!] {os.path.basename(eredmeny['kep_fajl'])}: duplikátum "
+                      f"({os.path.basename(duplikatum['eredeti'])}), kihagyva")
+                return
+            if tomor is not None:
+                tomor.hozzaadas(eredmeny, negyzetek)
+            else:
+                eredmenyek.append(eredmeny)
+            kivagasok = kivagasok_lapok.pop(eredmeny["kep_fajl"], None)
+            if kontaktlap is not None and kivagasok:
+                kontaktlap.hozzaadas(eredmeny, kivagasok)
+            if ellenorzesi_sor is not None and kivagasok:
+                ellenorzesi_sor.hozzaadas(eredmeny, kivagasok)
+            if lap_statisztika is not None:
+                lap_statisztika.hozzaadas(osszevetes(eredmeny, self.javitokulcs))
+            if self.kimeneti_mappa:
+                try:
+                    TesztlapKiertekelo.eredmeny_mentese(eredmeny, self.kimeneti_mappa, csendes=True)
+                except OSError as e:
+                    print(f"[!] Mentési hiba ({os.path.basename(eredmeny['kep_fajl'])}): {e}")
+            print(f"[+] {os.path.basename(eredmeny['kep_fajl'])}: {eredmeny['neptun_kod']} "
+                  f"(kép: {eredmeny['feldolgozasi_ido']:.2f} s, OCR: {eredmeny['ocr_ido']:.2f} s)")
+            if duplikatum is not None:
+                print(f"[!] {os.path.basename(eredmeny['kep_fajl'])}: valószínűleg duplikátum "
+                      f"({os.path.basename(duplikatum['eredeti'])})")
+
+        def iro():
+            # Egy lap hibája (pl. tömör tároló, áttekintés, statisztika) ne állítsa le az írót: különben
+            # az iro_sor megtelik, és az egész futószalag megáll
+            while (elem := iro_sor.get()) is not _VEGE:
+                eredmeny, negyzetek = elem
+                try:
+                    lap_irasa(eredmeny, negyzetek)
+                except Exception as e:
+                    print(f"[!] Írási hiba ({os.path.basename(eredmeny['kep_fajl'])}): {type(e).__name__}: {e}")
+
+        lepcsok = [
+            (olvaso, self.olvasok, utvonal_sor),
+            (kepfeldolgozo, self.kepfeldolgozok, nyers_sor),
+            (knn_ocr if self.neptun_motor == "knn" else ocr, self.ocr_szalak, ocr_sor),
+            (iro, 1, iro_sor),
+        ]
+        szalak = []
+        for cel, darab, _ in lepcsok:
+            szalak.append([threading.Thread(target=cel, daemon=True) for _ in range(darab)])
+            for sz in szalak[-1]:
+                sz.start()
+
+        try:
+            # Lépcsőnként lezárjuk a futószalagot: ha egy lépcső összes szála végzett,
+            # a következő lépcső minden szála kap egy záró jelet
+            for i, (_, darab, bemenet) in enumerate(lepcsok):
+                for _ in range(darab):
+                    bemenet.put(_VEGE)
+                for sz in szalak[i]:
+                    sz.join()
+        finally:
+            keszlet.shutdown(wait=True)
+            if puffer is not None:
+                puffer.lezaras()
+            if kezelo is not None:
+                kezelo.shutdown()
+            if lapgyorsitotar is not None:
+                lapgyorsitotar.lezaras()
+                self.gyorsitotar_talalatok = lapgyorsitotar.talalatok
+                self.gyorsitotar_hianyok = lapgyorsitotar.hianyok
+
+        if self.elutasitott_lapok and self.kimeneti_mappa:
+            os.makedirs(self.kimeneti_mappa, exist_ok=True)
+            with open(os.path.join(self.kimeneti_mappa, "elutasitott.txt"), 'a', encoding='utf-8') as f:
+                for utvonal, ok in self.elutasitott_lapok:
+                    f.write(f"{utvonal}\t{ok}\n")
+        if kontaktlap is not None:
+            self.attekinto_fajlok = kontaktlap.lezaras()
+        if ellenorzesi_sor is not None:
+            self.ellenorzesi_tetelek = ellenorzesi_sor.uj_tetelek
+
+        if self.kalibracio_eredmeny is not None and self.kimeneti_mappa:
+            os.makedirs(self.kimeneti_mappa, exist_ok=True)
+            with open(os.path.join(self.kimeneti_mappa, "kalibracio.json"), 'w', encoding='utf-8') as f:
+                json.dump(self.kalibracio_eredmeny, f, ensure_ascii=False, indent=2)
+
+        if self.tobboldalas:
+            self._dolgozatok_osszefuzese(tomor if tomor is not None else eredmenyek, utvonalak)
+
+        if self.statisztika is not None and self.kimeneti_mappa:
+            os.makedirs(self.kimeneti_mappa, exist_ok=True)
+            self.statisztika.mentes(os.path.join(self.kimeneti_mappa, "statisztika.json"))
+
+        return tomor if tomor is not None else eredmenyek
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tesztlapok kötegelt kiértékelése futószalaggal")
+    parser.add_argument("kepek", nargs="+", help="Képfájlok vagy glob minták")
+    parser.add_argument("--olvasok", type=int, default=2, help="Fájlolvasó szálak száma")
+    parser.add_argument("--kepfeldolgozok", type=int, default=None, help="Képfeldolgozó folyamatok száma")
+    parser.add_argument("--ocr-szalak", type=int, default=2, help="Párhuzamos Tesseract hívások száma")
+    parser.add_argument("--sor-meret", type=int, default=8, help="A lépcsők közötti sorok mérete")
+    parser.add_argument("--kimenet", default="eredmenyek")
+    parser.add_argument("--tesseract-path", default=None)
+    parser.add_argument("--osztott-memoria", action="store_true",
+                        help="Dekódolt lapok átadása osztott memórián keresztül")
+    parser.add_argument("--neptun-motor", choices=["tesseract", "knn"], default="tesseract",
+                        help="Neptun kód felismerő")
+    parser.add_argument("--tomor", metavar="NPZ", default=None,
+                        help="Az összes eredmény mentése egy tömör .npz fájlba is")
+    parser.add_argument("--nevsor", default=None,
+                        help="A kurzus névsora (soronként egy Neptun kód, vagy CSV \"neptun\" oszloppal)")
+    parser.add_argument("--duplikatumok", choices=["jelzes", "kihagyas"], default=None,
+                        help="Újraszkennelt / duplán behúzott lapok jelzése vagy kihagyása")
+    parser.add_argument("--profile", metavar="MAPPA", default=None,
+                        help="Szakaszonkénti profilozás; a jelentés és a flamegraph fájl ebbe a mappába kerül")
+    parser.add_argument("--kontur-korlat", type=int, default=None,
+                        help="Ennyi kontúr fölött a lap a zajtűrő keretkeresésre vált, ha ott is, elutasítva")
+    parser.add_argument("--kalibracio", metavar="N", type=int, default=None,
+                        help="A jelölési küszöb kalibrálása az első N lap (0: az összes) kitöltési arányaiból")
+    parser.add_argument("--attekintes", metavar="MAPPA", default=None,
+                        help="Kicsinyített kérdéskivágásokból álló kontakt lapok kézi ellenőrzéshez")
+    parser.add_argument("--attekintes-elrendezes", choices=ELRENDEZESEK, default="lapok",
+                        help="Kontakt lap elrendezés: laponként egy sor, vagy kérdésenként külön csík")
+    parser.add_argument("--ellenorzes", metavar="MAPPA", default=None,
+                        help="A megjelölt válaszok kivágásai kézi ellenőrzési sorba (kivágások + index.jsonl)")
+    parser.add_argument("--tobboldalas", action="store_true",
+                        help="Oldaljelölős többoldalas dolgozatok: az oldalak összefűzése tanulónként")
+    parser.add_argument("--geometria-profil", metavar="FAJL", default=None,
+                        help="Az űrlap geometriai profilja (JSON/TOML, lásd geometriaprofil.py)")
+    parser.add_argument("--gyorsitotar", metavar="MAPPA", default=None,
+                        help="Előfeldolgozott lapok gyorsítótára: újrafuttatáskor a dekódolás és az igazítás kimarad")
+    parser.add_argument("--javitokulcs", metavar="FAJL", default=None,
+                        help="Javítókulcs (mentett eredmény JSON vagy a megoldólap képe): pontozás és statisztika")
+    parser.add_argument("--urlapmodell", metavar="FAJL", default=None,
+                        help="Űrlapmodell: ha létezik, betölti, különben az első hibátlan lapból ide menti")
+    args = parser.parse_args()
+
+    nevsor = None
+    if args.nevsor:
+        from nevsor import Nevsor
+        nevsor = Nevsor.betoltes(args.nevsor)
+        print(f"[*] Névsor betöltve: {len(nevsor)} Neptun kód")
+
+    javitokulcs = None
+    if args.javitokulcs:
+        try:
+            javitokulcs = javitokulcs_betoltese(args.javitokulcs, args.tesseract_path)
+        except (OSError, ValueError) as e:
+            print(f"[!] Hibás javítókulcs: {e}")
+            return
+
+    utvonalak = sorted({u for minta in args.kepek for u in (glob.glob(minta) or [minta])})
+    try:
+        futoszalag = Futoszalag(args.olvasok, args.kepfeldolgozok, args.ocr_szalak, args.sor_meret,
+                                args.kimenet, args.tesseract_path, osztott_memoria=args.osztott_memoria,
+                                tomor=args.tomor is not None, neptun_motor=args.neptun_motor, nevsor=nevsor,
+                                duplikatumok=args.duplikatumok, profilozo=Profilozo() if args.profile else None,
+                                kontur_korlat=args.kontur_korlat, kalibracio=args.kalibracio,
+                                attekintes=args.attekintes, attekintes_elrendezes=args.attekintes_elrendezes,
+                                ellenorzes=args.ellenorzes, tobboldalas=args.tobboldalas,
+                                geometria_profil=args.geometria_profil, gyorsitotar=args.gyorsitotar,
+                                javitokulcs=javitokulcs, urlapmodell=args.urlapmodell)
+    except FileNotFoundError as e:
+        print(f"[!] {e}")
+        return
+
+    kezdes = time.perf_counter()
+    eredmenyek = futoszalag.futtatas(utvonalak)
+    ido = time.perf_counter() - kezdes
+    print(f"\n[*] {len(eredmenyek)}/{len(utvonalak)} lap kiértékelve {ido:.2f} s alatt "
+          f"({len(eredmenyek) / ido if ido > 0 else 0:.2f} lap/s)")
+    if futoszalag.elutasitott_lapok:
+        print(f"[!] {len(futoszalag.elutasitott_lapok)} lap elutasítva (túl zajos), lásd: "
+              f"{os.path.join(args.kimenet, 'elutasitott.txt') if args.kimenet else 'a fenti naplót'}")
+    if args.tomor:
+        eredmenyek.mentes(args.tomor)
+        print(f"[+] Tömör eredmények mentve: {args.tomor}")
+    if args.gyorsitotar:
+        print(f"[*] Lapgyorsítótár: {futoszalag.gyorsitotar_talalatok} találat, "
+              f"{futoszalag.gyorsitotar_hianyok} új lap ({args.gyorsitotar})")
+    if futoszalag.attekinto_fajlok:
+        print(f"[+] {len(futoszalag.attekinto_fajlok)} áttekintő oldal: {args.attekintes}")
+    if args.ellenorzes:
+        print(f"[+] {futoszalag.ellenorzesi_tetelek} kérdés az ellenőrzési sorban: {args.ellenorzes}")
+    if args.tobboldalas:
+        print(f"[+] {len(futoszalag.dolgozatok)} dolgozat összefűzve "
+              f"({len(futoszalag.oldal_problemak)} oldalprobléma)")
+    if futoszalag.statisztika is not None:
+        print(f"\n{futoszalag.statisztika.jelentes()}")
+        if args.kimenet:
+            print(f"[+] Statisztika mentve: {os.path.join(args.kimenet, 'statisztika.json')}")
+    if futoszalag.profilozo is not None:
+        print(f"[+] Profil jelentés: {futoszalag.profilozo.jelentes_irasa(args.profile)}")
+
+
+if __name__ == "__main__":
+    main()
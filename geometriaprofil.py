@@ -0,0 +1,240 @@
+"""
+Űrlap geometriai profilok: a detektorok méret- és helyküszöbei egy verziózott fájlban.
+
+A küszöbök egy referencia lapszélességhez (alapértelmezés: 600 px = A4 72 DPI-n) vannak megadva;
+a területek a skála négyzetével, a hosszak a skálával szorzódnak. A kiértékelő ezeket nem
+számolja újra minden hívásnál: a `GeometriaProfil.kuszobok(szelesseg)` lapszélességenként
+egyszer számolja ki a pixelben mért küszöböket (`SkalazottKuszobok`), és megjegyzi őket.
+
+A profil JSON vagy TOML fájl; csak az alapértelmezéstől eltérő értékeket kell megadni:
+
+    {
+        "verzio": 1,
+        "nev": "ket_oszlopos_urlap",
+        "kerdestipus": {"ih_max_magassag": 95},
+        "feleletvalasztos": {"regio_szelesseg": 0.45}
+    }
+
+A `profil_betoltese` útvonal és módosítási idő szerint gyorsítótáraz, így a kötegelt feldolgozás
+(munkásfolyamatonként) űrlaptípusonként egyszer olvassa be és skálázza a profilt.
+
+    python geometriaprofil.py profilok/urlap.json --szelesseg 2480
+    python geometriaprofil.py --minta alap.json
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import threading
+from typing import Dict, Tuple
+
+
+PROFIL_VERZIO = 1
+
+# A feleletválasztós válaszok betűvel (A..Z) jelöltek, és a tömör tároló is így kódolja őket
+MAX_FV_VALASZOK = 26
+
+ALAP_PROFIL = {
+    "verzio": PROFIL_VERZIO,
+    "nev": "alap",
+    # Ehhez a lapszélességhez (px) tartoznak a lenti pixelértékek
+    "referencia_szelesseg": 600,
+    "sarokjelolo": {"min_terulet": 500, "max_terulet": 5000, "min_arany": 0.8, "max_arany": 1.2},
+    "jelolonegyzet": {"min_terulet": 50, "max_terulet": 500, "min_arany": 0.7, "max_arany": 1.3},
+    # A keret befoglaló téglalapjának területe, minimális szélesség/magasság aránya, és a
+    # zajtűrő keretkeresés vonalhossza
+    "keret": {"min_terulet": 10000, "min_oldalarany": 2.0, "vonalhossz": 15},
+    # Ennél alacsonyabb keret igaz/hamis, különben feleletválasztós kérdés
+    "kerdestipus": {"ih_max_magassag": 80},
+    # A négyzetek keresési sávja a keret szélességének arányában
+    "igaz_hamis": {"regio_x": 0.6, "regio_szelesseg": 0.4},
+    "feleletvalasztos": {"regio_x": 0.0, "regio_szelesseg": 0.3, "max_valaszok": 4},
+    "neptun": {
+        # A keresési terület és a becsült hely (ha nincs keret) a lap méretének arányában
+        "keresesi_terulet": [0.5, 0.0, 1.0, 0.2],  # x0, y0, x1, y1
+        "becsult_terulet": [0.65, 0.02, 0.30, 0.05],  # x, y, w, h
+        "min_terulet": 2000, "max_terulet": 10000, "min_arany": 1.5, "max_arany": 6.0,
+    },
+}
+
+
+class SkalazottKuszobok:
+    """Egy profil küszöbei egy adott lapszélességre, pixelben. Csak olvasásra."""
+
+    def __init__(self, profil: Dict, szelesseg: int):
+        skala = szelesseg / profil["referencia_szelesseg"]
+        terulet = skala * skala
+        self.szelesseg = szelesseg
+        self.skala = skala
+
+        sarok = profil["sarokjelolo"]
+        self.sarok_min_terulet = int(sarok["min_terulet"] * terulet)
+        self.sarok_max_terulet = int(sarok["max_terulet"] * terulet)
+        self.sarok_arany = (sarok["min_arany"], sarok["max_arany"])
+
+        negyzet = profil["jelolonegyzet"]
+        self.negyzet_min_terulet = int(negyzet["min_terulet"] * terulet)
+        self.negyzet_max_terulet = int(negyzet["max_terulet"] * terulet)
+        self.negyzet_arany = (negyzet["min_arany"], negyzet["max_arany"])
+
+        keret = profil["keret"]
+        self.keret_min_terulet = int(keret["min_terulet"] * terulet)
+        self.keret_min_oldalarany = keret["min_oldalarany"]
+        # Páratlan, mert adaptív küszöbölés blokkmérete is
+        self.keretvonal_hossz = int(keret["vonalhossz"] * skala) | 1
+
+        self.ih_max_magassag = int(profil["kerdestipus"]["ih_max_magassag"] * skala)
+        self.ih_regio = (profil["igaz_hamis"]["regio_x"], profil["igaz_hamis"]["regio_szelesseg"])
+        self.fv_regio = (profil["feleletvalasztos"]["regio_x"], profil["feleletvalasztos"]["regio_szelesseg"])
+        self.fv_max_valaszok = int(profil["feleletvalasztos"]["max_valaszok"])
+
+        neptun = profil["neptun"]
+        self.neptun_keresesi_terulet = tuple(neptun["keresesi_terulet"])
+        self.neptun_becsult_terulet = tuple(neptun["becsult_terulet"])
+        self.neptun_min_terulet = int(neptun["min_terulet"] * terulet)
+        self.neptun_max_terulet = int(neptun["max_terulet"] * terulet)
+        self.neptun_arany = (neptun["min_arany"], neptun["max_arany"])
+
+    def __repr__(self) -> str:
+        return f"SkalazottKuszobok({self.szelesseg} px, skála {self.skala:.3f})"
+
+
+def _osszefesules(alap: Dict, feluliras: Dict, utvonal: str = "") -> Dict:
+    """Az alapértelmezett profil és a fájlban megadott értékek összefésülése, ismeretlen kulcsnál hibával."""
+    eredmeny = copy.deepcopy(alap)
+    for kulcs, ertek in feluliras.items():
+        teljes = f"{utvonal}{kulcs}"
+        if kulcs not in alap:
+            raise ValueError(f"Ismeretlen profilbeállítás: {teljes}")
+        if isinstance(alap[kulcs], dict):
+            if not isinstance(ertek, dict):
+                raise ValueError(f"A(z) {teljes} beállításnak szakasznak kell lennie")
+            eredmeny[kulcs] = _osszefesules(alap[kulcs], ertek, f"{teljes}.")
+        elif isinstance(alap[kulcs], list):
+            if not isinstance(ertek, list) or len(ertek) != len(alap[kulcs]):
+                raise ValueError(f"A(z) {teljes} beállítás {len(alap[kulcs])} elemű lista")
+            eredmeny[kulcs] = [float(e) for e in ertek]
+        elif isinstance(alap[kulcs], str):
+            eredmeny[kulcs] = str(ertek)
+        else:
+            if isinstance(ertek, bool) or not isinstance(ertek, (int, float)):
+                raise ValueError(f"A(z) {teljes} beállításnak számnak kell lennie: {ertek!r}")
+            eredmeny[kulcs] = ertek
+    return eredmeny
+
+
+class GeometriaProfil:
+
+    def __init__(self, beallitasok: Dict = None, forras: str = None):
+        """
+        A `beallitasok` az alapértelmezett profilt felülíró (részleges) szótár. Eltérő
+        `verzio`, ismeretlen kulcs vagy rossz típus esetén ValueError.
+        """
+        beallitasok = beallitasok or {}
+        verzio = beallitasok.get("verzio", PROFIL_VERZIO)
+        if verzio != PROFIL_VERZIO:
+            raise ValueError(f"Nem támogatott profil verzió: {verzio} (támogatott: {PROFIL_VERZIO})"
+                             + (f": {forras}" if forras else ""))
+        self.beallitasok = _osszefesules(ALAP_PROFIL, beallitasok)
+        if self.beallitasok["referencia_szelesseg"] <= 0:
+            raise ValueError("A referencia_szelesseg pozitív kell legyen")
+        max_valaszok = self.beallitasok["feleletvalasztos"]["max_valaszok"]
+        if max_valaszok != int(max_valaszok) or not 2 <= max_valaszok <= MAX_FV_VALASZOK:
+            raise ValueError(f"A feleletvalasztos.max_valaszok 2 és {MAX_FV_VALASZOK} közötti egész kell legyen: "
+                             f"{max_valaszok}")
+        self.nev = self.beallitasok["nev"]
+        self.forras = forras
+        # Lapszélesség -> kiszámolt küszöbök
+        self._kuszobok: Dict[int, SkalazottKuszobok] = {}
+
+    def kuszobok(self, szelesseg: int) -> SkalazottKuszobok:
+        """A megadott szélességű (px) lapra skálázott küszöbök; szélességenként egyszer számolódnak."""
+        kuszobok = self._kuszobok.get(szelesseg)
+        if kuszobok is None:
+            kuszobok = self._kuszobok[szelesseg] = SkalazottKuszobok(self.beallitasok, szelesseg)
+        return kuszobok
+
+    def to_dict(self) -> Dict:
+        return copy.deepcopy(self.beallitasok)
+
+    def mentes(self, utvonal: str):
+        with open(utvonal, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def fajlbol(cls, utvonal: str) -> "GeometriaProfil":
+        """Profil beolvasása JSON vagy (.toml kiterjesztésnél) TOML fájlból."""
+        if utvonal.lower().endswith(".toml"):
+            try:
+                import tomllib
+            except ImportError:  # Python < 3.11
+                raise ImportError("TOML profilhoz Python 3.11+ (tomllib) kell; használj JSON profilt")
+            with open(utvonal, 'rb') as f:
+                beallitasok = tomllib.load(f)
+        else:
+            with open(utvonal, 'r', encoding='utf-8') as f:
+                beallitasok = json.load(f)
+        return cls(beallitasok, forras=utvonal)
+
+    def __repr__(self) -> str:
+        return f"GeometriaProfil({self.nev!r}" + (f", {self.forras}" if self.forras else "") + ")"
+
+
+_ALAPERTELMEZETT = GeometriaProfil()
+
+# (abszolút útvonal) -> (módosítási idő, profil)
+_profilok: Dict[str, Tuple[float, GeometriaProfil]] = {}
+_profilok_zar = threading.Lock()
+
+
+def alapertelmezett_profil() -> GeometriaProfil:
+    return _ALAPERTELMEZETT
+
+
+def profil_betoltese(utvonal: str = None) -> GeometriaProfil:
+    """
+    A profil betöltése útvonal szerint gyorsítótárazva (a fájl módosításakor újraolvassa).
+    `utvonal=None` esetén az alapértelmezett profil.
+    """
+    if not utvonal:
+        return _ALAPERTELMEZETT
+    utvonal = os.path.abspath(utvonal)
+    modositas = os.path.getmtime(utvonal)
+    with _profilok_zar:
+        tarolt = _profilok.get(utvonal)
+        if tarolt is not None and tarolt[0] == modositas:
+            return tarolt[1]
+    profil = GeometriaProfil.fajlbol(utvonal)
+    with _profilok_zar:
+        _profilok[utvonal] = (modositas, profil)
+    return profil
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Geometriai profil ellenőrzése és a skálázott küszöbök kiírása")
+    parser.add_argument("profil", nargs="?", default=None, help="Profilfájl (JSON/TOML); alapértelmezés: beépített")
+    parser.add_argument("--szelesseg", type=int, action="append", default=None,
+                        help="Lapszélesség (px), amire a küszöböket kiírjuk (többször is megadható)")
+    parser.add_argument("--minta", metavar="JSON", default=None, help="A teljes (összefésült) profil mentése")
+    args = parser.parse_args()
+
+    try:
+        profil = profil_betoltese(args.profil)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"[!] Hibás profil: {e}")
+        return 1
+    print(f"[+] {profil}")
+    from kiertekelo import TesztlapKiertekelo
+    for szelesseg in args.szelesseg or [600, TesztlapKiertekelo.KANONIKUS_SZELESSEG, 2480]:
+        print(f"\n{profil.kuszobok(szelesseg)}")
+        for nev, ertek in vars(profil.kuszobok(szelesseg)).items():
+            print(f"   {nev:<26}{ertek}")
+    if args.minta:
+        profil.mentes(args.minta)
+        print(f"\n[+] Profil mentve: {args.minta}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+A jelölési küszöb kalibrálása egy köteg kitöltési arányaiból.
+
+A rögzített `JELOLES_KUSZOB` egy adott szkennerhez és tollhoz van hangolva; más
+beállításnál (világosabb toll, sötétebb papír, más felbontás) az üres és a bejelölt
+négyzetek arányai eltolódnak. A köteg első N lapjának (vagy az összesnek) arányaiból
+Otsu módszerével két osztályra bontunk, és az így kapott küszöbbel értékeljük a lapokat.
+
+Ha a minta nem ad egyértelmű kettéválást (kevés négyzet, szinte csak üres vagy csak
+bejelölt négyzet, gyenge elkülönülés, vagy a küszöb a megengedett tartományon kívül
+esik), az alapértelmezett küszöb marad, és az ok bekerül a kalibrációs eredménybe.
+"""
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+
+# Az arányok hisztogramjának felbontása a [0, 1] intervallumon
+HISZTOGRAM_BINEK = 200
+# Ennél kevesebb négyzetből nem kalibrálunk
+MIN_MINTA = 20
+# Mindkét osztályba (üres / bejelölt) a négyzetek legalább ekkora része essen
+MIN_OSZTALY_ARANY = 0.02
+# Otsu elkülönülési mérték (osztályok közötti / teljes variancia) alsó határa;
+# egyenletes eloszlásnál (nincs két csúcs) is 0.75, ezért ennél szigorúbb
+MIN_ELKULONULES = 0.8
+# A kalibrált küszöb csak ebben a tartományban fogadható el
+KUSZOB_TARTOMANY = (0.15, 0.50)
+
+
+def otsu_kuszob(aranyok: np.ndarray, binek: int = HISZTOGRAM_BINEK) -> Tuple[float, float]:
+    """
+    Otsu küszöb a [0, 1] közötti arányokra. Visszaad: (küszöb, elkülönülés 0..1).
+    Ha több szomszédos küszöb is maximális osztályközi varianciát ad (üres sáv a két
+    csúcs között), a sáv közepét választjuk, így a küszöb mindkét osztálytól távol esik.
+    """
+    hiszt, hatarok = np.histogram(np.clip(aranyok, 0.0, 1.0), bins=binek, range=(0.0, 1.0))
+    p = hiszt / max(1, hiszt.sum())
+    kozep = (hatarok[:-1] + hatarok[1:]) / 2
+
+    w0 = np.cumsum(p)
+    mu0 = np.cumsum(p * kozep)
+    mu = mu0[-1]
+    nevezo = w0 * (1.0 - w0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kozotti = np.where(nevezo > 0, (mu * w0 - mu0) ** 2 / nevezo, 0.0)
+
+    teljes = float(np.sum(p * (kozep - mu) ** 2))
+    legjobb = float(kozotti.max())
+    if teljes <= 0 or legjobb <= 0:
+        return float(hatarok[binek // 2]), 0.0
+    # A k. bin utáni határ a küszöb: a k. binig tartó arányok az "üres" osztály
+    maximumok = np.flatnonzero(kozotti >= legjobb * (1 - 1e-9))
+    kuszob = (hatarok[maximumok[0] + 1] + hatarok[maximumok[-1] + 1]) / 2
+    return float(kuszob), legjobb / teljes
+
+
+def kalibralas(aranyok: Iterable[float], alapertelmezett: float, lapok: int = None) -> Dict:
+    """
+    Küszöb kalibrálása a kitöltési arányokból. Visszaad (JSON-ba menthető):
+    {"kuszob": a használandó küszöb, "elfogadva": a kalibrált küszöb használható-e,
+     "ok": elutasításnál az ok, "otsu_kuszob", "elkulonules", "mintak", "lapok",
+     "jelolt_arany": a kalibrált küszöb fölé eső négyzetek aránya, "alapertelmezett"}.
+    """
+    aranyok = np.asarray(list(aranyok), dtype=np.float64)
+    eredmeny = {"kuszob": alapertelmezett, "elfogadva": False, "ok": None, "otsu_kuszob": None,
+                "elkulonules": None, "mintak": int(aranyok.size), "lapok": lapok,
+                "jelolt_arany": None, "alapertelmezett": alapertelmezett}
+    if aranyok.size < MIN_MINTA:
+        eredmeny["ok"] = f"kevés minta ({aranyok.size} < {MIN_MINTA})"
+        return eredmeny
+
+    kuszob, elkulonules = otsu_kuszob(aranyok)
+    jelolt_arany = float(np.mean(aranyok > kuszob))
+    eredmeny.update(otsu_kuszob=round(kuszob, 4), elkulonules=round(elkulonules, 4),
+                    jelolt_arany=round(jelolt_arany, 4))
+
+    if min(jelolt_arany, 1 - jelolt_arany) < MIN_OSZTALY_ARANY:
+        eredmeny["ok"] = "szinte csak üres vagy csak bejelölt négyzet"
+    elif elkulonules < MIN_ELKULONULES:
+        eredmeny["ok"] = f"gyenge elkülönülés ({elkulonules:.2f} < {MIN_ELKULONULES})"
+    elif not KUSZOB_TARTOMANY[0] <= kuszob <= KUSZOB_TARTOMANY[1]:
+        eredmeny["ok"] = f"a küszöb ({kuszob:.3f}) a {KUSZOB_TARTOMANY} tartományon kívül esik"
+    else:
+        eredmeny["kuszob"] = round(kuszob, 4)
+        eredmeny["elfogadva"] = True
+    return eredmeny
@@ -1,39 +1,182 @@
+import argparse
 import traceback
+import contextlib
 import cv2
 import numpy as np
 from typing import List, Tuple, Dict
-import pytesseract
+import hashlib
 import json
 import re
 import os
 import sys
 from datetime import datetime
+from geometriaprofil import GeometriaProfil, alapertelmezett_profil, profil_betoltese
+from urlapmodell import Urlapmodell
 
 
 
-class TesztlapKiertekelo:
+def _pytesseract(tesseract_path: str = None):
+    """
+    A pytesseract (és a vele járó PIL) csak az első Tesseract híváskor töltődik be: a geometriai
+    kiértékeléshez, a kNN motorhoz és a munkásfolyamatok indításához nem kell.
+    """
+    import pytesseract
     
-    def __init__(self, kep_utvonal: str, tesseract_path: str = None, zajszures: bool = True):
+    if tesseract_path:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_path
+    return pytesseract
+
+
+class ElutasitottLap(ValueError):
+    """A lap megbízhatóan nem értékelhető ki (pl. túl zajos), kézi feldolgozásra kell küldeni."""
+
+
+class TesztlapKiertekelo:
+
+    # Kanonikus lapméret: A4 150 DPI-n. A perspektíva korrekció után minden
+    # detektor ebben a térben dolgozik, így a küszöbök és a futási idő
+    # függetlenek a szkenner felbontásától.
+    KANONIKUS_SZELESSEG = 1240
+    KANONIKUS_MAGASSAG = 1754
+    SKALA = KANONIKUS_SZELESSEG / 600  # 600 px = 72 DPI A4 szélesség
+
+    # A perspektíva korrekció célpontjai (bal felső, jobb felső, bal alsó, jobb alsó)
+    CEL_SARKOK = np.float32([
+        [0, 0],
+        [KANONIKUS_SZELESSEG, 0],
+        [0, KANONIKUS_MAGASSAG],
+        [KANONIKUS_SZELESSEG, KANONIKUS_MAGASSAG]
+    ])
+
+    # Neptun OCR: a kivágást az eredeti (szkennelt) felbontáshoz képest 2.5x-re nagyítjuk
+    NEPTUN_OCR_NAGYITAS = 2.5
+
+    # Jelölőnégyzet kitöltési küszöb és az a sáv körülötte, amelyen belül a
+    # gyors döntést bizonytalannak tekintjük és újraellenőrizzük
+    JELOLES_KUSZOB = 0.30
+    BIZONYTALAN_SAV = 0.10
+
+    # Tartalék igazítás (ha nincs meg mind a 4 sarokjelölő): a ferdeséget ekkora
+    # szélességű kicsinyített képen becsüljük, legfeljebb ekkora szögig
+    FERDESEG_BECSLES_SZELESSEG = 600
+    MAX_FERDESEG = 15.0
+    # A sarokjelölők középpontja a lap szélétől 1 cm-re van (A4: 21 x 29,7 cm)
+    SAROK_MARGO = (1 / 21, 1 / 29.7)
+
+    # Ennyi kontúr fölött (zajos szkennelés) a keretkeresés a zajtűrő éltérképre vált,
+    # és ha ott is ennyi fölött van, a lapot elutasítja
+    KONTUR_KORLAT = 5000
+
+    # Neptun kód felismerő: "tesseract" (külső program) vagy "knn" (beépített, lásd neptun_felismero.py)
+    NEPTUN_MOTOROK = ("tesseract", "knn")
+    NEPTUN_MOTOR = "tesseract"
+    # Névsoros illesztésnél: ha az első olvasat nem illeszthető elég biztosan, ezekkel
+    # az alternatív előfeldolgozásokkal olvassuk újra a kivágást (ebben a sorrendben)
+    NEPTUN_UJRAOLVASASI_VALTOZATOK = ("nyitas", "zaras", "median", "nagyitas")
+
+    def __init__(self, kep_utvonal: str, tesseract_path: str = None, zajszures: bool = True, kep: np.ndarray = None,
+                 neptun_motor: str = None, profilozo=None, jeloles_kuszob: float = None,
+                 profil: GeometriaProfil = None):
+        """
+        A `kep` paraméterrel már dekódolt (BGR) kép is átadható, ilyenkor a `kep_utvonal`
+        csak azonosításra szolgál, a fájlt nem olvassuk be. A `profilozo` (profilozas.Profilozo)
+        megadásakor a kiértékelés szakaszai mérve futnak. A `jeloles_kuszob` a `JELOLES_KUSZOB`
+        helyett használt (pl. kötegre kalibrált, lásd kalibracio.py) kitöltési küszöb.
+        A `profil` (geometriaprofil.GeometriaProfil) az űrlap méret- és helyküszöbei;
+        alapértelmezés a beépített profil.
+        """
         self.kep_utvonal = os.path.abspath(kep_utvonal)
         self.tesseract_path = tesseract_path
+        self.zajszures = zajszures
+        self.neptun_motor = self._neptun_motor_ellenorzese(neptun_motor)
+        self.profilozo = profilozo
+        self.jeloles_kuszob = self.JELOLES_KUSZOB if jeloles_kuszob is None else jeloles_kuszob
+        self.profil = profil or alapertelmezett_profil()
+
+        # Előre lefoglalt munkapufferek (csak az UjrahasznalhatoKiertekelo tölti fel)
+        self.pufferek = {}
 
-        self.kep = cv2.imdecode(np.fromfile(self.kep_utvonal, dtype=np.uint8), cv2.IMREAD_COLOR)
-        if self.kep is None:
+        if kep is None:
+            with self._szakasz("dekodolas"):
+                kep = cv2.imdecode(np.fromfile(self.kep_utvonal, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if kep is None:
             raise ValueError(f"Nem sikerült betölteni a képet: {self.kep_utvonal}")
+        with self._szakasz("betoltes"):
+            self.lap_betoltese(kep)
 
-        self.szurke = cv2.cvtColor(self.kep, cv2.COLOR_BGR2GRAY)
+    def _szakasz(self, nev: str):
+        """A kiértékelés egy szakaszának mérése, ha van profilozó (különben nem csinál semmit)."""
+        if self.profilozo is None:
+            return contextlib.nullcontext()
+        return self.profilozo.szakasz(self.kep_utvonal, nev)
+    
+    def lap_betoltese(self, kep: np.ndarray):
+        """Új lap beállítása és a laponkénti állapot alaphelyzetbe állítása."""
+        self.kep = kep
+        # Ha a puffer mérete nem egyezik, az OpenCV új tömböt foglal - ezért mindig a visszatérési értéket használjuk
+        self.szurke = cv2.cvtColor(self.kep, cv2.COLOR_BGR2GRAY, dst=self.pufferek.get("bemenet"))
 
-        # Zajszűrés alkalmazása (opcionális)
-        if zajszures:
-            self.zajszures_elofeldolgozas()
+        self._lapallapot_alaphelyzetbe()
+        # Az eredeti felbontású lap megmarad (a pufferét a normalizálás nem írja felül): a Neptun kivágás ebből készül
+        self.eredeti_szurke = self.szurke
+
+    def normalizalt_lap_betoltese(self, szurke: np.ndarray):
+        """
+        Már igazított, kanonikus méretű (és ha kell, zajszűrt) szürkeárnyalatos lap beállítása,
+        pl. a lapgyorsítótárból (lapgyorsitotar.py). Az igazítás és a normalizálás kimarad, a
+        színes kép nincs meg (None). A tömb lehet csak olvasható: a kiértékelés nem írja.
+        """
+        self.kep = None
+        self.szurke = szurke
+        self._lapallapot_alaphelyzetbe()
+        self.normalizalva = True
+        self.elofeldolgozva = True
 
+    def _lapallapot_alaphelyzetbe(self):
         self.magassag, self.szelesseg = self.szurke.shape
+        self.normalizalva = False
+        self.elofeldolgozva = False
+        self.eredeti_szurke = None
+        # Az eredeti lap koordinátáit a kanonikus lapra vivő 3x3-as mátrix (a normalizálás után)
+        self.kanonikus_matrix = None
         self.sarkok = []
+        self.ferdeseg = None
         self.neptun_kod = None
+        self.neptun_illesztes = None
         self.debug_checkboxok = []
+        self.bizonyossag = {"igaz_hamis": {}, "feleletvalasztos": {}}
+        self.urlapmodell = None
+        self.urlap_elteresek = []
+        self.kerdes_keretek = []
+        self.ujraellenorzott_negyzetek = 0
+
+    @classmethod
+    def _neptun_motor_ellenorzese(cls, neptun_motor: str) -> str:
+        neptun_motor = neptun_motor or cls.NEPTUN_MOTOR
+        if neptun_motor not in cls.NEPTUN_MOTOROK:
+            raise ValueError(f"Ismeretlen Neptun felismerő: {neptun_motor} (lehetséges: {', '.join(cls.NEPTUN_MOTOROK)})")
+        return neptun_motor
 
-        if tesseract_path:
-            pytesseract.pytesseract.tesseract_cmd = tesseract_path
+    @classmethod
+    def bajtokbol(cls, adat: bytes, nev: str = "<memoria>", tesseract_path: str = None, zajszures: bool = True,
+                  neptun_motor: str = None, profil: GeometriaProfil = None) -> "TesztlapKiertekelo":
+        """Kiértékelő létrehozása a kódolt képfájl tartalmából (pl. feltöltött szken)."""
+        kep = cv2.imdecode(np.frombuffer(adat, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if kep is None:
+            raise ValueError(f"Nem sikerült dekódolni a képet: {nev}")
+        return cls(nev, tesseract_path, zajszures=zajszures, kep=kep, neptun_motor=neptun_motor, profil=profil)
+
+    @classmethod
+    def pufferbol(cls, puffer, alak: Tuple[int, ...], eltolas: int = 0, nev: str = "<puffer>",
+                  tesseract_path: str = None, zajszures: bool = True, neptun_motor: str = None,
+                  profil: GeometriaProfil = None) -> "TesztlapKiertekelo":
+        """
+        Kiértékelő egy meglévő, már dekódolt BGR képet tartalmazó pufferre (pl. osztott memória)
+        másolás nélkül. A puffert a kiértékelés nem módosítja.
+        """
+        kep = np.ndarray(alak, dtype=np.uint8, buffer=puffer, offset=eltolas)
+        kep.flags.writeable = False
+        return cls(nev, tesseract_path, zajszures=zajszures, kep=kep, neptun_motor=neptun_motor, profil=profil)
 
     def zajszures_elofeldolgozas(self):
         """
@@ -43,7 +186,30 @@ class TesztlapKiertekelo:
         """
         # Bilateral szűrő - eltávolítja a zajt, de megőrzi az éleket
         # d=5: kis szűrési terület, sigmaColor=20: enyhe szín küszöb, sigmaSpace=20: enyhe térbeli küszöb
-        self.szurke = cv2.bilateralFilter(self.szurke, d=5, sigmaColor=20, sigmaSpace=20)
+        cel = self.pufferek.get("szurt")
+        if cel is self.szurke:
+            cel = None  # a bilateral szűrő nem dolgozhat helyben
+        self.szurke = cv2.bilateralFilter(self.szurke, d=5, sigmaColor=20, sigmaSpace=20, dst=cel)
+
+    def normalizalas(self):
+        """
+        A lap átméretezése a kanonikus méretre (ha a perspektíva korrekció még nem tette meg),
+        majd a zajszűrés alkalmazása már a kis felbontású képen.
+        """
+        if not self.normalizalva:
+            meret = (self.KANONIKUS_SZELESSEG, self.KANONIKUS_MAGASSAG)
+            # Kicsinyítésnél INTER_AREA, nagyításnál INTER_LINEAR
+            interpolacio = cv2.INTER_AREA if self.szelesseg > self.KANONIKUS_SZELESSEG else cv2.INTER_LINEAR
+            self.kanonikus_matrix = np.diag([self.KANONIKUS_SZELESSEG / self.szelesseg,
+                                             self.KANONIKUS_MAGASSAG / self.magassag, 1.0])
+            self.szurke = cv2.resize(self.szurke, meret, dst=self.pufferek.get("szurke"), interpolation=interpolacio)
+            self.kep = cv2.resize(self.kep, meret, dst=self.pufferek.get("kep"), interpolation=interpolacio)
+            self.magassag, self.szelesseg = self.KANONIKUS_MAGASSAG, self.KANONIKUS_SZELESSEG
+            self.normalizalva = True
+
+        # Zajszűrés alkalmazása (opcionális)
+        if self.zajszures:
+            self.zajszures_elofeldolgozas()
 
     def sarkok_keresese(self) -> List[Tuple[int, int]]:
         _, binarizalt = cv2.threshold(self.szurke, 127, 255, cv2.THRESH_BINARY_INV)
@@ -51,19 +217,18 @@ class TesztlapKiertekelo:
         
         sarok_jelolok = []
         
-        # Skálázási tényező a kép mérete alapján
-        skala = self.szelesseg / 600  # 600 px = 72 DPI A4 szélesség
-        min_terulet = int(500 * skala * skala)
-        max_terulet = int(5000 * skala * skala)
+        # A sarokkeresés még az eredeti felbontáson fut, ezért itt a kép méretére skálázott küszöbök kellenek
+        kuszobok = self.profil.kuszobok(self.szelesseg)
+        min_arany, max_arany = kuszobok.sarok_arany
         
         for kontur in konturok:
             terulet = cv2.contourArea(kontur)
             # Sarokjelölők mérete (skálázva)
-            if min_terulet < terulet < max_terulet:
+            if kuszobok.sarok_min_terulet < terulet < kuszobok.sarok_max_terulet:
                 x, y, w, h = cv2.boundingRect(kontur)
                 # Ellenőrizzük, hogy négyzet alakú-e
                 arany = float(w) / h if h > 0 else 0
-                if 0.8 < arany < 1.2:
+                if min_arany < arany < max_arany:
                     kozeppont = (x + w // 2, y + h // 2)
                     sarok_jelolok.append((kozeppont, terulet))
         
@@ -81,22 +246,125 @@ class TesztlapKiertekelo:
         return self.sarkok
     
     def perspektiva_korrekcio(self):
-        """Perspektíva javítás a sarokjelek alapján."""
+        """Perspektíva javítás a sarokjelek alapján, közvetlenül a kanonikus méretre."""
         if len(self.sarkok) != 4:
             print("Figyelmeztetés: Nem található mind a 4 sarokjelölő!")
             return
         
+        szelesseg, magassag = self.KANONIKUS_SZELESSEG, self.KANONIKUS_MAGASSAG
         pts1 = np.float32(self.sarkok)
-        pts2 = np.float32([
-            [0, 0],
-            [self.szelesseg, 0],
-            [0, self.magassag],
-            [self.szelesseg, self.magassag]
-        ])
         
-        matrix = cv2.getPerspectiveTransform(pts1, pts2)
-        self.szurke = cv2.warpPerspective(self.szurke, matrix, (self.szelesseg, self.magassag))
-        self.kep = cv2.warpPerspective(self.kep, matrix, (self.szelesseg, self.magassag))
+        # A torzítás és az átméretezés egyetlen warp lépésben történik
+        matrix = cv2.getPerspectiveTransform(pts1, self.CEL_SARKOK)
+        self.kanonikus_matrix = matrix
+        self.szurke = cv2.warpPerspective(self.szurke, matrix, (szelesseg, magassag), dst=self.pufferek.get("szurke"))
+        self.kep = cv2.warpPerspective(self.kep, matrix, (szelesseg, magassag), dst=self.pufferek.get("kep"))
+        self.magassag, self.szelesseg = magassag, szelesseg
+        self.normalizalva = True
+
+    def ferdeseg_becslese(self) -> float:
+        """
+        A lap elforgatási szögének (fok) becslése a kérdéskeretek hosszú vízszintes éleiből,
+        Hough transzformációval egy kicsinyített képen. Ha nincs elég hosszú él, 0-t ad vissza.
+        """
+        arany = self.FERDESEG_BECSLES_SZELESSEG / self.szelesseg
+        kicsi = cv2.resize(self.szurke, None, fx=arany, fy=arany, interpolation=cv2.INTER_AREA)
+        elek = cv2.Canny(kicsi, 50, 150)
+        
+        szelesseg = kicsi.shape[1]
+        vonalak = cv2.HoughLinesP(elek, 1, np.pi / 1800, threshold=szelesseg // 6,
+                                  minLineLength=szelesseg // 4, maxLineGap=5)
+        if vonalak is None:
+            return 0.0
+        
+        vonalak = vonalak.reshape(-1, 4).astype(np.float64)
+        dx = vonalak[:, 2] - vonalak[:, 0]
+        dy = vonalak[:, 3] - vonalak[:, 1]
+        szogek = np.degrees(np.arctan2(dy, dx))
+        # A jobbról balra futó szakaszok iránya 180 fokkal eltér
+        szogek = (szogek + 90) % 180 - 90
+        hosszak = np.hypot(dx, dy)
+        
+        vizszintes = np.abs(szogek) < self.MAX_FERDESEG
+        if not vizszintes.any():
+            return 0.0
+        szogek, hosszak = szogek[vizszintes], hosszak[vizszintes]
+        
+        # Hosszal súlyozott medián: a rövid, zajos szakaszok nem húzzák el
+        sorrend = np.argsort(szogek)
+        kumulalt = np.cumsum(hosszak[sorrend])
+        durva = float(szogek[sorrend][np.searchsorted(kumulalt, kumulalt[-1] / 2)])
+        
+        return self._ferdeseg_finomitasa(elek, durva)
+    
+    @staticmethod
+    def _ferdeseg_finomitasa(elek: np.ndarray, durva: float, tartomany: float = 0.3, lepes: float = 0.02) -> float:
+        """
+        A Hough becslés pontosítása vetületi profillal: az élpontokat a durva szög körüli
+        szögekkel elforgatva ott a legélesebb a sorok hisztogramja, ahol a vízszintes élek
+        egy-egy sorba esnek. A képet nem forgatjuk, csak az élpontok koordinátáit.
+        """
+        ys, xs = np.nonzero(elek)
+        if len(xs) == 0:
+            return durva
+        xs = xs - elek.shape[1] / 2
+        ys = ys - elek.shape[0] / 2
+        
+        legjobb_szog, legjobb_elesseg = durva, -1.0
+        for szog in np.arange(durva - tartomany, durva + tartomany + lepes / 2, lepes):
+            rad = np.radians(szog)
+            sorok = ys * np.cos(rad) - xs * np.sin(rad)
+            hisztogram = np.bincount(np.round(sorok - sorok.min()).astype(np.int64)).astype(np.float64)
+            elesseg = float(np.dot(hisztogram, hisztogram))
+            if elesseg > legjobb_elesseg:
+                legjobb_szog, legjobb_elesseg = float(szog), elesseg
+        return legjobb_szog
+
+    def ferdeseg_korrekcio(self):
+        """
+        Tartalék igazítás sarokjelölők nélkül: a becsült ferdeség kiegyenesítése és a kanonikus
+        méretre alakítás egyetlen affin lépésben. A kanonikus kép a sarokjelölők által kifeszített
+        téglalap, ezt a lap szélétől mért névleges margóval közelítjük, a megtalált
+        sarokjelölőkkel pedig az eltolást pontosítjuk.
+        """
+        self.ferdeseg = self.ferdeseg_becslese()
+        print(f"   Becsült ferdeség: {self.ferdeseg:.2f}°")
+        
+        szelesseg, magassag = self.KANONIKUS_SZELESSEG, self.KANONIKUS_MAGASSAG
+        margo_x, margo_y = self.SAROK_MARGO[0] * self.szelesseg, self.SAROK_MARGO[1] * self.magassag
+        skala_x = szelesseg / (self.szelesseg - 2 * margo_x)
+        skala_y = magassag / (self.magassag - 2 * margo_y)
+        
+        # Forgatás a lap közepe körül, a margó levágása, majd skálázás a kanonikus méretre
+        matrix = cv2.getRotationMatrix2D((self.szelesseg / 2, self.magassag / 2), self.ferdeseg, 1.0)
+        matrix[0, 2] -= margo_x
+        matrix[1, 2] -= margo_y
+        matrix[0] *= skala_x
+        matrix[1] *= skala_y
+        
+        if self.sarkok:
+            # A megtalált jelölők a legközelebbi kanonikus sarokba kerülnének: az átlagos eltérést levonjuk
+            pontok = np.float32(self.sarkok).reshape(-1, 1, 2)
+            atvitt = cv2.transform(pontok, matrix).reshape(-1, 2)
+            celok = self.CEL_SARKOK[np.argmin(
+                np.linalg.norm(atvitt[:, None, :] - self.CEL_SARKOK[None, :, :], axis=2), axis=1)]
+            eltolas = (atvitt - celok).mean(axis=0)
+            # Csak kis korrekciót fogadunk el, egy tévesen sarokjelölőnek vélt folt ne rontsa el
+            if np.all(np.abs(eltolas) < 0.03 * np.array([szelesseg, magassag])):
+                matrix[:, 2] -= eltolas
+        
+        self.kanonikus_matrix = np.vstack([matrix, [0.0, 0.0, 1.0]])
+        # Köbös interpoláció: az elforgatott vékony keretvonalak így kevésbé szakadoznak
+        self.szurke = cv2.warpAffine(self.szurke, matrix, (szelesseg, magassag), dst=self.pufferek.get("szurke"),
+                                     flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_CONSTANT, borderValue=255)
+        self.kep = cv2.warpAffine(self.kep, matrix, (szelesseg, magassag), dst=self.pufferek.get("kep"),
+                                  flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_CONSTANT, borderValue=(255, 255, 255))
+        self.magassag, self.szelesseg = magassag, szelesseg
+        self.normalizalva = True
+
+    def kuszobok(self):
+        """A profil kanonikus lapméretre skálázott küszöbei (a profil egyszer számolja ki őket)."""
+        return self.profil.kuszobok(self.KANONIKUS_SZELESSEG)
 
     # kék téglalapon belül
     def negyzetek_keresese(self, regio: Tuple[int, int, int, int]) -> List[Tuple[int, int, int, int]]:
@@ -109,23 +377,22 @@ class TesztlapKiertekelo:
         
         negyzetek = []
         
-        skala = self.szelesseg / 600
-        min_terulet = int(50 * skala * skala)
-        max_terulet = int(500 * skala * skala)
+        kuszobok = self.kuszobok()
+        min_arany, max_arany = kuszobok.negyzet_arany
         
         for kontur in konturok:
             terulet = cv2.contourArea(kontur)
-            if min_terulet < terulet < max_terulet:
+            if kuszobok.negyzet_min_terulet < terulet < kuszobok.negyzet_max_terulet:
                 bx, by, bw, bh = cv2.boundingRect(kontur)
                 arany = float(bw) / bh if bh > 0 else 0
-                if 0.7 < arany < 1.3:
+                if min_arany < arany < max_arany:
                     negyzetek.append((x + bx, y + by, bw, bh))
         
         negyzetek.sort(key=lambda n: n[1])
         
         return negyzetek
     
-    def negyzet_ki_van_e_jelolve(self, negyzet: Tuple[int, int, int, int], kuszob: float = 0.30, debug: bool = False) -> Tuple[bool, float]:
+    def negyzet_ki_van_e_jelolve(self, negyzet: Tuple[int, int, int, int], kuszob: float = JELOLES_KUSZOB, debug: bool = False) -> Tuple[bool, float]:
         """Ellenőrzi, hogy egy négyzet ki van-e jelölve."""
         x, y, w, h = negyzet
         # Nagyobb margó a négyzet széléről, hogy a keretet és a rotációs artifaktokat kihagyjuk
@@ -151,26 +418,113 @@ class TesztlapKiertekelo:
         
         return arany > kuszob, arany
 
+    def negyzet_ujraellenorzese(self, negyzet: Tuple[int, int, int, int], kuszob: float = JELOLES_KUSZOB,
+                                debug: bool = False) -> Tuple[bool, float, float]:
+        """
+        Drágább második lépcső a küszöb közelébe eső négyzetekhez.
+        Helyi zajszűrés után több küszöböléssel szavaztat, és kiszűri a kiradírozott
+        (világosszürke, de az adaptív küszöbölésen sötétnek látszó) jelöléseket.
+        """
+        x, y, w, h = negyzet
+        margin = max(4, min(w, h) // 3)
+        roi = self.szurke[y+margin:y+h-margin, x+margin:x+w-margin]
+        
+        if roi.size == 0:
+            return False, 0.0, 0.0
+        
+        # Helyi zajszűrés: a só-bors pontok eltávolítása
+        roi = cv2.medianBlur(roi, 3)
+        osszes_pixel = roi.shape[0] * roi.shape[1]
+        
+        aranyok = []
+        # Adaptív küszöbölés különböző érzékenységgel
+        for c in (2, 5, 8):
+            binarizalt = cv2.adaptiveThreshold(roi, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                               cv2.THRESH_BINARY_INV, 11, c)
+            aranyok.append(cv2.countNonZero(binarizalt) / osszes_pixel)
+        # Globális küszöbök: csak a ténylegesen sötét pixeleket számolják
+        for globalis in (127, 160):
+            _, binarizalt = cv2.threshold(roi, globalis, 255, cv2.THRESH_BINARY_INV)
+            aranyok.append(cv2.countNonZero(binarizalt) / osszes_pixel)
+        
+        szavazatok = sum(1 for a in aranyok if a > kuszob)
+        bejelolve = szavazatok > len(aranyok) // 2
+        arany = float(np.median(aranyok))
+        
+        # Kiradírozott jelölés: az adaptív küszöb sötétnek látja, de alig van valóban sötét pixel
+        _, sotet = cv2.threshold(roi, 100, 255, cv2.THRESH_BINARY_INV)
+        sotet_arany = cv2.countNonZero(sotet) / osszes_pixel
+        radirozott = bejelolve and sotet_arany < kuszob / 3
+        if radirozott:
+            bejelolve = False
+        
+        # Bizonyosság: a medián távolsága a küszöbtől, a szavazás egyetértésével súlyozva
+        egyetertes = max(szavazatok, len(aranyok) - szavazatok) / len(aranyok)
+        bizonyossag = abs(arany - kuszob) * egyetertes
+        
+        if debug:
+            print(f"      Újraellenőrzés ({x},{y},{w},{h}): arányok = {[f'{a:.3f}' for a in aranyok]}, "
+                  f"sötét = {sotet_arany:.3f}, radírozott = {radirozott}, bejelölve = {bejelolve}")
+        
+        return bejelolve, arany, bizonyossag
+
+    def negyzet_ertekelese(self, negyzet: Tuple[int, int, int, int], kuszob: float = None,
+                           debug: bool = False) -> Tuple[bool, float, float]:
+        """
+        Négyzet kiértékelése bizonyossággal. A gyors döntést csak akkor ellenőrzi újra,
+        ha az arány a küszöb körüli bizonytalan sávba esik. Alapértelmezett küszöb: `self.jeloles_kuszob`.
+        """
+        if kuszob is None:
+            kuszob = self.jeloles_kuszob
+        bejelolve, arany = self.negyzet_ki_van_e_jelolve(negyzet, kuszob=kuszob, debug=debug)
+        bizonyossag = abs(arany - kuszob)
+        
+        if bizonyossag < self.BIZONYTALAN_SAV:
+            self.ujraellenorzott_negyzetek += 1
+            bejelolve, arany, bizonyossag = self.negyzet_ujraellenorzese(negyzet, kuszob=kuszob, debug=debug)
+        
+        return bejelolve, arany, bizonyossag
+
     # kék kerdetek
     def keretek_keresese(self, debug: bool = True) -> List[Tuple[int, int, int, int]]:
-        """Kérdések kereteinek megkeresése."""
+        """
+        Kérdések kereteinek megkeresése. Ha az éltérképen `KONTUR_KORLAT`-nál több kontúr van
+        (nagyon zajos szkennelés), a lassabb, zajtűrő éltérképpel próbálja újra; ha az is túl
+        zajos, `ElutasitottLap` kivételt dob, hogy a lap ne foglalja tovább a munkást.
+        """
         elek = cv2.Canny(self.szurke, 50, 150)
         konturok, _ = cv2.findContours(elek, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
-        keretek = []
+        if len(konturok) > self.KONTUR_KORLAT:
+            print(f"   [!] Túl sok kontúr ({len(konturok)}), zajtűrő keresés...")
+            elek = self._keretvonalak()
+            konturok, _ = cv2.findContours(elek, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            if len(konturok) > self.KONTUR_KORLAT:
+                raise ElutasitottLap(f"Túl zajos lap: {len(konturok)} kontúr a zajszűrés után is "
+                                     f"(korlát: {self.KONTUR_KORLAT}): {self.kep_utvonal}")
         
-        skala = self.szelesseg / 600
-        min_terulet = int(10000 * skala * skala)
+        kuszobok = self.kuszobok()
+        min_terulet = kuszobok.keret_min_terulet
+        min_oldalarany = kuszobok.keret_min_oldalarany
         
-        for kontur in konturok:
-            terulet = cv2.contourArea(kontur)
-            if terulet > min_terulet:
-                x, y, w, h = cv2.boundingRect(kontur)
-                arany = float(w) / h if h > 0 else 0
-                if arany > 2:
-                    keretek.append((x, y, w, h))
-                    if debug:
-                        print(f"      Keret talált: x={x}, y={y}, w={w}, h={h}, terület={terulet:.0f}, arány={arany:.2f}")
+        keretek = []
+        for x, y, w, h in self._befoglalo_teglalapok(konturok):
+            # A befoglaló téglalap területét nézzük: az átméretezés után a keret éle
+            # megszakadhat, ilyenkor a nyitott kontúr contourArea értéke ~0 lenne
+            terulet = w * h
+            if terulet > min_terulet and w > min_oldalarany * h:
+                keretek.append((x, y, w, h))
+                if debug:
+                    print(f"      Keret talált: x={x}, y={y}, w={w}, h={h}, terület={terulet:.0f}, arány={w / h:.2f}")
+        
+        # Nyitott él esetén ugyanannak a keretnek a belső éle vagy egy darabja is
+        # külön kontúr lesz - a nagyobb keretbe nagyrészt beleeső találatokat eldobjuk
+        keretek.sort(key=lambda k: k[2] * k[3], reverse=True)
+        megtartott = []
+        for k in keretek:
+            if not any(self._atfedes(k, m) > 0.5 for m in megtartott):
+                megtartott.append(k)
+        keretek = megtartott
         
         keretek.sort(key=lambda k: k[1])
         
@@ -178,13 +532,50 @@ class TesztlapKiertekelo:
         
         return keretek
     
+    @staticmethod
+    def _befoglalo_teglalapok(konturok) -> List[Tuple[int, int, int, int]]:
+        """
+        Az összes kontúr befoglaló téglalapja (mint a `cv2.boundingRect`) egyszerre: a pontokat
+        összefűzzük, és kontúronként `reduceat`-tel vesszük a minimumot és a maximumot.
+        """
+        if len(konturok) == 0:
+            return []
+        hosszak = np.fromiter(map(len, konturok), dtype=np.intp, count=len(konturok))
+        pontok = np.concatenate(konturok).reshape(-1, 2)
+        kezdetek = np.zeros(len(konturok), dtype=np.intp)
+        np.cumsum(hosszak[:-1], out=kezdetek[1:])
+        
+        also = np.minimum.reduceat(pontok, kezdetek, axis=0)
+        felso = np.maximum.reduceat(pontok, kezdetek, axis=0)
+        meretek = felso - also + 1
+        return np.hstack([also, meretek]).tolist()
+    
+    def _keretvonalak(self) -> np.ndarray:
+        """
+        Zajtűrő keret-térkép nagyon zajos lapokhoz: adaptív küszöböléssel kapott tintamaszkból
+        morfológiai nyitással csak a hosszú vízszintes és függőleges vonalak (a keretek oldalai)
+        maradnak meg; a pöttyök, az írás és a jelölések eltűnnek.
+        """
+        hossz = self.kuszobok().keretvonal_hossz
+        tinta = cv2.adaptiveThreshold(self.szurke, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, hossz, 10)
+        vizszintes = cv2.morphologyEx(tinta, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (hossz, 1)))
+        fuggoleges = cv2.morphologyEx(tinta, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, hossz)))
+        return cv2.bitwise_or(vizszintes, fuggoleges)
+    
+    @staticmethod
+    def _atfedes(a: Tuple[int, int, int, int], b: Tuple[int, int, int, int]) -> float:
+        """Az `a` téglalap területének az a része, amely a `b` téglalapba esik."""
+        szel = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+        mag = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+        if szel <= 0 or mag <= 0 or a[2] * a[3] == 0:
+            return 0.0
+        return (szel * mag) / (a[2] * a[3])
+    
     def kerdes_tipusanak_meghatarozasa(self, keret: Tuple[int, int, int, int]) -> str:
         """Kérdés típusának meghatározása a magasság alapján."""
         x, y, w, h = keret
         
-        # Skálázási tényező
-        skala = self.szelesseg / 600
-        kuszob = int(80 * skala)
+        kuszob = self.kuszobok().ih_max_magassag
         
         # Magasság alapú döntés (skálázva)
         # Igaz/Hamis kérdések alacsonyabbak (~40-60 px 72 DPI-n, ~167-250 px 300 DPI-n)
@@ -194,6 +585,150 @@ class TesztlapKiertekelo:
         else:
             return "FV"
     
+    def igaz_hamis_kerdes(self, keret: Tuple[int, int, int, int], ih_sorszam: int, debug: bool = False) -> Tuple[str, int]:
+        """Egy Igaz/Hamis kérdés kiértékelése. A válasz mellett a talált négyzetek számát is visszaadja."""
+        x, y, w, h = keret
+        
+        if debug:
+            print(f"   Kérdés {ih_sorszam} (keret y={y} h={h}):")
+        
+        regio_x, regio_szelesseg = self.kuszobok().ih_regio
+        regio = (x + int(w * regio_x), y, int(w * regio_szelesseg), h)
+        
+        negyzetek = self.negyzetek_keresese(regio)
+        negyzetek.sort(key=lambda n: n[0])
+        
+        if len(negyzetek) < 2:
+            self.bizonyossag["igaz_hamis"][ih_sorszam] = 0.0
+            return "Nem található négyzet", len(negyzetek)
+        
+        igaz_bejelolve, igaz_arany, igaz_bizonyossag = self.negyzet_ertekelese(negyzetek[0], debug=debug)
+        hamis_bejelolve, hamis_arany, hamis_bizonyossag = self.negyzet_ertekelese(negyzetek[1], debug=debug)
+        self.bizonyossag["igaz_hamis"][ih_sorszam] = round(min(igaz_bizonyossag, hamis_bizonyossag), 3)
+        
+        self.debug_checkboxok.append((*negyzetek[0], igaz_bejelolve, igaz_arany, "IH"))
+        self.debug_checkboxok.append((*negyzetek[1], hamis_bejelolve, hamis_arany, "IH"))
+        
+        if debug:
+            print(f"      Igaz: {igaz_arany:.3f}, Hamis: {hamis_arany:.3f}")
+        
+        if igaz_bejelolve and not hamis_bejelolve:
+            valasz = "Igaz"
+        elif hamis_bejelolve and not igaz_bejelolve:
+            valasz = "Hamis"
+        elif igaz_bejelolve and hamis_bejelolve:
+            valasz = "Hibás (mindkettő bejelölve)"
+        else:
+            valasz = "Nincs válasz"
+        
+        return valasz, len(negyzetek)
+    
+    def feleletvalasztos_kerdes(self, keret: Tuple[int, int, int, int], fv_sorszam: int, debug: bool = False) -> Tuple[int, int]:
+        """Egy feleletválasztós kérdés kiértékelése. A válasz mellett a talált négyzetek számát is visszaadja."""
+        x, y, w, h = keret
+        
+        if debug:
+            print(f"   Kérdés {fv_sorszam} (keret y={y} h={h}):")
+        
+        # Bal oldali rész vizsgálata (ahol a válasz négyzetek vannak)
+        # A kereten BELÜL keressük a checkboxokat
+        kuszobok = self.kuszobok()
+        regio_x, regio_szelesseg = kuszobok.fv_regio
+        max_valaszok = kuszobok.fv_max_valaszok
+        regio = (x + int(w * regio_x), y, int(w * regio_szelesseg), h)
+        
+        negyzetek = self.negyzetek_keresese(regio)
+        
+        # Szűrés: csak a (profil szerint 4) legalapvetőbb négyzetet tartjuk meg
+        # (néha extra kis négyzetek is detektálódnak)
+        if len(negyzetek) > max_valaszok:
+            # Terület szerinti szűrés: csak a legnagyobb négyzeteket vesszük
+            negyzetek_terulettel = [(n, n[2] * n[3]) for n in negyzetek]
+            negyzetek_terulettel.sort(key=lambda x: x[1], reverse=True)
+            negyzetek = [n[0] for n in negyzetek_terulettel[:max_valaszok]]
+            # Újra rendezés Y koordináta szerint
+            negyzetek.sort(key=lambda n: n[1])
+            
+            if debug:
+                print(f"      {len(negyzetek)} négyzet a szűrés után")
+        
+        valasz_index = -1
+        bejelolt_szam = 0
+        valasz_aranyok = []
+        valasz_bizonyossag = []
+        
+        for j, negyzet in enumerate(negyzetek[:max_valaszok]):
+            bejelolve, arany, bizonyossag = self.negyzet_ertekelese(negyzet, debug=debug)
+            valasz_aranyok.append(arany)
+            valasz_bizonyossag.append(bizonyossag)
+            
+            # Checkbox adatok mentése debug képhez
+            betu = chr(65 + j)  # A, B, C, ... (a profil max_valaszok értékéig)
+            self.debug_checkboxok.append((*negyzet, bejelolve, arany, f"FV-{betu}"))
+            
+            if bejelolve:
+                valasz_index = j
+                bejelolt_szam += 1
+        
+        if debug and valasz_aranyok:
+            print(f"      Arányok: {[f'{a:.3f}' for a in valasz_aranyok]}")
+            print(f"      Bejelölt válasz: {valasz_index if bejelolt_szam == 1 else 'HIBA'}")
+        
+        # A válasz bizonyossága a legbizonytalanabb négyzeté
+        self.bizonyossag["feleletvalasztos"][fv_sorszam] = round(min(valasz_bizonyossag), 3) if valasz_bizonyossag else 0.0
+        
+        if bejelolt_szam == 1:
+            valasz = valasz_index
+        elif bejelolt_szam > 1:
+            valasz = -2  # Többszörös válasz
+        else:
+            valasz = -1  # Nincs válasz
+        
+        return valasz, len(negyzetek[:max_valaszok])
+    
+    def kerdesek_kiertekelese(self, keretek: List[Tuple[int, int, int, int]], urlapmodell: Urlapmodell = None,
+                              debug: bool = False) -> Tuple[Dict[int, str], Dict[int, int]]:
+        """
+        Az összes kérdés kiértékelése egyetlen menetben. Ha van illeszkedő űrlapmodell, a kérdések
+        típusa és sorszáma abból jön, az eltéréseket a `self.urlap_elteresek` listába gyűjtjük.
+        A kérdések keretei (típus, sorszám, keret) a `self.kerdes_keretek`-ben maradnak, így az
+        áttekintő kivágásokhoz (lásd attekintes.py) nem kell újra keresni őket.
+        """
+        tipusok = [self.kerdes_tipusanak_meghatarozasa(keret) for keret in keretek]
+        self.urlap_elteresek = []
+        
+        if urlapmodell is not None:
+            self.urlap_elteresek = urlapmodell.ellenorzes(tipusok)
+            if not urlapmodell.illeszkedik(len(keretek)):
+                # Nem alkalmazható modell: a lapon talált keretekből dolgozunk
+                urlapmodell = None
+        
+        if urlapmodell is None:
+            urlapmodell = Urlapmodell.keretekbol(tipusok, fv_negyzetek=self.kuszobok().fv_max_valaszok)
+        self.urlapmodell = urlapmodell
+        
+        igaz_hamis = {}
+        feleletvalasztos = {}
+        self.kerdes_keretek = []
+        
+        for i, (keret, (tipus, sorszam, vart_negyzetek)) in enumerate(zip(keretek, urlapmodell.kiosztas())):
+            self.kerdes_keretek.append((tipus, sorszam, keret))
+            if tipus == "IH":
+                igaz_hamis[sorszam], talalt = self.igaz_hamis_kerdes(keret, sorszam, debug=debug)
+            else:
+                feleletvalasztos[sorszam], talalt = self.feleletvalasztos_kerdes(keret, sorszam, debug=debug)
+            
+            if talalt < vart_negyzetek:
+                self.urlap_elteresek.append(f"{i + 1}. keret ({tipus} {sorszam}): {vart_negyzetek} négyzet helyett {talalt}")
+        
+        if self.urlap_elteresek:
+            print(f"   Űrlap eltérések: {len(self.urlap_elteresek)}")
+            if debug:
+                for elteres in self.urlap_elteresek:
+                    print(f"      {elteres}")
+        
+        return igaz_hamis, feleletvalasztos
+    
     def igaz_hamis_kiertekeles(self, keretek: List[Tuple[int, int, int, int]], debug: bool = False) -> Dict[int, str]:
         """Igaz/Hamis kérdések kiértékelése."""
         eredmenyek = {}
@@ -205,38 +740,8 @@ class TesztlapKiertekelo:
         for keret in keretek:
             if self.kerdes_tipusanak_meghatarozasa(keret) != "IH":
                 continue
-                
-            x, y, w, h = keret
-            
-            if debug:
-                print(f"   Kérdés {ih_sorszam} (keret y={y} h={h}):")
-            
-            regio = (x + int(w * 0.6), y, int(w * 0.4), h)
-            
-            negyzetek = self.negyzetek_keresese(regio)
-            negyzetek.sort(key=lambda n: n[0])
-            
-            if len(negyzetek) >= 2:
-                igaz_bejelolve, igaz_arany = self.negyzet_ki_van_e_jelolve(negyzetek[0], debug=debug)
-                hamis_bejelolve, hamis_arany = self.negyzet_ki_van_e_jelolve(negyzetek[1], debug=debug)
-                
-                self.debug_checkboxok.append((*negyzetek[0], igaz_bejelolve, igaz_arany, "IH"))
-                self.debug_checkboxok.append((*negyzetek[1], hamis_bejelolve, hamis_arany, "IH"))
-                
-                if debug:
-                    print(f"      Igaz: {igaz_arany:.3f}, Hamis: {hamis_arany:.3f}")
-                
-                if igaz_bejelolve and not hamis_bejelolve:
-                    eredmenyek[ih_sorszam] = "Igaz"
-                elif hamis_bejelolve and not igaz_bejelolve:
-                    eredmenyek[ih_sorszam] = "Hamis"
-                elif igaz_bejelolve and hamis_bejelolve:
-                    eredmenyek[ih_sorszam] = "Hibás (mindkettő bejelölve)"
-                else:
-                    eredmenyek[ih_sorszam] = "Nincs válasz"
-            else:
-                eredmenyek[ih_sorszam] = "Nem található négyzet"
             
+            eredmenyek[ih_sorszam], _ = self.igaz_hamis_kerdes(keret, ih_sorszam, debug=debug)
             ih_sorszam += 1
         
         return eredmenyek
@@ -253,63 +758,66 @@ class TesztlapKiertekelo:
             # Ellenőrizzük, hogy ez feleletválasztós típusú kérdés-e
             if self.kerdes_tipusanak_meghatarozasa(keret) != "FV":
                 continue
-                
-            x, y, w, h = keret
-            
-            if debug:
-                print(f"   Kérdés {fv_sorszam} (keret y={y} h={h}):")
-            
-            # Bal oldali rész vizsgálata (ahol a válasz négyzetek vannak)
-            # A kereten BELÜL keressük a checkboxokat
-            regio = (x, y, int(w * 0.3), h)
-            
-            negyzetek = self.negyzetek_keresese(regio)
-            
-            # Szűrés: csak a 4 legalapvetőbb négyzetet tartjuk meg
-            # (néha extra kis négyzetek is detektálódnak)
-            if len(negyzetek) > 4:
-                # Terület szerinti szűrés: csak a legnagyobb 4 négyzetet vesszük
-                negyzetek_terulettel = [(n, n[2] * n[3]) for n in negyzetek]
-                negyzetek_terulettel.sort(key=lambda x: x[1], reverse=True)
-                negyzetek = [n[0] for n in negyzetek_terulettel[:4]]
-                # Újra rendezés Y koordináta szerint
-                negyzetek.sort(key=lambda n: n[1])
-                
-                if debug:
-                    print(f"      {len(negyzetek)} négyzet a szűrés után")
-            
-            valasz_index = -1
-            bejelolt_szam = 0
-            valasz_aranyok = []
-            
-            for j, negyzet in enumerate(negyzetek[:4]):  # Maximum 4 válasz
-                bejelolve, arany = self.negyzet_ki_van_e_jelolve(negyzet, debug=debug)
-                valasz_aranyok.append(arany)
-                
-                # Checkbox adatok mentése debug képhez
-                betu = chr(65 + j)  # A, B, C, D
-                self.debug_checkboxok.append((*negyzet, bejelolve, arany, f"FV-{betu}"))
-                
-                if bejelolve:
-                    valasz_index = j
-                    bejelolt_szam += 1
-            
-            if debug and valasz_aranyok:
-                print(f"      Arányok: {[f'{a:.3f}' for a in valasz_aranyok]}")
-                print(f"      Bejelölt válasz: {valasz_index if bejelolt_szam == 1 else 'HIBA'}")
-            
-            if bejelolt_szam == 1:
-                eredmenyek[fv_sorszam] = valasz_index
-            elif bejelolt_szam > 1:
-                eredmenyek[fv_sorszam] = -2  # Többszörös válasz
-            else:
-                eredmenyek[fv_sorszam] = -1  # Nincs válasz
             
+            eredmenyek[fv_sorszam], _ = self.feleletvalasztos_kerdes(keret, fv_sorszam, debug=debug)
             fv_sorszam += 1
         
         return eredmenyek
     
-    def neptun_kod_kiolvasasa(self, debug: bool = False) -> str:
+    def neptun_kod_kiolvasasa(self, debug: bool = False, nevsor=None) -> str:
+        """
+        A Neptun kód kiolvasása. Ha `nevsor` (nevsor.Nevsor) meg van adva, az olvasatot a névsor
+        legközelebbi kódjához illeszti; az illesztés részletei a `self.neptun_illesztes`-be kerülnek.
+        """
+        binarizalt = self.neptun_ocr_elokeszites(debug=debug)
+        if nevsor is None:
+            self.neptun_kod = self.neptun_ocr(binarizalt, self.tesseract_path, debug=debug, motor=self.neptun_motor)
+            return self.neptun_kod
+        
+        self.neptun_illesztes = self.neptun_ocr_nevsorral(binarizalt, nevsor, self.tesseract_path,
+                                                          debug=debug, motor=self.neptun_motor)
+        self.neptun_kod = self.neptun_illesztes["neptun_kod"]
+        return self.neptun_kod
+    
+    def neptun_ocr_elokeszites(self, debug: bool = False) -> np.ndarray:
+        """
+        A Neptun mező kivágása, nagyítása és binarizálása az OCR számára. A mezőt a kanonikus lapon
+        keressük meg, de a kivágás az eredeti felbontású lapból készül (igazítás és nagyítás egy
+        lépésben), így a nagy felbontású szkennelésekből az OCR több képpontot kap. A lapgyorsítótárból
+        betöltött lapnál nincs eredeti, ott a kanonikus lapból vágunk.
+        """
+        neptun_x, neptun_y, neptun_w, neptun_h = self.neptun_terulet(debug)
+        
+        if debug:
+            print(f"   ROI terület: ({neptun_x}, {neptun_y}, {neptun_w}, {neptun_h})")
+        
+        if self.eredeti_szurke is not None and self.kanonikus_matrix is not None:
+            nagyitas = self.NEPTUN_OCR_NAGYITAS * self.eredeti_szurke.shape[1] / self.KANONIKUS_SZELESSEG
+            # kanonikus -> kivágás: eltolás a mező sarkába és nagyítás, az eredeti -> kanonikus mátrix után
+            kivagas_matrix = np.array([[nagyitas, 0.0, -nagyitas * neptun_x],
+                                       [0.0, nagyitas, -nagyitas * neptun_y],
+                                       [0.0, 0.0, 1.0]]) @ self.kanonikus_matrix
+            roi_nagyitott = cv2.warpPerspective(self.eredeti_szurke, kivagas_matrix,
+                                                (round(neptun_w * nagyitas), round(neptun_h * nagyitas)),
+                                                flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_CONSTANT, borderValue=255)
+        else:
+            roi = self.szurke[neptun_y:neptun_y+neptun_h, neptun_x:neptun_x+neptun_w]
+            roi_nagyitott = cv2.resize(roi, None, fx=self.NEPTUN_OCR_NAGYITAS, fy=self.NEPTUN_OCR_NAGYITAS,
+                                       interpolation=cv2.INTER_CUBIC)
+        
+        if debug:
+            print(f"   Nagyított ROI méret: {roi_nagyitott.shape}")
+        
+        kontraszt = cv2.convertScaleAbs(roi_nagyitott, alpha=2.0, beta=-80)
+        _, binarizalt = cv2.threshold(kontraszt, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        
+        if debug:
+            cv2.imwrite("debug/debug_neptun_bin.png", binarizalt)
+        
+        return binarizalt
+    
+    def neptun_terulet(self, debug: bool = False) -> Tuple[int, int, int, int]:
+        """A Neptun mező (x, y, w, h) a normalizált lapon: a megtalált keret, vagy a becsült hely."""
         keretezett_terulet = self.neptun_keret_keresese(debug)
         
         if keretezett_terulet is not None:
@@ -319,28 +827,56 @@ class TesztlapKiertekelo:
         else:
             if debug:
                 print("   Neptun keret nem található, becsült koordináták használata")
-            neptun_x = int(self.szelesseg * 0.65)
-            neptun_y = int(self.magassag * 0.02)
-            neptun_w = int(self.szelesseg * 0.30)
-            neptun_h = int(self.magassag * 0.05)
-        
-        roi = self.szurke[neptun_y:neptun_y+neptun_h, neptun_x:neptun_x+neptun_w]
+            becsles_x, becsles_y, becsles_w, becsles_h = self.kuszobok().neptun_becsult_terulet
+            neptun_x = int(self.szelesseg * becsles_x)
+            neptun_y = int(self.magassag * becsles_y)
+            neptun_w = int(self.szelesseg * becsles_w)
+            neptun_h = int(self.magassag * becsles_h)
         
-        if debug:
-            print(f"   ROI terület: ({neptun_x}, {neptun_y}, {neptun_w}, {neptun_h})")
-            print(f"   ROI méret: {roi.shape}")
-        
-        roi_nagyitott = cv2.resize(roi, None, fx=2.5, fy=2.5, interpolation=cv2.INTER_CUBIC)
-        
-        kontraszt = cv2.convertScaleAbs(roi_nagyitott, alpha=2.0, beta=-80)
-        _, binarizalt = cv2.threshold(kontraszt, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        return neptun_x, neptun_y, neptun_w, neptun_h
+    
+    def lap_ujjlenyomata(self) -> Tuple[int, int]:
+        """A normalizált lap perceptuális ujjlenyomata duplikátumkereséshez (lásd duplikatum.py)."""
+        from duplikatum import lap_ujjlenyomata
         
-        if debug:
-            cv2.imwrite("debug/debug_neptun_bin.png", binarizalt)
+        return lap_ujjlenyomata(self.szurke, self.neptun_terulet())
+
+    def lapjelolo_kiolvasasa(self) -> Dict:
+        """A normalizált lap oldaljelölője többoldalas dolgozatokhoz (lásd tobboldalas.py), vagy None."""
+        from tobboldalas import lapjelolo_olvasasa
+
+        return lapjelolo_olvasasa(self.szurke)
+    
+    @staticmethod
+    def neptun_ocr(binarizalt: np.ndarray, tesseract_path: str = None, debug: bool = False,
+                   motor: str = "tesseract", nyers: bool = False, csendes: bool = False) -> str:
+        """
+        A Neptun kód felismerése az előkészített kivágáson a választott motorral (Tesseract
+        vagy a beépített kNN). Nem használ példányállapotot, így külön OCR szálon/folyamatban is hívható.
+        `nyers=True` esetén a felismert szöveget csonkítás és "ISMERETLEN" helyettesítés nélkül adja vissza.
+        `csendes=True` esetén nem ír a konzolra (a hibát a "HIBA" / "NOTESSERACT" eredmény jelzi);
+        szálakból ezt kell használni a `contextlib.redirect_stdout` helyett, ami a globális
+        `sys.stdout`-ot cseréli.
+        """
+        if motor == "knn":
+            from neptun_felismero import alap_felismero
+            
+            try:
+                neptun_kod, bizonyossag = alap_felismero().felismeres_kotegben([binarizalt], nyers=nyers)[0]
+            except FileNotFoundError:
+                raise  # hiányzó modell: nem laponkénti hiba, a hívó állítsa le a futást
+            except Exception as e:
+                if not csendes:
+                    print(f"   Neptun kód felismerési hiba: {e}")
+                return "HIBA"
+            if debug:
+                print(f"   kNN felismerés bizonyossága: {bizonyossag:.3f}")
+            if not nyers and not csendes:
+                print(f"   Neptun kód: {neptun_kod}")
+            return neptun_kod
         
         try:
-            if self.tesseract_path:
-                pytesseract.pytesseract.tesseract_cmd = self.tesseract_path
+            pytesseract = _pytesseract(tesseract_path)
             
             config = r'--oem 3 --psm 7 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
             szoveg = pytesseract.image_to_string(binarizalt, config=config)
@@ -349,36 +885,119 @@ class TesztlapKiertekelo:
             
             if debug:
                 print(f"   Felismert szöveg: '{szoveg}' (hossz: {len(szoveg)})")
+            if nyers:
+                return szoveg
             
             if len(szoveg) >= 6:
-                self.neptun_kod = szoveg[:6]
+                neptun_kod = szoveg[:6]
             elif len(szoveg) > 0:
                 if debug:
                     print(f"   Csak {len(szoveg)} karaktert sikerült felismerni")
-                self.neptun_kod = "ISMERETLEN"
+                neptun_kod = "ISMERETLEN"
             else:
                 if debug:
                     print("   Nem sikerült karaktereket felismerni")
-                self.neptun_kod = "ISMERETLEN"
+                neptun_kod = "ISMERETLEN"
             
-            print(f"   Neptun kód: {self.neptun_kod}")
+            if not csendes:
+                print(f"   Neptun kód: {neptun_kod}")
             
         except ImportError:
-            print("   pytesseract nincs telepítve, Tesseract telepítése szükséges")
-            print("   Tesseract telepítése: https://github.com/UB-Mannheim/tesseract/wiki")
-            self.neptun_kod = "NOTESSERACT"
+            if not csendes:
+                print("   pytesseract nincs telepítve, Tesseract telepítése szükséges")
+                print("   Tesseract telepítése: https://github.com/UB-Mannheim/tesseract/wiki")
+            neptun_kod = "NOTESSERACT"
         except Exception as e:
-            print(f"   Neptun kód felismerési hiba: {e}")
-            self.neptun_kod = "HIBA"
+            if not csendes:
+                print(f"   Neptun kód felismerési hiba: {e}")
+            neptun_kod = "HIBA"
         
-        return self.neptun_kod
+        return neptun_kod
+    
+    @staticmethod
+    def neptun_kivagas_valtozata(binarizalt: np.ndarray, valtozat: str) -> np.ndarray:
+        """A binarizált Neptun kivágás alternatív előfeldolgozása újraolvasáshoz."""
+        mag = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+        if valtozat == "nyitas":
+            # Fekete írás fehér alapon: a nyitás a vékony vonalakat vastagítja, a szakadásokat zárja
+            return cv2.morphologyEx(binarizalt, cv2.MORPH_OPEN, mag)
+        if valtozat == "zaras":
+            # A zárás vékonyítja az írást, szétválasztja az összeérő karaktereket
+            return cv2.morphologyEx(binarizalt, cv2.MORPH_CLOSE, mag)
+        if valtozat == "median":
+            return cv2.medianBlur(binarizalt, 5)
+        if valtozat == "nagyitas":
+            nagyitott = cv2.resize(binarizalt, None, fx=1.5, fy=1.5, interpolation=cv2.INTER_CUBIC)
+            _, nagyitott = cv2.threshold(nagyitott, 127, 255, cv2.THRESH_BINARY)
+            return nagyitott
+        raise ValueError(f"Ismeretlen előfeldolgozás: {valtozat}")
+    
+    @staticmethod
+    def neptun_kod_nyers_szovegbol(szoveg: str) -> str:
+        """A nyers OCR szövegből a `neptun_ocr` által is adott kód (6 karakter vagy "ISMERETLEN")."""
+        if szoveg in ("HIBA", "NOTESSERACT"):
+            return szoveg
+        return szoveg[:6] if len(szoveg) >= 6 else "ISMERETLEN"
+    
+    @classmethod
+    def neptun_ocr_nevsorral(cls, binarizalt: np.ndarray, nevsor, tesseract_path: str = None,
+                             debug: bool = False, motor: str = "tesseract", elso_olvasat: str = None,
+                             csendes: bool = False) -> Dict:
+        """
+        Névsorhoz illesztett Neptun kód felismerés. Az első olvasatot a névsor legközelebbi kódjához
+        illeszti; alternatív előfeldolgozással csak akkor olvas újra, ha nincs elég biztos találat.
+        `elso_olvasat` egy már elkészült nyers olvasat (pl. a kötegelt kNN-ből), ekkor azt nem ismétli.
+        `csendes=True` esetén nem ír a konzolra (lásd `neptun_ocr`).
+        
+        Visszaad: {"neptun_kod", "ocr", "kod", "tavolsag", "bizonyossag", "ujraolvasasok"}; a "kod"
+        None, ha egyik olvasat sem illeszthető, ekkor a "neptun_kod" az első olvasatból képzett kód.
+        """
+        if elso_olvasat is None:
+            elso_olvasat = cls.neptun_ocr(binarizalt, tesseract_path, debug=debug, motor=motor, nyers=True,
+                                          csendes=csendes)
+        # Sikertelen olvasásnál ("HIBA", "NOTESSERACT") nincs mit illeszteni, és újraolvasni sem érdemes
+        sikertelen = elso_olvasat in ("HIBA", "NOTESSERACT")
+        if sikertelen:
+            legjobb = {"ocr": elso_olvasat, "kod": None, "tavolsag": None, "bizonyossag": 0.0}
+        else:
+            legjobb = nevsor.illesztes(elso_olvasat)
+        ujraolvasasok = 0
+        
+        if not nevsor.elfogadhato(legjobb) and not sikertelen:
+            for valtozat in cls.NEPTUN_UJRAOLVASASI_VALTOZATOK:
+                kivagas = cls.neptun_kivagas_valtozata(binarizalt, valtozat)
+                olvasat = cls.neptun_ocr(kivagas, tesseract_path, debug=debug, motor=motor, nyers=True,
+                                         csendes=csendes)
+                ujraolvasasok += 1
+                illesztes = nevsor.illesztes(olvasat)
+                if debug:
+                    print(f"   Újraolvasás ({valtozat}): '{olvasat}' -> {illesztes['kod']} "
+                          f"({illesztes['bizonyossag']:.2f})")
+                if illesztes["bizonyossag"] > legjobb["bizonyossag"]:
+                    legjobb = illesztes
+                if nevsor.elfogadhato(legjobb):
+                    break
+        
+        eredmeny = dict(legjobb, ocr=elso_olvasat, ujraolvasasok=ujraolvasasok)
+        if nevsor.elfogadhato(legjobb):
+            eredmeny["neptun_kod"] = legjobb["kod"]
+        else:
+            eredmeny["neptun_kod"] = cls.neptun_kod_nyers_szovegbol(elso_olvasat)
+            if not csendes and not sikertelen:
+                print(f"   [!] A Neptun kód nem illeszthető a névsorhoz: '{elso_olvasat}'")
+        if not csendes:
+            print(f"   Neptun kód: {eredmeny['neptun_kod']} (névsor: {legjobb['kod']}, "
+                  f"bizonyosság: {legjobb['bizonyossag']:.2f})")
+        return eredmeny
     
     def neptun_keret_keresese(self, debug: bool = False) -> tuple:
         """Neptun kód keretének megkeresése."""
-        regio_y_start = 0
-        regio_y_end = int(self.magassag * 0.20)
-        regio_x_start = int(self.szelesseg * 0.50)
-        regio_x_end = self.szelesseg
+        kuszobok = self.kuszobok()
+        x0, y0, x1, y1 = kuszobok.neptun_keresesi_terulet
+        regio_y_start = int(self.magassag * y0)
+        regio_y_end = int(self.magassag * y1)
+        regio_x_start = int(self.szelesseg * x0)
+        regio_x_end = int(self.szelesseg * x1)
         
         roi = self.szurke[regio_y_start:regio_y_end, regio_x_start:regio_x_end]
         
@@ -387,16 +1006,14 @@ class TesztlapKiertekelo:
         
         lehetseges_keretek = []
         
-        skala = self.szelesseg / 600
-        min_terulet = int(2000 * skala * skala)
-        max_terulet = int(10000 * skala * skala)
+        min_arany, max_arany = kuszobok.neptun_arany
         
         for kontur in konturok:
             terulet = cv2.contourArea(kontur)
-            if min_terulet < terulet < max_terulet:
+            if kuszobok.neptun_min_terulet < terulet < kuszobok.neptun_max_terulet:
                 x, y, w, h = cv2.boundingRect(kontur)
                 arany = float(w) / h if h > 0 else 0
-                if 1.5 < arany < 6:
+                if min_arany < arany < max_arany:
                     abs_x = regio_x_start + x
                     abs_y = regio_y_start + y
                     lehetseges_keretek.append((abs_x, abs_y, w, h, terulet))
@@ -416,51 +1033,130 @@ class TesztlapKiertekelo:
         
         return None
     
-    def teljes_kiertekeles(self, debug: bool = False, perspektiva: bool = True) -> Dict:
-        """Teljes tesztlap kiértékelése."""
+    def teljes_kiertekeles(self, debug: bool = False, perspektiva: bool = True, urlapmodell: Urlapmodell = None,
+                           nevsor=None, duplikatum_index=None) -> Dict:
+        """
+        Teljes tesztlap kiértékelése. Az `urlapmodell` egy korábbi lapból (vagy a megoldólapból)
+        lefordított modell; a kiértékelés után a lap saját modellje a `self.urlapmodell`-ben marad.
+        Ha `nevsor` meg van adva, a Neptun kódot a névsorhoz illeszti ("neptun_illesztes" kulcs).
+        A `duplikatum_index` (duplikatum.DuplikatumIndex) szerepét lásd a `geometriai_kiertekeles`-nél.
+        """
+        eredmeny = self.geometriai_kiertekeles(debug=debug, perspektiva=perspektiva, urlapmodell=urlapmodell,
+                                               duplikatum_index=duplikatum_index)
+        if eredmeny.get("duplikatum", {}).get("kihagyva"):
+            return eredmeny
+        if eredmeny.get("oldal", {}).get("oldal", 1) > 1:
+            # Többoldalas dolgozatnál Neptun mező csak az első oldalon van
+            return eredmeny
+        with self._szakasz("neptun_ocr"):
+            eredmeny["neptun_kod"] = self.neptun_kod_kiolvasasa(debug=debug, nevsor=nevsor)
+        if nevsor is not None:
+            eredmeny["neptun_illesztes"] = {k: v for k, v in self.neptun_illesztes.items() if k != "neptun_kod"}
+        return eredmeny
+    
+    def elofeldolgozas(self, perspektiva: bool = True):
+        """
+        A jelölési küszöböktől független lépések: sarokjelölők, igazítás, normalizálás és
+        zajszűrés. Utána a `self.szurke` a kanonikus lap, ami a lapgyorsítótárba menthető.
+        """
         print("Sarokjelölők keresése...")
-        self.sarkok_keresese()
+        with self._szakasz("sarkok_keresese"):
+            self.sarkok_keresese()
         print(f"   Talált sarkok: {len(self.sarkok)}")
         
         if perspektiva and len(self.sarkok) == 4:
             print("Perspektíva korrekció...")
-            self.perspektiva_korrekcio()
-        
-        #print("Neptun kód felismerése...")
-        self.neptun_kod_kiolvasasa(debug=debug)
+            with self._szakasz("perspektiva_korrekcio"):
+                self.perspektiva_korrekcio()
+        elif perspektiva:
+            print("Hiányzó sarokjelölők, ferdeség korrekció az élek alapján...")
+            with self._szakasz("ferdeseg_korrekcio"):
+                self.ferdeseg_korrekcio()
+        
+        print("Normalizálás kanonikus méretre...")
+        with self._szakasz("normalizalas"):
+            self.normalizalas()
+        self.elofeldolgozva = True
+
+    @classmethod
+    def elofeldolgozasi_ujjlenyomat(cls, perspektiva: bool, zajszures: bool, profil: GeometriaProfil = None) -> str:
+        """
+        Rövid azonosító az előfeldolgozás összes beállításáról (kanonikus méret, igazítás,
+        zajszűrés, a sarokkeresés küszöbei). A lapgyorsítótár kulcsának része: ha bármelyik
+        változik, a tárolt lapok nem használhatók.
+        """
+        profil = profil or alapertelmezett_profil()
+        beallitasok = {
+            "kanonikus": [cls.KANONIKUS_SZELESSEG, cls.KANONIKUS_MAGASSAG],
+            "perspektiva": perspektiva,
+            "zajszures": zajszures,
+            "ferdeseg": [cls.FERDESEG_BECSLES_SZELESSEG, cls.MAX_FERDESEG, list(cls.SAROK_MARGO)],
+            "referencia_szelesseg": profil.beallitasok["referencia_szelesseg"],
+            "sarokjelolo": profil.beallitasok["sarokjelolo"],
+        }
+        return hashlib.sha1(json.dumps(beallitasok, sort_keys=True).encode()).hexdigest()[:12]
+
+    def geometriai_kiertekeles(self, debug: bool = False, perspektiva: bool = True, urlapmodell: Urlapmodell = None,
+                               duplikatum_index=None) -> Dict:
+        """
+        A kiértékelés OCR nélküli része: igazítás, normalizálás, keretek és jelölőnégyzetek.
+        A Neptun kódot a hívó tölti ki (a futószalag ezt külön OCR szálon teszi).
+        Ha a lapon oldaljelölő van (többoldalas dolgozat, lásd tobboldalas.py), az eredmény
+        "oldal" kulcsot kap: {"oldal", "oldalszam", "sorozat"}.
+        
+        Ha `duplikatum_index` meg van adva, a normalizált lap ujjlenyomatát a drága lépések előtt
+        összeveti a köteg korábbi lapjaival. Duplikátumnál az eredmény "duplikatum" kulcsot kap;
+        ha az index kihagyásra van állítva, a keretek és négyzetek kiértékelése el is marad.
+        Ha a lap már elő van feldolgozva (`elofeldolgozas` vagy `normalizalt_lap_betoltese`),
+        az igazítás és a normalizálás kimarad.
+        """
+        if not self.elofeldolgozva:
+            self.elofeldolgozas(perspektiva=perspektiva)
+        
+        with self._szakasz("lapjelolo"):
+            oldal = self.lapjelolo_kiolvasasa()
+        if oldal is not None:
+            print(f"   Oldal: {oldal['oldal']}/{oldal['oldalszam']} ({oldal['sorozat']}. füzet)")
+        
+        duplikatum = None
+        if duplikatum_index is not None:
+            with self._szakasz("duplikatum_kereses"):
+                duplikatum = duplikatum_index.ellenorzes(self.lap_ujjlenyomata(), self.kep_utvonal)
+            if duplikatum is not None:
+                print(f"   Duplikátum: {duplikatum['eredeti']} (Neptun hash távolság: {duplikatum['neptun_tavolsag']})")
+                if duplikatum["kihagyva"]:
+                    return {
+                        "neptun_kod": self.neptun_kod,
+                        "kiertekeles_idopont": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        "igaz_hamis": {},
+                        "feleletvalasztos": {},
+                        "duplikatum": duplikatum
+                    }
         
         print("Kérdések kereteinek keresése...")
-        keretek = self.keretek_keresese(debug=debug)
+        with self._szakasz("keretek_keresese"):
+            keretek = self.keretek_keresese(debug=debug)
         print(f"   Talált keretek: {len(keretek)}")
         
-        print("Igaz/Hamis kérdések kiértékelése...")
-        igaz_hamis = self.igaz_hamis_kiertekeles(keretek, debug=debug)
-        
-        print("Feleletválasztós kérdések kiértékelése...")
-        feleletvalasztos = self.feleletvalasztos_kiertekeles(keretek, debug=debug)
+        print("Kérdések kiértékelése...")
+        with self._szakasz("kerdesek_kiertekelese"):
+            igaz_hamis, feleletvalasztos = self.kerdesek_kiertekelese(keretek, urlapmodell=urlapmodell, debug=debug)
         
         eredmeny = {
             "neptun_kod": self.neptun_kod,
             "kiertekeles_idopont": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "igaz_hamis": igaz_hamis,
-            "feleletvalasztos": feleletvalasztos
+            "feleletvalasztos": feleletvalasztos,
+            "bizonyossag": self.bizonyossag,
+            "urlap_elteresek": self.urlap_elteresek
         }
+        if oldal is not None:
+            eredmeny["oldal"] = oldal
+        if duplikatum is not None:
+            eredmeny["duplikatum"] = duplikatum
         
-        return eredmeny
-        
-        print("✅ Igaz/Hamis kérdések kiértékelése...")
-        igaz_hamis = self.igaz_hamis_kiertekeles(keretek)
-        
-        print("📝 Feleletválasztós kérdések kiértékelése...")
-        feleletvalasztos = self.feleletvalasztos_kiertekeles(keretek)
-        
-        eredmeny = {
-            "neptun_kod": self.neptun_kod,
-            "kep_fajl": self.kep_utvonal,
-            "kiertekeles_idopontja": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "igaz_hamis": igaz_hamis,
-            "feleletvalasztos": feleletvalasztos
-        }
+        if debug:
+            print(f"   Újraellenőrzött négyzetek: {self.ujraellenorzott_negyzetek}")
         
         return eredmeny
     
@@ -473,25 +1169,31 @@ class TesztlapKiertekelo:
         print(f"\nNeptun kód: {eredmeny.get('neptun_kod', 'N/A')}")
         print(f"Kiértékelés időpontja: {eredmeny.get('kiertekeles_idopontja', 'N/A')}")
         
+        bizonyossag = eredmeny.get("bizonyossag", {})
+        
+        def jelzes(tipus: str, kerdes_szam: int) -> str:
+            b = bizonyossag.get(tipus, {}).get(kerdes_szam)
+            return f" [bizonytalan: {b:.3f}]" if b is not None and b < self.BIZONYTALAN_SAV else ""
+        
         print("\nIgaz/Hamis kérdések:")
         for kerdes_szam, valasz in eredmeny["igaz_hamis"].items():
-            print(f"   {kerdes_szam}. kérdés: {valasz}")
+            print(f"   {kerdes_szam}. kérdés: {valasz}{jelzes('igaz_hamis', kerdes_szam)}")
         print("\nFeleletválasztós kérdések:")
 
         for kerdes_szam, valasz_index in eredmeny["feleletvalasztos"].items():
             if valasz_index >= 0:
-                print(f"   {kerdes_szam}. kérdés: {valasz_index}. válasz (A-D: {chr(65 + valasz_index)})")
+                print(f"   {kerdes_szam}. kérdés: {valasz_index}. válasz ({chr(65 + valasz_index)}){jelzes('feleletvalasztos', kerdes_szam)}")
             elif valasz_index == -1:
-                print(f"   {kerdes_szam}. kérdés: Nincs válasz")
+                print(f"   {kerdes_szam}. kérdés: Nincs válasz{jelzes('feleletvalasztos', kerdes_szam)}")
             elif valasz_index == -2:
-                print(f"   {kerdes_szam}. kérdés: Hibás (több válasz bejelölve)")
+                print(f"   {kerdes_szam}. kérdés: Hibás (több válasz bejelölve){jelzes('feleletvalasztos', kerdes_szam)}")
         
         print("\n" + "="*50)
     
     def debug_kep_mentese(self, kimeneti_utvonal: str = "debug_output.png"):
         debug_kep = cv2.cvtColor(self.szurke, cv2.COLOR_GRAY2BGR)
         
-        skala = self.szelesseg / 600
+        skala = self.SKALA
         vonal_vastag = max(2, int(3 * skala))
         font_vastag = max(1, int(2 * skala))
         font_meret = 0.6 * skala
@@ -536,67 +1238,163 @@ class TesztlapKiertekelo:
         cv2.imwrite(kimeneti_utvonal, debug_kep)
         print(f"Debug kép mentve: {kimeneti_utvonal}")
     
-    def eredmeny_mentese(self, eredmeny: Dict, kimeneti_mappa: str = "eredmenyek"):
-        
+    @staticmethod
+    def eredmeny_mentese(eredmeny: Dict, kimeneti_mappa: str = "eredmenyek", csendes: bool = False):
+        """Az eredmény mentése JSON-ba; `csendes=True` esetén a mentett fájlt nem írja ki (szálakból)."""
         if not os.path.exists(kimeneti_mappa):
             os.makedirs(kimeneti_mappa)
         
-        neptun_kod = eredmeny.get('neptun_kod', 'ISMERETLEN')
+        # Többoldalas dolgozat további oldalain nincs Neptun kód (None)
+        neptun_kod = eredmeny.get('neptun_kod') or 'ISMERETLEN'
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         fajlnev = f"{neptun_kod}_{timestamp}.json"
         fajl_utvonal = os.path.join(kimeneti_mappa, fajlnev)
         
+        # Kötegelt futásnál ugyanabban a másodpercben több azonos kódú lap is készülhet
+        sorszam = 1
+        while os.path.exists(fajl_utvonal):
+            fajl_utvonal = os.path.join(kimeneti_mappa, f"{neptun_kod}_{timestamp}_{sorszam}.json")
+            sorszam += 1
+        
         with open(fajl_utvonal, 'w', encoding='utf-8') as f:
             json.dump(eredmeny, f, ensure_ascii=False, indent=4)
         
-        print(f"[+] Eredmény mentve: {fajl_utvonal}")
+        if not csendes:
+            print(f"[+] Eredmény mentve: {fajl_utvonal}")
         
         return fajl_utvonal
 
 
+class UjrahasznalhatoKiertekelo(TesztlapKiertekelo):
+    """
+    Egy adott lapméretre előkészített, lapról lapra újrahasznált kiértékelő hosszú kötegekhez.
+    A szürkeárnyalatos, a torzított és a szűrt képek előre lefoglalt pufferekbe készülnek,
+    így laponként nem keletkeznek új nagy tömbök. A `feldolgozas` után a példány képei
+    a következő lapig érvényesek.
+    """
+
+    def __init__(self, magassag: int, szelesseg: int, tesseract_path: str = None, zajszures: bool = True,
+                 perspektiva: bool = True, neptun_motor: str = None, profil: GeometriaProfil = None):
+        self.kep_utvonal = None
+        self.tesseract_path = tesseract_path
+        self.zajszures = zajszures
+        self.perspektiva = perspektiva
+        self.neptun_motor = self._neptun_motor_ellenorzese(neptun_motor)
+        # A hívó lapról lapra beállíthatja (lásd futoszalag.py)
+        self.profilozo = None
+        self.jeloles_kuszob = self.JELOLES_KUSZOB
+        self.profil = profil or alapertelmezett_profil()
+
+        km, ksz = self.KANONIKUS_MAGASSAG, self.KANONIKUS_SZELESSEG
+        self.pufferek = {
+            "bemenet": np.empty((magassag, szelesseg), dtype=np.uint8),
+            "szurke": np.empty((km, ksz), dtype=np.uint8),
+            "szurt": np.empty((km, ksz), dtype=np.uint8),
+            "kep": np.empty((km, ksz, 3), dtype=np.uint8),
+        }
+
+    def feldolgozas(self, kep: np.ndarray, nev: str = "<kep>", debug: bool = False, ocr: bool = True,
+                    urlapmodell: Urlapmodell = None, nevsor=None, duplikatum_index=None,
+                    normalizalt: np.ndarray = None, normalizalt_mentes=None) -> Dict:
+        """
+        Egy dekódolt (BGR) lap kiértékelése. `ocr=False` esetén a Neptun kódot nem olvassa ki.
+        Ha `normalizalt` (egy korábban előfeldolgozott kanonikus szürke lap) meg van adva, a `kep`
+        nem kell, és az előfeldolgozás kimarad. A `normalizalt_mentes(szurke)` hívás az
+        előfeldolgozás után kapja meg a kanonikus lapot (pl. a lapgyorsítótárba íráshoz).
+        """
+        self.kep_utvonal = nev
+        with self._szakasz("betoltes"):
+            if normalizalt is not None:
+                self.normalizalt_lap_betoltese(normalizalt)
+            else:
+                self.lap_betoltese(kep)
+        if normalizalt is None and normalizalt_mentes is not None:
+            self.elofeldolgozas(perspektiva=self.perspektiva)
+            with self._szakasz("gyorsitotar_iras"):
+                normalizalt_mentes(self.szurke)
+        if ocr:
+            return self.teljes_kiertekeles(debug=debug, perspektiva=self.perspektiva, urlapmodell=urlapmodell,
+                                           nevsor=nevsor, duplikatum_index=duplikatum_index)
+        return self.geometriai_kiertekeles(debug=debug, perspektiva=self.perspektiva, urlapmodell=urlapmodell,
+                                           duplikatum_index=duplikatum_index)
+
+
+def alapertelmezett_tesseract_utvonal() -> str:
+    """Tesseract útvonal Windowson a tipikus helyekről; Linuxon/Macen általában a PATH-ban van (None)."""
+    if sys.platform != "win32":
+        return None
+    lehetseges_utak = [
+        r"C:\Program Files\Tesseract-OCR\tesseract.exe",
+        r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
+        os.path.expanduser(r"~\AppData\Local\Programs\Tesseract-OCR\tesseract.exe")
+    ]
+    for ut in lehetseges_utak:
+        if os.path.exists(ut):
+            return ut
+    return None
+
+
 def main():
-    
-    kep_utvonal = "kepek/kep_kitoltott.png"
-    perspektiva_korrekcio = True
-    debug = True
-
-    # Tesseract útvonal - próbáljuk meg automatikusan megtalálni
-    tesseract_path = None
-    if sys.platform == "win32":
-        # Windows: próbáljuk meg a tipikus helyeket
-        lehetseges_utak = [
-            r"C:\Program Files\Tesseract-OCR\tesseract.exe",
-            r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
-            os.path.expanduser(r"~\AppData\Local\Programs\Tesseract-OCR\tesseract.exe")
-        ]
-        for ut in lehetseges_utak:
-            if os.path.exists(ut):
-                tesseract_path = ut
-                break
-    # Linux/Mac: általában a PATH-ban van, nem kell megadni
+    parser = argparse.ArgumentParser(description="Egy tesztlap kiértékelése")
+    parser.add_argument("kep", nargs="?", default="kepek/kep_kitoltott.png", help="A tesztlap képe")
+    parser.add_argument("--tesseract-path", default=None,
+                        help="A tesseract program (alapértelmezés: Windowson a szokásos helyek, máshol a PATH)")
+    parser.add_argument("--neptun-motor", choices=TesztlapKiertekelo.NEPTUN_MOTOROK, default=None,
+                        help="Neptun kód felismerő")
+    parser.add_argument("--nevsor", default=None,
+                        help="A kurzus névsora (soronként egy Neptun kód, vagy CSV \"neptun\" oszloppal)")
+    parser.add_argument("--nincs-perspektiva", action="store_true", help="Perspektíva korrekció kikapcsolása")
+    parser.add_argument("--nincs-zajszures", action="store_true", help="Zajszűrés kikapcsolása")
+    parser.add_argument("--csendes", action="store_true", help="Részletes (debug) kiírások kikapcsolása")
+    parser.add_argument("--kimenet", default="eredmenyek", help="Az eredmény JSON mappája (üres: nem ment)")
+    parser.add_argument("--debug-kep", default="debug_output.png", help="A debug kép útvonala (üres: nem ment)")
+    parser.add_argument("--geometria-profil", metavar="FAJL", default=None,
+                        help="Az űrlap geometriai profilja (JSON/TOML, lásd geometriaprofil.py)")
+    # Profilozás: a szakaszok mérése és a forró pontok jelentése ebbe a mappába kerül
+    parser.add_argument("--profile", metavar="MAPPA", default=None, help="Szakaszonkénti profilozás")
+    args = parser.parse_args()
+
+    debug = not args.csendes
+    tesseract_path = args.tesseract_path or alapertelmezett_tesseract_utvonal()
     
     try:
-        print(f"[*] Tesztlap betöltése: {kep_utvonal}")
-        kiertekelo = TesztlapKiertekelo(kep_utvonal, tesseract_path)
-        
-        eredmeny = kiertekelo.teljes_kiertekeles(debug=debug, perspektiva=perspektiva_korrekcio)
+        nevsor = None
+        if args.nevsor:
+            from nevsor import Nevsor
+            nevsor = Nevsor.betoltes(args.nevsor)
+            print(f"[*] Névsor betöltve: {len(nevsor)} Neptun kód")
+        
+        print(f"[*] Tesztlap betöltése: {args.kep}")
+        profilozo = None
+        if args.profile:
+            from profilozas import Profilozo
+            profilozo = Profilozo()
+        kiertekelo = TesztlapKiertekelo(args.kep, tesseract_path, zajszures=not args.nincs_zajszures,
+                                        neptun_motor=args.neptun_motor, profilozo=profilozo,
+                                        profil=profil_betoltese(args.geometria_profil))
+        
+        eredmeny = kiertekelo.teljes_kiertekeles(debug=debug, perspektiva=not args.nincs_perspektiva, nevsor=nevsor)
+        if profilozo is not None:
+            print(f"[+] Profil jelentés: {profilozo.jelentes_irasa(args.profile)}")
         
         kiertekelo.eredmeny_megjelenitese(eredmeny)
-        kiertekelo.eredmeny_mentese(eredmeny)
-        kiertekelo.debug_kep_mentese()
+        if args.kimenet:
+            kiertekelo.eredmeny_mentese(eredmeny, args.kimenet)
+        if args.debug_kep:
+            kiertekelo.debug_kep_mentese(args.debug_kep)
         
         if debug:
             print(f"\n[*] Debug mód aktív - részletes információk megjelenítve")
-        else:
-            print(f"\n[*] Tipp: Állítsd a 'debug = True' értékre a main() függvényben részletes információkért")
         
     except Exception as e:
         print(f"[!] Hiba történt: {e}")
 
         traceback.print_exc()
+        return 1
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
 
 
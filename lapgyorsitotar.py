@@ -0,0 +1,181 @@
+"""
+Előfeldolgozott lapok lemezes gyorsítótára memórialeképezett fájlban.
+
+A küszöbök hangolása utáni újraértékelésnél a dekódolás, a sarokkeresés, az igazítás, a
+normalizálás és a zajszűrés ugyanazt adja, mint az előző futásnál - ezek nem függnek a jelölési
+és a geometriai küszöböktől. A gyorsítótár az előfeldolgozás végeredményét (a kanonikus méretű,
+igazított és zajszűrt szürkeárnyalatos lapot) tárolja nyers uint8 tömbként, a képfájl tartalmának
+hash-e és az előfeldolgozás beállításainak ujjlenyomata
+(`TesztlapKiertekelo.elofeldolgozasi_ujjlenyomat`) szerint.
+
+A mappa tartalma:
+
+    meta.json     verzió és lapalak; eltérésnél a gyorsítótár kiürül
+    lapok.u8      rögzített méretű helyek egymás után, egy hely egy lap
+    index.jsonl   soronként {"kulcs", "hely"}; azonos kulcsnál a későbbi sor érvényes
+
+A munkásfolyamatok csak egy kis leírót kapnak (fájl, eltolás, alak), és a fájlra illesztett
+numpy tömbként, másolás nélkül érik el a lapot. Az indexet csak a létrehozó (fő) folyamat írja,
+és csak a sikeresen kiértékelt lapoknál, így félbeszakadt futás után sem kerül be félkész lap.
+Egy mappát egyszerre csak egy futás használjon.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+GYORSITOTAR_VERZIO = 1
+
+# Leíró: (adatfájl útvonala, bájt eltolás, lap alakja)
+LapLeiro = Tuple[str, int, Tuple[int, int]]
+
+# A munkásfolyamatban leképezett adatfájlok, útvonal szerint
+_lekepezesek: Dict[str, np.memmap] = {}
+
+
+class LapGyorsitotar:
+    """A gyorsítótár a létrehozó folyamat oldalán: index, helyfoglalás és a fájl méretezése."""
+
+    META = "meta.json"
+    ADAT = "lapok.u8"
+    INDEX = "index.jsonl"
+
+    def __init__(self, mappa: str, alak: Tuple[int, int] = (1754, 1240)):
+        """Az `alak` a tárolt lapok (magasság, szélesség) mérete, a kiértékelő kanonikus mérete."""
+        os.makedirs(mappa, exist_ok=True)
+        self.mappa = mappa
+        self.alak = tuple(int(m) for m in alak)
+        self.hely_meret = self.alak[0] * self.alak[1]
+        self.adat_utvonal = os.path.abspath(os.path.join(mappa, self.ADAT))
+        self._index_utvonal = os.path.join(mappa, self.INDEX)
+        self._zar = threading.Lock()
+        self.talalatok = self.hianyok = 0
+
+        meta = {"verzio": GYORSITOTAR_VERZIO, "alak": list(self.alak)}
+        meta_utvonal = os.path.join(mappa, self.META)
+        try:
+            with open(meta_utvonal, 'r', encoding='utf-8') as f:
+                tarolt = json.load(f)
+        except (OSError, ValueError):
+            tarolt = None
+        if tarolt != meta:
+            if tarolt is not None:
+                print(f"[!] A lapgyorsítótár más verziójú vagy lapméretű, kiürítve: {mappa}")
+            for fajl in (self.adat_utvonal, self._index_utvonal):
+                if os.path.exists(fajl):
+                    os.remove(fajl)
+            with open(meta_utvonal, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+
+        if not os.path.exists(self.adat_utvonal):
+            open(self.adat_utvonal, 'wb').close()
+        helyek = os.path.getsize(self.adat_utvonal) // self.hely_meret
+        # kulcs -> hely; a fájlon túlmutató és a (megszakadt írásból maradt) hibás sorokat eldobjuk
+        self._index: Dict[str, int] = {}
+        if os.path.exists(self._index_utvonal):
+            with open(self._index_utvonal, 'r', encoding='utf-8') as f:
+                for sor in f:
+                    try:
+                        bejegyzes = json.loads(sor)
+                        kulcs, hely = bejegyzes["kulcs"], int(bejegyzes["hely"])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    if 0 <= hely < helyek:
+                        self._index[kulcs] = hely
+        # Az index által nem hivatkozott helyek (pl. megszakadt futásból) újrahasznosíthatók
+        self._kovetkezo = max(self._index.values(), default=-1) + 1
+        self._kapacitas = helyek
+        self._index_fajl = open(self._index_utvonal, 'a', encoding='utf-8')
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @staticmethod
+    def kep_hash(adat: bytes) -> str:
+        """A képfájl tartalmának hash-e (a hashlib nagy bemenetnél elengedi a GIL-t)."""
+        return hashlib.sha256(adat).hexdigest()
+
+    def leiro(self, hely: int) -> LapLeiro:
+        return self.adat_utvonal, hely * self.hely_meret, self.alak
+
+    def keres(self, kulcs: str) -> LapLeiro:
+        """A tárolt lap leírója, vagy None. Szálbiztos."""
+        with self._zar:
+            hely = self._index.get(kulcs)
+            if hely is None:
+                self.hianyok += 1
+                return None
+            self.talalatok += 1
+        return self.leiro(hely)
+
+    def bovites(self, db: int):
+        """
+        Az adatfájl előre megnövelése `db` új lapnyi hellyel (ritka fájlként, így nem foglal lemezt,
+        amíg nincs beleírva). A munkások indítása előtt hívva nem kell futás közben újraképezniük.
+        """
+        with self._zar:
+            self._meretezes(self._kovetkezo + db)
+
+    def _meretezes(self, helyek: int):
+        if helyek > self._kapacitas:
+            with open(self.adat_utvonal, 'r+b') as f:
+                f.truncate(helyek * self.hely_meret)
+            self._kapacitas = helyek
+
+    def foglalas(self) -> Tuple[int, LapLeiro]:
+        """Új hely egy laphoz: (hely, leíró). A munkás a leíróval írja be a lapot. Szálbiztos."""
+        with self._zar:
+            hely = self._kovetkezo
+            self._kovetkezo += 1
+            self._meretezes(self._kovetkezo)
+        return hely, self.leiro(hely)
+
+    def rogzites(self, kulcs: str, hely: int):
+        """A beírt lap felvétele az indexbe; csak a lap sikeres kiértékelése után hívandó."""
+        with self._zar:
+            self._index[kulcs] = hely
+            self._index_fajl.write(json.dumps({"kulcs": kulcs, "hely": hely}) + "\n")
+            self._index_fajl.flush()
+
+    def lezaras(self):
+        """Az index lezárása és az adatfájl levágása a használt helyekre."""
+        with self._zar:
+            self._index_fajl.close()
+            helyek = max(self._index.values(), default=-1) + 1
+            with open(self.adat_utvonal, 'r+b') as f:
+                f.truncate(helyek * self.hely_meret)
+                os.fsync(f.fileno())
+            self._kapacitas = self._kovetkezo = helyek
+        # Az ebben a folyamatban (pl. soros futásnál) leképezett, most már túl hosszú fájl elengedése
+        _lekepezesek.pop(self.adat_utvonal, None)
+
+
+def _lekepezes(utvonal: str, vege: int) -> np.memmap:
+    """Az adatfájl leképezése (munkásfolyamatonként egyszer; ha a fájl azóta nőtt, újra)."""
+    terkep = _lekepezesek.get(utvonal)
+    if terkep is None or terkep.size < vege:
+        terkep = np.memmap(utvonal, dtype=np.uint8, mode='r+')
+        _lekepezesek[utvonal] = terkep
+    return terkep
+
+
+def lap_a_gyorsitotarbol(leiro: LapLeiro) -> np.ndarray:
+    """A tárolt lap elérése másolás nélkül (munkásfolyamat oldalon). A tömb csak olvasható."""
+    utvonal, eltolas, alak = leiro
+    terkep = _lekepezes(utvonal, eltolas + alak[0] * alak[1])
+    lap = np.ndarray(alak, dtype=np.uint8, buffer=terkep, offset=eltolas)
+    lap.flags.writeable = False
+    return lap
+
+
+def lap_irasa_gyorsitotarba(leiro: LapLeiro, szurke: np.ndarray):
+    """Az előfeldolgozott lap beírása a foglalt helyre (munkásfolyamat oldalon)."""
+    utvonal, eltolas, alak = leiro
+    if szurke.shape != tuple(alak) or szurke.dtype != np.uint8:
+        raise ValueError(f"A lap alakja ({szurke.shape}, {szurke.dtype}) nem egyezik a gyorsítótáréval ({alak})")
+    terkep = _lekepezes(utvonal, eltolas + alak[0] * alak[1])
+    np.copyto(np.ndarray(alak, dtype=np.uint8, buffer=terkep, offset=eltolas), szurke)
@@ -0,0 +1,449 @@
+"""
+Tesseract nélküli Neptun kód felismerés: karakterszegmentálás és numpy kNN osztályozó.
+
+A tanítóhalmaz renderelt betűképekből áll (a tesztlapgenerátor betűtípusa, ha elérhető,
+valamint az OpenCV beépített Hershey betűtípusai, köztük a kézírásszerűek), kis
+elforgatással, vastagítással és eltolással bővítve. A felismerés a futószalag
+OCR lépcsőjében vagy a kiértékelőben választható a Tesseract helyett
+(`neptun_motor="knn"`), és több lap karakterei egyetlen mátrixszorzással osztályozhatók.
+
+A `knn` motor előtt a modellt egyszer be kell tanítani (`tanitas`); ez a neptun_modell.npz
+fájlba kerül. A modell a gépen elérhető betűtípusokból (és a megadott valódi lapokból) készül,
+ezért nincs verziókezelve; ha hiányzik, a felismerés érthető hibával leáll.
+
+Használat:
+    python neptun_felismero.py tanitas [--kimenet neptun_modell.npz]
+    python neptun_felismero.py osszehasonlitas [--lapok 200] [--kepek kepek/*.png --vart X6Z71T]
+"""
+import argparse
+import glob
+import os
+import random
+import threading
+import time
+from typing import List, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+
+KARAKTEREK = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+NEPTUN_HOSSZ = 6
+
+# A karakterképek normalizált mérete (négyzetesre kiegészítve), a gradiens cellák és irányok száma
+JELLEMZO_MERET = 20
+CELLAK = 4
+IRANYOK = 8
+_CELLA_SOR, _CELLA_OSZLOP = np.mgrid[0:JELLEMZO_MERET, 0:JELLEMZO_MERET] * CELLAK // JELLEMZO_MERET
+
+ALAP_MODELL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "neptun_modell.npz")
+
+HERSHEY_BETUK = [
+    cv2.FONT_HERSHEY_SIMPLEX,
+    cv2.FONT_HERSHEY_PLAIN,
+    cv2.FONT_HERSHEY_DUPLEX,
+    cv2.FONT_HERSHEY_COMPLEX,
+    cv2.FONT_HERSHEY_TRIPLEX,
+    cv2.FONT_HERSHEY_SCRIPT_SIMPLEX,
+    cv2.FONT_HERSHEY_SCRIPT_COMPLEX,
+    cv2.FONT_HERSHEY_SIMPLEX | cv2.FONT_ITALIC,
+    cv2.FONT_HERSHEY_DUPLEX | cv2.FONT_ITALIC,
+]
+
+# A tesztlapgenerátor Arial betűtípusa (Windows), illetve a reportlab Helvetica helyettesítői
+TTF_UTVONALAK = [
+    r"C:\Windows\Fonts\arial.ttf",
+    r"C:\Windows\Fonts\Arial.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+]
+
+
+def _ttf_betuk() -> List[str]:
+    """Elérhető TrueType betűtípusok, beleértve a reportlab-bal szállított Vera betűket."""
+    utvonalak = [u for u in TTF_UTVONALAK if os.path.exists(u)]
+    try:
+        import reportlab
+        mappa = os.path.join(os.path.dirname(reportlab.__file__), "fonts")
+        utvonalak += sorted(glob.glob(os.path.join(mappa, "Vera*.ttf")))
+    except ImportError:
+        pass
+    return utvonalak
+
+
+def jellemzok(karakter_kep: np.ndarray) -> np.ndarray:
+    """
+    Egy karakter (fekete alapon fehér, kivágott) képéből normalizált jellemzővektor:
+    négyzetesre kiegészítés és átméretezés után cellánkénti gradiensirány-hisztogram
+    (4x4 cella, 8 irány), nulla átlaggal és egységnyi hosszal. A vonalvastagságra és
+    a kis eltolásokra kevésbé érzékeny, mint a nyers pixelek.
+    """
+    mag, szel = karakter_kep.shape
+    oldal = max(mag, szel) + 4
+    negyzetes = np.zeros((oldal, oldal), dtype=np.uint8)
+    y0, x0 = (oldal - mag) // 2, (oldal - szel) // 2
+    negyzetes[y0:y0 + mag, x0:x0 + szel] = karakter_kep
+    kicsi = cv2.resize(negyzetes, (JELLEMZO_MERET, JELLEMZO_MERET), interpolation=cv2.INTER_AREA).astype(np.float32)
+
+    gx = cv2.Sobel(kicsi, cv2.CV_32F, 1, 0)
+    gy = cv2.Sobel(kicsi, cv2.CV_32F, 0, 1)
+    nagysag = np.hypot(gx, gy)
+    irany = np.minimum((np.arctan2(gy, gx) % np.pi) / np.pi * IRANYOK, IRANYOK - 1).astype(np.intp)
+
+    hisztogram = np.zeros((CELLAK, CELLAK, IRANYOK), dtype=np.float32)
+    np.add.at(hisztogram, (_CELLA_SOR, _CELLA_OSZLOP, irany), nagysag)
+    vektor = np.sqrt(hisztogram.ravel())
+    vektor -= vektor.mean()
+    hossz = np.linalg.norm(vektor)
+    return vektor / hossz if hossz > 0 else vektor
+
+
+def karakterek_szegmentalasa(binarizalt: np.ndarray, darab: int = NEPTUN_HOSSZ) -> List[np.ndarray]:
+    """
+    A binarizált Neptun kivágás (fehér alapon fekete írás) karakterekre bontása balról jobbra.
+    A keret maradványait (hosszú vízszintes/függőleges vonalak) előbb eltávolítjuk.
+    """
+    mag, szel = binarizalt.shape
+    tinta = cv2.bitwise_not(binarizalt)
+
+    # Keretvonalak eltávolítása morfológiai nyitással talált hosszú vonalak kivonásával
+    vizszintes = cv2.morphologyEx(tinta, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (max(1, szel // 3), 1)))
+    fuggoleges = cv2.morphologyEx(tinta, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(1, int(mag * 0.8)))))
+    tinta = cv2.subtract(tinta, cv2.bitwise_or(vizszintes, fuggoleges))
+
+    db, cimkek, statisztika, _ = cv2.connectedComponentsWithStats(tinta, connectivity=8)
+    dobozok = []
+    megtartott = np.zeros(db, dtype=bool)
+    for i in range(1, db):
+        x, y, w, h, terulet = statisztika[i]
+        # Zaj és a keret szélén maradt töredékek kiszűrése
+        if h < mag * 0.3 or terulet < mag * 0.3:
+            continue
+        if x == 0 or x + w >= szel:
+            continue
+        dobozok.append([x, y, x + w, y + h, terulet])
+        megtartott[i] = True
+    # Csak a megtartott komponensek maradnak a képen, hogy a kivágásba ne lógjon bele zaj
+    tinta = np.where(megtartott[cimkek], np.uint8(255), np.uint8(0))
+
+    # Vízszintesen nagyrészt átfedő darabok (pl. szakadt vonású betű) összevonása
+    dobozok.sort(key=lambda d: d[0])
+    osszevont = []
+    for d in dobozok:
+        if osszevont:
+            u = osszevont[-1]
+            atfedes = min(u[2], d[2]) - max(u[0], d[0])
+            if atfedes > 0.5 * min(u[2] - u[0], d[2] - d[0]):
+                osszevont[-1] = [min(u[0], d[0]), min(u[1], d[1]), max(u[2], d[2]), max(u[3], d[3]), u[4] + d[4]]
+                continue
+        osszevont.append(d)
+    dobozok = osszevont
+
+    # Túl sok darab: a legnagyobbakat tartjuk meg
+    if len(dobozok) > darab:
+        dobozok = sorted(sorted(dobozok, key=lambda d: d[4], reverse=True)[:darab], key=lambda d: d[0])
+
+    # Túl kevés darab: az összeérő karaktereket a legszélesebb doboz vetületi minimumánál vágjuk
+    while 0 < len(dobozok) < darab:
+        szelessegek = [d[2] - d[0] for d in dobozok]
+        i = int(np.argmax(szelessegek))
+        if szelessegek[i] < 1.4 * np.median(szelessegek) and len(dobozok) > 1:
+            break
+        x0, y0, x1, y1, terulet = dobozok[i]
+        if x1 - x0 < 3:
+            break  # ennél keskenyebb doboz nem vágható három részre (pl. egyetlen vonal)
+        vetulet = (tinta[y0:y1, x0:x1] > 0).sum(axis=0)
+        harmad = max(1, (x1 - x0) // 3)
+        vagas = x0 + harmad + int(np.argmin(vetulet[harmad:2 * harmad]))
+        dobozok[i:i + 1] = [[x0, y0, vagas, y1, terulet // 2], [vagas, y0, x1, y1, terulet // 2]]
+
+    karakterek = []
+    for x0, _, x1, _, _ in dobozok:
+        oszlop = tinta[:, x0:x1]
+        sorok = np.nonzero(oszlop.any(axis=1))[0]
+        if len(sorok) == 0:
+            continue
+        karakterek.append(oszlop[sorok[0]:sorok[-1] + 1])
+    return karakterek
+
+
+def _karakter_renderelese(karakter: str, betu, meret: int, vastagsag: int) -> np.ndarray:
+    """Egy karakter fekete alapon fehér képe, Hershey betűtípussal vagy PIL TrueType betűvel."""
+    vaszon = np.zeros((meret * 3, meret * 3), dtype=np.uint8)
+    if isinstance(betu, str):
+        from PIL import Image, ImageDraw, ImageFont
+        kep = Image.fromarray(vaszon)
+        ImageDraw.Draw(kep).text((meret // 2, meret // 2), karakter, fill=255,
+                                 font=ImageFont.truetype(betu, meret), stroke_width=vastagsag - 1, stroke_fill=255)
+        vaszon = np.asarray(kep).copy()
+    else:
+        skala = meret / 30
+        cv2.putText(vaszon, karakter, (meret // 2, 2 * meret), betu, skala, 255, vastagsag, cv2.LINE_AA)
+    return vaszon
+
+
+def _torzitas(kep: np.ndarray, rnd: random.Random) -> np.ndarray:
+    """Kis elforgatás, nyírás és vastagságváltozás a kézírás és a szkennelés utánzására."""
+    mag, szel = kep.shape
+    szog = rnd.uniform(-8, 8)
+    nyiras = rnd.uniform(-0.2, 0.2)
+    matrix = cv2.getRotationMatrix2D((szel / 2, mag / 2), szog, rnd.uniform(0.9, 1.1))
+    matrix[0, 1] += nyiras
+    kep = cv2.warpAffine(kep, matrix, (szel, mag))
+    muvelet = rnd.choice([None, cv2.dilate, cv2.erode])
+    if muvelet is not None:
+        kep = muvelet(kep, np.ones((2, 2), np.uint8))
+    _, kep = cv2.threshold(kep, 100, 255, cv2.THRESH_BINARY)
+    return kep
+
+
+def _kivagas(kep: np.ndarray) -> np.ndarray:
+    ys, xs = np.nonzero(kep)
+    if len(xs) == 0:
+        return None
+    return kep[ys.min():ys.max() + 1, xs.min():xs.max() + 1]
+
+
+def tanito_karakterek(valtozatok: int = 6, seed: int = 0) -> Tuple[List[np.ndarray], List[str]]:
+    """Renderelt és torzított karakterképek (fekete alapon fehér, kivágva) a címkéikkel."""
+    rnd = random.Random(seed)
+    betuk = HERSHEY_BETUK + _ttf_betuk()
+    kepek, cimkek = [], []
+    for karakter in KARAKTEREK:
+        for betu in betuk:
+            for _ in range(valtozatok):
+                kep = _karakter_renderelese(karakter, betu, meret=rnd.choice([28, 36, 44]),
+                                            vastagsag=rnd.choice([1, 2, 3, 4, 5]))
+                kep = _kivagas(_torzitas(kep, rnd))
+                if kep is not None:
+                    kepek.append(kep)
+                    cimkek.append(karakter)
+    return kepek, cimkek
+
+
+def szintetikus_neptun_kivagas(kod: str, rnd: random.Random, magassag: int = 76, szelesseg: int = 435) -> np.ndarray:
+    """
+    A `neptun_ocr_elokeszites` kimenetéhez hasonló binarizált kivágás (fehér alapon fekete írás,
+    keretmaradványokkal) egy adott kódhoz - a motorok összehasonlításához.
+    """
+    kivagas = np.full((magassag, szelesseg), 255, dtype=np.uint8)
+    betuk = HERSHEY_BETUK + _ttf_betuk()
+    x = 15
+    for karakter in kod:
+        kep = _kivagas(_torzitas(_karakter_renderelese(karakter, rnd.choice(betuk), 40, rnd.choice([2, 3])), rnd))
+        if kep is None:
+            continue
+        arany = rnd.uniform(0.55, 0.75) * magassag / kep.shape[0]
+        kep = cv2.resize(kep, None, fx=arany, fy=arany, interpolation=cv2.INTER_AREA)
+        kep = kep[:magassag - 8, :szelesseg - x - 4]
+        y = (magassag - kep.shape[0]) // 2 + rnd.randint(-3, 3)
+        terulet = kivagas[y:y + kep.shape[0], x:x + kep.shape[1]]
+        terulet[kep > 127] = 0
+        x += kep.shape[1] + rnd.randint(12, 30)
+    # Keretmaradványok, mint a valódi kivágáson
+    kivagas[:, :4] = 0
+    kivagas[:2, :] = 0
+    kivagas[-2:, :] = 0
+    return kivagas
+
+
+class NeptunFelismero:
+    """Karakterenkénti kNN osztályozó koszinusz hasonlósággal (egyetlen mátrixszorzás)."""
+
+    def __init__(self, minta_jellemzok: np.ndarray, minta_cimkek: np.ndarray, k: int = 3):
+        self.minta_jellemzok = minta_jellemzok.astype(np.float32)
+        self.minta_cimkek = minta_cimkek
+        self.k = k
+
+    @classmethod
+    def betanitas(cls, valtozatok: int = 6, seed: int = 0, k: int = 3) -> "NeptunFelismero":
+        kepek, cimkek = tanito_karakterek(valtozatok, seed)
+        minta = np.stack([jellemzok(kep) for kep in kepek])
+        return cls(minta, np.array([KARAKTEREK.index(c) for c in cimkek], dtype=np.int8), k)
+
+    def minta_hozzaadasa(self, kivagasok: Sequence[np.ndarray], kodok: Sequence[str]) -> int:
+        """
+        Valódi, ismert kódú kivágások karaktereinek felvétele a mintahalmazba (pl. az adott
+        évfolyam kézírásához igazításhoz). Csak a pontosan 6 karakterre bontott kivágásokat
+        használjuk. A felvett minták számát adja vissza.
+        """
+        uj_jellemzok, uj_cimkek = [], []
+        for kivagas, kod in zip(kivagasok, kodok):
+            karakterek = karakterek_szegmentalasa(kivagas)
+            if len(karakterek) != NEPTUN_HOSSZ or len(kod) != NEPTUN_HOSSZ:
+                continue
+            for kep, karakter in zip(karakterek, kod.upper()):
+                if karakter in KARAKTEREK:
+                    uj_jellemzok.append(jellemzok(kep))
+                    uj_cimkek.append(KARAKTEREK.index(karakter))
+        if uj_jellemzok:
+            self.minta_jellemzok = np.vstack([self.minta_jellemzok, np.stack(uj_jellemzok)])
+            self.minta_cimkek = np.concatenate([self.minta_cimkek, np.array(uj_cimkek, dtype=np.int8)])
+        return len(uj_jellemzok)
+
+    def mentes(self, utvonal: str = ALAP_MODELL):
+        np.savez_compressed(utvonal, jellemzok=self.minta_jellemzok, cimkek=self.minta_cimkek, k=self.k)
+
+    @classmethod
+    def betoltes(cls, utvonal: str = ALAP_MODELL) -> "NeptunFelismero":
+        with np.load(utvonal) as adat:
+            return cls(adat["jellemzok"], adat["cimkek"], int(adat["k"]))
+
+    def karakterek_osztalyozasa(self, karakter_kepek: Sequence[np.ndarray]) -> Tuple[List[str], np.ndarray]:
+        """Karakterképek osztályozása egyben. A karakterek mellett a legjobb hasonlóságokat adja vissza."""
+        if not karakter_kepek:
+            return [], np.zeros(0, dtype=np.float32)
+        x = np.stack([jellemzok(kep) for kep in karakter_kepek])
+        hasonlosag = x @ self.minta_jellemzok.T
+        legjobbak = np.argpartition(-hasonlosag, self.k - 1, axis=1)[:, :self.k]
+
+        # Szavazás a k legközelebbi mintára, hasonlósággal súlyozva
+        szavazatok = np.zeros((len(x), len(KARAKTEREK)), dtype=np.float32)
+        sorok = np.repeat(np.arange(len(x)), self.k)
+        np.add.at(szavazatok, (sorok, self.minta_cimkek[legjobbak].ravel()),
+                  np.take_along_axis(hasonlosag, legjobbak, axis=1).ravel())
+        osztalyok = szavazatok.argmax(axis=1)
+        return [KARAKTEREK[o] for o in osztalyok], hasonlosag.max(axis=1)
+
+    def felismeres_kotegben(self, kivagasok: Sequence[np.ndarray], nyers: bool = False) -> List[Tuple[str, float]]:
+        """
+        Több lap binarizált Neptun kivágásának felismerése egyetlen osztályozással.
+        Laponként (kód, bizonyosság) párt ad; a kód "ISMERETLEN", ha nem 6 karakter található.
+        `nyers=True` esetén ilyenkor is a felismert karaktereket adja (pl. névsoros illesztéshez).
+        """
+        szegmensek = [karakterek_szegmentalasa(kivagas) for kivagas in kivagasok]
+        karakterek, hasonlosagok = self.karakterek_osztalyozasa([k for lap in szegmensek for k in lap])
+
+        eredmenyek = []
+        i = 0
+        for lap in szegmensek:
+            n = len(lap)
+            if n == NEPTUN_HOSSZ:
+                eredmenyek.append(("".join(karakterek[i:i + n]), round(float(hasonlosagok[i:i + n].min()), 3)))
+            elif nyers:
+                eredmenyek.append(("".join(karakterek[i:i + n]), 0.0))
+            else:
+                eredmenyek.append(("ISMERETLEN", 0.0))
+            i += n
+        return eredmenyek
+
+    def felismeres(self, kivagas: np.ndarray) -> str:
+        return self.felismeres_kotegben([kivagas])[0][0]
+
+
+_alap_felismero = None
+_alap_zar = threading.Lock()
+
+
+def modell_ellenorzese(utvonal: str = ALAP_MODELL):
+    """Hiányzó modellnél FileNotFoundError a betanítás parancsával (a munkások indítása előtt hívandó)."""
+    if not os.path.exists(utvonal):
+        raise FileNotFoundError(f"Nincs betanított Neptun modell: {utvonal} "
+                                f"(betanítás: python neptun_felismero.py tanitas)")
+
+
+def alap_felismero() -> NeptunFelismero:
+    """A mentett modell folyamatonként egyszer betöltve. Ha nincs, FileNotFoundError (lásd `modell_ellenorzese`)."""
+    global _alap_felismero
+    with _alap_zar:
+        if _alap_felismero is None:
+            modell_ellenorzese(ALAP_MODELL)
+            _alap_felismero = NeptunFelismero.betoltes(ALAP_MODELL)
+        return _alap_felismero
+
+
+def lapok_kivagasai(kepek: List[str]) -> List[np.ndarray]:
+    """Valódi lapok binarizált Neptun kivágásai, a kiértékelő előkészítésével."""
+    import contextlib
+    import io
+    from kiertekelo import TesztlapKiertekelo
+
+    kivagasok = []
+    for utvonal in kepek:
+        with contextlib.redirect_stdout(io.StringIO()):
+            kiertekelo = TesztlapKiertekelo(utvonal)
+            kiertekelo.geometriai_kiertekeles()
+            kivagasok.append(kiertekelo.neptun_ocr_elokeszites())
+    return kivagasok
+
+
+def osszehasonlitas(lapok: int = 200, seed: int = 1, kepek: List[str] = None, vart: str = None,
+                    tesseract_path: str = None):
+    """A kNN és a Tesseract motor pontossága és sebessége szintetikus és (megadva) valódi lapokon."""
+    from kiertekelo import TesztlapKiertekelo
+
+    rnd = random.Random(seed)
+    kodok = ["".join(rnd.choice(KARAKTEREK) for _ in range(NEPTUN_HOSSZ)) for _ in range(lapok)]
+    kivagasok = [szintetikus_neptun_kivagas(kod, rnd) for kod in kodok]
+    vart_kodok = list(kodok)
+
+    if kepek:
+        kivagasok += lapok_kivagasai(kepek)
+        vart_kodok += [vart] * len(kepek)
+
+    felismero = alap_felismero()
+    print(f"[*] {len(kivagasok)} kivágás ({lapok} szintetikus, {len(kivagasok) - lapok} valódi)")
+
+    def meres(nev, fuggveny):
+        kezdes = time.perf_counter()
+        kapott = fuggveny()
+        ido = time.perf_counter() - kezdes
+        csoportok = [("szintetikus", 0, lapok), ("valódi", lapok, len(kivagasok))]
+        for csoport, tol, ig in csoportok:
+            if ig <= tol:
+                continue
+            parok = list(zip(kapott[tol:ig], vart_kodok[tol:ig]))
+            kod_talalat = sum(k == v for k, v in parok)
+            karakter_talalat = sum(a == b for k, v in parok if len(k) == len(v) for a, b in zip(k, v))
+            print(f"   {nev:<10} {csoport:<12} kód: {kod_talalat / len(parok):6.1%}  "
+                  f"karakter: {karakter_talalat / (NEPTUN_HOSSZ * len(parok)):6.1%}")
+        print(f"   {nev:<10} idő: {1000 * ido / len(kivagasok):.2f} ms/lap")
+
+    meres("knn", lambda: [kod for kod, _ in felismero.felismeres_kotegben(kivagasok)])
+    try:
+        import pytesseract
+        if tesseract_path:
+            pytesseract.pytesseract.tesseract_cmd = tesseract_path
+        pytesseract.get_tesseract_version()
+    except Exception as e:
+        print(f"   tesseract  nem érhető el: {e}")
+        return
+    meres("tesseract", lambda: [TesztlapKiertekelo.neptun_ocr(k, tesseract_path) for k in kivagasok])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tesseract nélküli Neptun kód felismerő")
+    alparancsok = parser.add_subparsers(dest="parancs", required=True)
+
+    tanitas = alparancsok.add_parser("tanitas", help="Modell betanítása renderelt karakterekből")
+    tanitas.add_argument("--kimenet", default=ALAP_MODELL)
+    tanitas.add_argument("--valtozatok", type=int, default=6, help="Torzított változatok karakterenként és betűnként")
+    tanitas.add_argument("-k", type=int, default=3)
+    tanitas.add_argument("--kepek", nargs="*", default=[], help="Ismert kódú valódi lapok (glob minták)")
+    tanitas.add_argument("--vart", default=None, help="A valódi lapok Neptun kódja")
+
+    osszevetes = alparancsok.add_parser("osszehasonlitas", help="kNN és Tesseract pontossága és sebessége")
+    osszevetes.add_argument("--lapok", type=int, default=200, help="Szintetikus kivágások száma")
+    osszevetes.add_argument("--kepek", nargs="*", default=[], help="Valódi lapok (glob minták)")
+    osszevetes.add_argument("--vart", default=None, help="A valódi lapok várt Neptun kódja")
+    osszevetes.add_argument("--tesseract-path", default=None)
+
+    args = parser.parse_args()
+    if bool(args.kepek) != bool(args.vart):
+        parser.error("a --kepek és a --vart csak együtt adható meg")
+    if args.parancs == "tanitas":
+        kezdes = time.perf_counter()
+        felismero = NeptunFelismero.betanitas(args.valtozatok, k=args.k)
+        kepek = sorted({u for minta in args.kepek for u in (glob.glob(minta) or [minta])})
+        if kepek and args.vart:
+            felvett = felismero.minta_hozzaadasa(lapok_kivagasai(kepek), [args.vart] * len(kepek))
+            print(f"[*] Valódi lapokról felvett karakterek: {felvett}")
+        felismero.mentes(args.kimenet)
+        print(f"[+] {len(felismero.minta_cimkek)} minta, {time.perf_counter() - kezdes:.1f} s: {args.kimenet}")
+    else:
+        kepek = sorted({u for minta in args.kepek for u in (glob.glob(minta) or [minta])})
+        osszehasonlitas(args.lapok, kepek=kepek, vart=args.vart, tesseract_path=args.tesseract_path)
+
+
+if __name__ == "__main__":
+    main()
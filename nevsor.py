@@ -0,0 +1,191 @@
+"""
+Kurzus névsor alapú Neptun kód ellenőrzés és javítás.
+
+A névsor kódjai egy BK-fába kerülnek. A távolság egy súlyozott szerkesztési távolság,
+amelyben az OCR által gyakran összetévesztett karakterek (0/O, 1/I, 8/B, ...) cseréje
+csak fél lépésnek számít. A súlyok fél egységekben egészek, és teljesítik a háromszög-
+egyenlőtlenséget, így a BK-fa keresése pontos marad.
+"""
+import csv
+import os
+from typing import Dict, Iterable, List, Tuple
+
+
+NEPTUN_HOSSZ = 6
+
+# OCR tévesztési csoportok: egy csoporton belüli csere fél lépés
+TEVESZTESI_CSOPORTOK = [
+    "0OQD",
+    "1IL7T",
+    "8B",
+    "5S",
+    "2Z",
+    "6G",
+    "4A",
+    "UV",
+    "MN",
+    "KX",
+]
+
+# Költségek fél lépésekben
+TEVESZTES_KOLTSEG = 1
+CSERE_KOLTSEG = 2
+BESZURAS_KOLTSEG = 2
+
+_CSOPORT = {}
+for _i, _csoport in enumerate(TEVESZTESI_CSOPORTOK):
+    for _karakter in _csoport:
+        _CSOPORT.setdefault(_karakter, set()).add(_i)
+
+
+def csere_koltseg(a: str, b: str) -> int:
+    if a == b:
+        return 0
+    if _CSOPORT.get(a, set()) & _CSOPORT.get(b, set()):
+        return TEVESZTES_KOLTSEG
+    return CSERE_KOLTSEG
+
+
+def ocr_tavolsag(a: str, b: str) -> int:
+    """Tévesztésekre súlyozott Levenshtein távolság fél lépésekben."""
+    if len(a) < len(b):
+        a, b = b, a
+    elozo = [j * BESZURAS_KOLTSEG for j in range(len(b) + 1)]
+    for i, ka in enumerate(a, 1):
+        aktualis = [i * BESZURAS_KOLTSEG]
+        for j, kb in enumerate(b, 1):
+            aktualis.append(min(
+                elozo[j] + BESZURAS_KOLTSEG,
+                aktualis[j - 1] + BESZURAS_KOLTSEG,
+                elozo[j - 1] + csere_koltseg(ka, kb),
+            ))
+        elozo = aktualis
+    return elozo[-1]
+
+
+class BKFa:
+    """Burkhard-Keller fa egész értékű metrikához."""
+
+    def __init__(self, tavolsag=ocr_tavolsag):
+        self.tavolsag = tavolsag
+        self.gyoker = None  # (kulcs, {távolság: részfa})
+        self.meret = 0
+
+    def hozzaadas(self, kulcs: str):
+        if self.gyoker is None:
+            self.gyoker = (kulcs, {})
+            self.meret = 1
+            return
+        csucs = self.gyoker
+        while True:
+            d = self.tavolsag(kulcs, csucs[0])
+            if d == 0:
+                return  # már benne van
+            gyerek = csucs[1].get(d)
+            if gyerek is None:
+                csucs[1][d] = (kulcs, {})
+                self.meret += 1
+                return
+            csucs = gyerek
+
+    def kereses(self, kulcs: str, sugar: int) -> List[Tuple[int, str]]:
+        """Az összes elem legfeljebb `sugar` távolságra, távolság szerint rendezve."""
+        if self.gyoker is None:
+            return []
+        talalatok = []
+        verem = [self.gyoker]
+        while verem:
+            elem, gyerekek = verem.pop()
+            d = self.tavolsag(kulcs, elem)
+            if d <= sugar:
+                talalatok.append((d, elem))
+            # Háromszög-egyenlőtlenség: csak a [d - sugar, d + sugar] élű részfákban lehet találat
+            for el, gyerek in gyerekek.items():
+                if d - sugar <= el <= d + sugar:
+                    verem.append(gyerek)
+        talalatok.sort()
+        return talalatok
+
+
+class Nevsor:
+    """A kurzus érvényes Neptun kódjai, OCR eredmények illesztéséhez."""
+
+    # Ennél távolabbi (fél lépésekben) találatot nem fogadunk el: legfeljebb két valódi csere
+    # (vagy ennek megfelelő tévesztések); a zsúfolt névsort az egyértelműség kezeli
+    ALAP_MAX_TAVOLSAG = 4
+
+    def __init__(self, kodok: Iterable[str], max_tavolsag: int = ALAP_MAX_TAVOLSAG):
+        self.max_tavolsag = max_tavolsag
+        self.fa = BKFa()
+        self.kodok = set()
+        for kod in kodok:
+            kod = self.normalizalas(kod)
+            if len(kod) == NEPTUN_HOSSZ and kod.isalnum():
+                self.kodok.add(kod)
+                self.fa.hozzaadas(kod)
+
+    def __len__(self) -> int:
+        return len(self.kodok)
+
+    def __contains__(self, kod: str) -> bool:
+        return self.normalizalas(kod) in self.kodok
+
+    @staticmethod
+    def normalizalas(kod: str) -> str:
+        return "".join(k for k in (kod or "").upper() if k.isalnum())
+
+    @classmethod
+    def betoltes(cls, utvonal: str, max_tavolsag: int = ALAP_MAX_TAVOLSAG) -> "Nevsor":
+        """
+        Névsor betöltése: soronként egy kód, vagy CSV, amelynek van "neptun" (bármilyen
+        kis/nagybetűvel) kezdetű oszlopa; ha nincs ilyen fejléc, az első oszlopot használjuk.
+        """
+        with open(utvonal, 'r', encoding='utf-8-sig', newline='') as f:
+            tartalom = f.read()
+        if os.path.splitext(utvonal)[1].lower() != ".csv":
+            return cls(tartalom.split(), max_tavolsag)
+
+        dialektus = csv.Sniffer().sniff(tartalom[:4096], delimiters=",;\t") if tartalom.strip() else csv.excel
+        sorok = list(csv.reader(tartalom.splitlines(), dialektus))
+        oszlop = 0
+        if sorok:
+            fejlec = [c.strip().lower() for c in sorok[0]]
+            neptun_oszlopok = [i for i, c in enumerate(fejlec) if c.startswith("neptun")]
+            if neptun_oszlopok:
+                oszlop = neptun_oszlopok[0]
+                sorok = sorok[1:]
+        return cls((sor[oszlop] for sor in sorok if len(sor) > oszlop), max_tavolsag)
+
+    def illesztes(self, ocr_szoveg: str) -> Dict:
+        """
+        Az OCR eredmény illesztése a legközelebbi névsorbeli kódhoz.
+
+        Visszaad: {"ocr": ..., "kod": illesztett kód vagy None, "tavolsag": fél lépésekben,
+        "bizonyossag": 0..1}. A bizonyosság a távolsággal csökken, és kicsi, ha a második
+        legközelebbi kód is majdnem ugyanolyan közel van.
+        """
+        szoveg = self.normalizalas(ocr_szoveg)
+        eredmeny = {"ocr": ocr_szoveg, "kod": None, "tavolsag": None, "bizonyossag": 0.0}
+        if not szoveg or not self.kodok:
+            return eredmeny
+
+        # A második találathoz egy lépéssel tágabb körben keresünk
+        talalatok = self.fa.kereses(szoveg, self.max_tavolsag + CSERE_KOLTSEG)
+        if not talalatok or talalatok[0][0] > self.max_tavolsag:
+            return eredmeny
+
+        d1, kod = talalatok[0]
+        eredmeny["kod"] = kod
+        eredmeny["tavolsag"] = d1
+        kozelseg = 1 - d1 / (2 * (self.max_tavolsag + 1))
+        if len(talalatok) > 1:
+            d2 = talalatok[1][0]
+            egyertelmuseg = min(1.0, (d2 - d1) / CSERE_KOLTSEG)
+        else:
+            egyertelmuseg = 1.0
+        eredmeny["bizonyossag"] = round(kozelseg * egyertelmuseg, 3)
+        return eredmeny
+
+    def elfogadhato(self, illesztes: Dict, min_bizonyossag: float = 0.5) -> bool:
+        """Elég közeli és egyértelmű-e az illesztés ahhoz, hogy ne kelljen újra olvasni."""
+        return illesztes["kod"] is not None and illesztes["bizonyossag"] >= min_bizonyossag
@@ -0,0 +1,80 @@
+"""
+Dekódolt lapok átadása folyamatok között osztott memórián keresztül.
+
+A futószalag olvasói a dekódolt képet egy `multiprocessing.shared_memory` gyűrűpuffer
+egyik helyére írják, a munkásfolyamatok pedig csak egy kis leírót kapnak
+(puffer neve, eltolás, alak), és másolás nélkül, közvetlenül a pufferre
+illesztett numpy tömbként érik el a képet.
+"""
+import queue
+from multiprocessing import shared_memory
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+# Leíró: (osztott memória neve, bájt eltolás, kép alakja)
+KepLeiro = Tuple[str, int, Tuple[int, ...]]
+
+# A munkásfolyamatban egyszer csatolt pufferek, név szerint
+_csatolt_pufferek: Dict[str, shared_memory.SharedMemory] = {}
+
+
+class KepGyuruPuffer:
+    """
+    Rögzített méretű helyekből álló gyűrűpuffer; a szabad helyek sora egyben visszanyomást is ad.
+    A puffert a munkásfolyamatok indítása (az első `submit`) előtt kell létrehozni, lásd `puffer_csatolasa`.
+    """
+
+    # Alapértelmezett helyméret: A4 300 DPI-n, 3 csatornával
+    ALAP_HELY_MERET = 3508 * 2480 * 3
+
+    def __init__(self, helyek: int, hely_meret: int = ALAP_HELY_MERET):
+        self.helyek = helyek
+        self.hely_meret = hely_meret
+        self.shm = shared_memory.SharedMemory(create=True, size=helyek * hely_meret)
+        self.szabad = queue.Queue()
+        for hely in range(helyek):
+            self.szabad.put(hely)
+
+    def foglalas(self) -> int:
+        """Szabad hely foglalása; blokkol, amíg nincs szabad hely."""
+        return self.szabad.get()
+
+    def felszabaditas(self, hely: int):
+        self.szabad.put(hely)
+
+    def elfer(self, kep: np.ndarray) -> bool:
+        return kep.nbytes <= self.hely_meret
+
+    def iras(self, hely: int, kep: np.ndarray) -> KepLeiro:
+        """A kép bemásolása a helyre; a munkásnak átadható leírót adja vissza."""
+        eltolas = hely * self.hely_meret
+        cel = np.ndarray(kep.shape, dtype=np.uint8, buffer=self.shm.buf, offset=eltolas)
+        np.copyto(cel, kep)
+        return self.shm.name, eltolas, kep.shape
+
+    def lezaras(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def puffer_csatolasa(nev: str) -> memoryview:
+    """A létrehozó folyamat pufferének csatolása név alapján (munkásfolyamatonként egyszer)."""
+    shm = _csatolt_pufferek.get(nev)
+    if shm is None:
+        # A munkások csak akkor öröklik a létrehozó folyamat resource trackerét, ha a puffer
+        # létrehozása (ami a trackert elindítja) után forkolnak; ekkor a puffert továbbra is a
+        # létrehozó folyamat szünteti meg (lezaras). A korábban indult munkás saját trackert indít,
+        # ami a munkás kilépésekor megszüntetné a puffert - ezért a futószalag előbb a puffert hozza létre
+        shm = shared_memory.SharedMemory(name=nev)
+        _csatolt_pufferek[nev] = shm
+    return shm.buf
+
+
+def kep_a_pufferbol(leiro: KepLeiro) -> np.ndarray:
+    """A leírt kép elérése másolás nélkül (munkásfolyamat oldalon). A tömb csak olvasható."""
+    nev, eltolas, alak = leiro
+    kep = np.ndarray(alak, dtype=np.uint8, buffer=puffer_csatolasa(nev), offset=eltolas)
+    kep.flags.writeable = False
+    return kep
@@ -0,0 +1,233 @@
+"""
+Pontossági regressziós mérés címkézett lapokon, az összes magon párhuzamosan.
+
+A címkefájl (JSON) a képeket (a címkefájlhoz képest relatív útvonallal) a várt eredményhez rendeli:
+
+    {
+        "kep_kitoltott.png": {
+            "neptun_kod": "X6Z71T",
+            "igaz_hamis": {"1": "Hamis", "2": "Igaz", ...},
+            "feleletvalasztos": {"1": 1, "2": -1, ...}
+        },
+        ...
+    }
+
+A hiányzó vagy null "neptun_kod" nem számít bele a Neptun pontosságba. A futás kérdésenkénti
+tévesztési táblát, Neptun pontosságot és laponkénti időket ad. Egy korábbi jelentéshez
+(`--alapvonal`) képest nem zéró kóddal lép ki, ha a pontosság vagy az áteresztőképesség a
+megadott tűrésnél jobban romlott - így a küszöbök és a teljesítménybeállítások biztonságosan hangolhatók.
+
+    python pontossag.py kepek/cimkek.json --jelentes alapvonal.json
+    python pontossag.py kepek/cimkek.json --alapvonal alapvonal.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from geometriaprofil import profil_betoltese
+from szolgaltatas import munkas_inicializalas, munkas_kiertekeles
+
+
+def cimkek_betoltese(utvonal: str) -> Dict[str, Dict]:
+    """A címkefájl betöltése; a kulcsok abszolút képútvonalak lesznek."""
+    with open(utvonal, 'r', encoding='utf-8') as f:
+        cimkek = json.load(f)
+    alap = os.path.dirname(os.path.abspath(utvonal))
+    return {os.path.join(alap, kep): vart for kep, vart in cimkek.items()}
+
+
+def kiertekeles_parhuzamosan(kepek: List[str], munkasok: int = None, tesseract_path: str = None,
+                             neptun_motor: str = None,
+                             geometria_profil: str = None) -> Tuple[Dict[str, Dict], Dict[str, str], float]:
+    """
+    A lapok kiértékelése munkásfolyamatokban. Visszaad: (eredmények képenként,
+    hibák képenként, a teljes falióra-idő másodpercben). A `geometria_profil` profilfájllal
+    egy másik űrlapgeometria (vagy hangolt küszöbök) mérhető az alapvonalhoz képest.
+    """
+    eredmenyek, hibak = {}, {}
+    munkasok = munkasok or os.cpu_count() or 1
+    if neptun_motor == "knn":
+        from neptun_felismero import modell_ellenorzese
+        modell_ellenorzese()
+    with ProcessPoolExecutor(max_workers=munkasok, initializer=munkas_inicializalas,
+                             initargs=(tesseract_path, neptun_motor)) as keszlet:
+        # A folyamatok indítása (és a modulok betöltése) ne számítson bele az áteresztőképességbe
+        for jovo in [keszlet.submit(os.getpid) for _ in range(munkasok)]:
+            jovo.result()
+        kezdes = time.perf_counter()
+        jovok = {keszlet.submit(munkas_kiertekeles, kep, tesseract_path, True, True, None, neptun_motor,
+                                geometria_profil): kep
+                 for kep in kepek}
+        for jovo in as_completed(jovok):
+            kep = jovok[jovo]
+            try:
+                eredmenyek[kep] = jovo.result()
+            except Exception as e:
+                hibak[kep] = str(e)
+        ido = time.perf_counter() - kezdes
+    return eredmenyek, hibak, ido
+
+
+def _kerdesek(eredmeny: Dict) -> Dict[str, object]:
+    """Egységes kérdésazonosítók ("IH 1", "FV 2") a JSON-ból (szöveges kulcs) és a kiértékelőből (egész) is."""
+    kerdesek = {}
+    for tipus, elotag in (("igaz_hamis", "IH"), ("feleletvalasztos", "FV")):
+        for kerdes, valasz in (eredmeny.get(tipus) or {}).items():
+            kerdesek[f"{elotag} {kerdes}"] = valasz
+    return kerdesek
+
+
+def jelentes_keszitese(cimkek: Dict[str, Dict], eredmenyek: Dict[str, Dict], hibak: Dict[str, str],
+                       ido: float) -> Dict:
+    """A mérés összesítése (JSON-ba menthető szótár)."""
+    tevesztes = defaultdict(Counter)
+    helyes = osszes = 0
+    neptun_helyes = neptun_osszes = 0
+    hibas_lapok = []
+
+    for kep, vart in cimkek.items():
+        kapott = eredmenyek.get(kep)
+        vart_kerdesek = _kerdesek(vart)
+        kapott_kerdesek = _kerdesek(kapott) if kapott is not None else {}
+        lap_hibai = []
+        for kerdes, vart_valasz in vart_kerdesek.items():
+            # A sikertelen lap minden kérdése hibásnak számít
+            kapott_valasz = kapott_kerdesek.get(kerdes, "(nincs)") if kapott is not None else "(hiba)"
+            tevesztes[kerdes][(str(vart_valasz), str(kapott_valasz))] += 1
+            osszes += 1
+            if kapott_valasz == vart_valasz:
+                helyes += 1
+            else:
+                lap_hibai.append(kerdes)
+
+        if vart.get("neptun_kod"):
+            neptun_osszes += 1
+            if kapott is not None and kapott.get("neptun_kod") == vart["neptun_kod"]:
+                neptun_helyes += 1
+            else:
+                lap_hibai.append("Neptun")
+        if lap_hibai:
+            hibas_lapok.append({"kep": os.path.basename(kep), "hibak": lap_hibai,
+                                "neptun_kod": kapott.get("neptun_kod") if kapott else None,
+                                "hiba": hibak.get(kep)})
+
+    idok = np.array([e["feldolgozasi_ido"] for e in eredmenyek.values()], dtype=np.float64)
+    return {
+        "lapok": len(cimkek),
+        "sikertelen_lapok": len(hibak),
+        "valasz_pontossag": helyes / osszes if osszes else 1.0,
+        "neptun_pontossag": neptun_helyes / neptun_osszes if neptun_osszes else 1.0,
+        "kerdesek": {
+            kerdes: {
+                "pontossag": sum(db for (v, k), db in szamlalo.items() if v == k) / sum(szamlalo.values()),
+                "tevesztes": {f"{v} -> {k}": db for (v, k), db in sorted(szamlalo.items())},
+            }
+            for kerdes, szamlalo in sorted(tevesztes.items())
+        },
+        "hibas_lapok": hibas_lapok,
+        "ido": {
+            "falora": round(ido, 3),
+            "lap_per_s": round(len(eredmenyek) / ido, 3) if ido > 0 else 0.0,
+            "lap_atlag": round(float(idok.mean()), 4) if idok.size else 0.0,
+            "lap_p95": round(float(np.percentile(idok, 95)), 4) if idok.size else 0.0,
+            "lap_max": round(float(idok.max()), 4) if idok.size else 0.0,
+        },
+        "laponkenti_ido": {os.path.basename(k): e["feldolgozasi_ido"] for k, e in sorted(eredmenyek.items())},
+    }
+
+
+def jelentes_kiirasa(jelentes: Dict):
+    print(f"\n[*] Lapok: {jelentes['lapok']} (sikertelen: {jelentes['sikertelen_lapok']})")
+    print(f"[*] Válasz pontosság: {jelentes['valasz_pontossag']:.2%}")
+    print(f"[*] Neptun pontosság: {jelentes['neptun_pontossag']:.2%}")
+    ido = jelentes["ido"]
+    print(f"[*] Idő: {ido['falora']:.2f} s, {ido['lap_per_s']:.2f} lap/s, laponként átlag {ido['lap_atlag']:.3f} s, "
+          f"p95 {ido['lap_p95']:.3f} s, max {ido['lap_max']:.3f} s")
+
+    print("\nKérdésenkénti tévesztések (várt -> kapott: darab):")
+    for kerdes, adat in jelentes["kerdesek"].items():
+        tevesztesek = ", ".join(f"{par}: {db}" for par, db in adat["tevesztes"].items())
+        print(f"   {kerdes:<6} {adat['pontossag']:7.2%}   {tevesztesek}")
+
+    if jelentes["hibas_lapok"]:
+        print("\nHibás lapok:")
+        for lap in jelentes["hibas_lapok"]:
+            print(f"   {lap['kep']}: {', '.join(lap['hibak'])}" + (f" ({lap['hiba']})" if lap["hiba"] else ""))
+
+
+def osszevetes(jelentes: Dict, alapvonal: Dict, pontossag_tures: float, sebesseg_tures: float) -> List[str]:
+    """
+    Romlások az alapvonalhoz képest. A pontosság abszolút (arányban mért) esése legfeljebb
+    `pontossag_tures`, az áteresztőképesség relatív esése legfeljebb `sebesseg_tures` lehet.
+    """
+    romlasok = []
+    for kulcs, nev in (("valasz_pontossag", "Válasz pontosság"), ("neptun_pontossag", "Neptun pontosság")):
+        if jelentes[kulcs] < alapvonal[kulcs] - pontossag_tures:
+            romlasok.append(f"{nev}: {alapvonal[kulcs]:.2%} -> {jelentes[kulcs]:.2%}")
+    for kerdes, adat in jelentes["kerdesek"].items():
+        korabbi = alapvonal.get("kerdesek", {}).get(kerdes)
+        if korabbi is not None and adat["pontossag"] < korabbi["pontossag"] - pontossag_tures:
+            romlasok.append(f"{kerdes}: {korabbi['pontossag']:.2%} -> {adat['pontossag']:.2%}")
+
+    regi, uj = alapvonal["ido"]["lap_per_s"], jelentes["ido"]["lap_per_s"]
+    if regi > 0 and uj < regi * (1 - sebesseg_tures):
+        romlasok.append(f"Áteresztőképesség: {regi:.2f} -> {uj:.2f} lap/s")
+    return romlasok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pontossági regressziós mérés címkézett lapokon")
+    parser.add_argument("cimkek", help="Címkefájl (JSON): kép -> várt eredmény")
+    parser.add_argument("--munkasok", type=int, default=None, help="Munkásfolyamatok száma (alapértelmezés: CPU-k száma)")
+    parser.add_argument("--tesseract-path", default=None)
+    parser.add_argument("--neptun-motor", choices=["tesseract", "knn"], default=None)
+    parser.add_argument("--geometria-profil", metavar="FAJL", default=None,
+                        help="Az űrlap geometriai profilja (JSON/TOML, lásd geometriaprofil.py)")
+    parser.add_argument("--jelentes", metavar="JSON", default=None, help="A jelentés mentése (később alapvonalnak)")
+    parser.add_argument("--alapvonal", metavar="JSON", default=None, help="Korábbi jelentés, amihez képest mérünk")
+    parser.add_argument("--pontossag-tures", type=float, default=0.0,
+                        help="Megengedett pontosságesés (arány, pl. 0.01 = 1 százalékpont)")
+    parser.add_argument("--sebesseg-tures", type=float, default=0.2,
+                        help="Megengedett relatív áteresztőképesség-esés (pl. 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    cimkek = cimkek_betoltese(args.cimkek)
+    profil = profil_betoltese(args.geometria_profil)
+    print(f"[*] {len(cimkek)} címkézett lap kiértékelése...")
+    print(f"[*] Geometriai profil: {profil.nev}")
+    try:
+        eredmenyek, hibak, ido = kiertekeles_parhuzamosan(list(cimkek), args.munkasok, args.tesseract_path,
+                                                          args.neptun_motor, args.geometria_profil)
+    except FileNotFoundError as e:
+        print(f"[!] {e}")
+        return 1
+    jelentes = jelentes_keszitese(cimkek, eredmenyek, hibak, ido)
+    jelentes_kiirasa(jelentes)
+
+    if args.jelentes:
+        with open(args.jelentes, 'w', encoding='utf-8') as f:
+            json.dump(jelentes, f, ensure_ascii=False, indent=2)
+        print(f"\n[+] Jelentés mentve: {args.jelentes}")
+
+    if args.alapvonal:
+        with open(args.alapvonal, 'r', encoding='utf-8') as f:
+            alapvonal = json.load(f)
+        romlasok = osszevetes(jelentes, alapvonal, args.pontossag_tures, args.sebesseg_tures)
+        if romlasok:
+            print("\n[!] Romlás az alapvonalhoz képest:")
+            for romlas in romlasok:
+                print(f"   {romlas}")
+            return 1
+        print("\n[+] Nincs romlás az alapvonalhoz képest")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+Profilozás: a kiértékelés szakaszainak futásideje és forró pontjai lapokra bontva.
+
+A kiértékelő (és a futószalag) a szakaszokat `Profilozo.szakasz(lap, nev)` blokkokba zárja.
+Szakaszonként:
+  - cProfile méri a függvényeket (szakaszonként összesítve, az összes lapra),
+  - egy mintavételező szál rögzíti a futó szál teljes hívási láncát, ebből flamegraph
+    kompatibilis (collapsed stack, "a;b;c darab") fájl készül,
+  - a falióra-idő laponként is megmarad, így a leglassabb lapok kikereshetők.
+
+A munkásfolyamatok laponként saját `Profilozo`-t használnak, és az `adatok()` által adott
+(pickle-özhető) összesítést küldik vissza, amit a fő folyamat `egyesites`-sel gyűjt össze.
+"""
+import cProfile
+import contextlib
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Optional
+
+
+class _KeszStatisztika:
+    """Már kész pstats szótár, a `pstats.Stats` által elfogadott alakban."""
+
+    def __init__(self, stats: Dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class Profilozo:
+
+    # Mintavételezési időköz a hívási láncokhoz (másodperc)
+    MINTAVETELI_IDOKOZ = 0.005
+
+    def __init__(self, mintaveteli_idokoz: float = MINTAVETELI_IDOKOZ):
+        self.mintaveteli_idokoz = mintaveteli_idokoz
+        self.lapok: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.fuggvenyek: Dict[str, pstats.Stats] = {}
+        self.veremek = Counter()
+        self.zar = threading.Lock()
+        self._helyi = threading.local()
+        # szál azonosító -> (szakasz neve, a szakaszt nyitó keret)
+        self._aktiv_szalak: Dict[int, tuple] = {}
+        self._mintavevo: Optional[threading.Thread] = None
+        self._leallitas = threading.Event()
+
+    # --- Mérés ---
+
+    @contextlib.contextmanager
+    def szakasz(self, lap: Optional[str], nev: str):
+        """
+        Egy szakasz mérése az aktuális szálon. `lap=None` esetén (pl. kötegelt OCR) csak a
+        függvények és a hívási láncok számítanak, lapidő nem. Egymásba ágyazott szakaszoknál
+        csak a külső profilozódik (szálanként egy cProfile lehet aktív).
+        """
+        if getattr(self._helyi, "aktiv", False):
+            kezdes = time.perf_counter()
+            try:
+                yield
+            finally:
+                if lap is not None:
+                    with self.zar:
+                        self.lapok[lap][nev] += time.perf_counter() - kezdes
+            return
+
+        self._mintavevo_inditasa()
+        szal = threading.get_ident()
+        profil = cProfile.Profile()
+        self._helyi.aktiv = True
+        with self.zar:
+            # A `with` blokkot tartalmazó függvény kerete: a láncot eddig vágjuk vissza
+            self._aktiv_szalak[szal] = (nev, sys._getframe(2))
+        kezdes = time.perf_counter()
+        profil.enable()
+        try:
+            yield
+        finally:
+            profil.disable()
+            ido = time.perf_counter() - kezdes
+            self._helyi.aktiv = False
+            with self.zar:
+                self._aktiv_szalak.pop(szal, None)
+                if lap is not None:
+                    self.lapok[lap][nev] += ido
+                if nev in self.fuggvenyek:
+                    self.fuggvenyek[nev].add(profil)
+                else:
+                    self.fuggvenyek[nev] = pstats.Stats(profil)
+
+    def ido_hozzaadasa(self, lap: str, nev: str, ido: float):
+        """Máshol mért szakaszidő hozzáadása egy laphoz (pl. kötegelt OCR egy lapra jutó része)."""
+        with self.zar:
+            self.lapok[lap][nev] += ido
+
+    def _mintavevo_inditasa(self):
+        if self._mintavevo is not None:
+            return
+        with self.zar:
+            if self._mintavevo is None:
+                self._mintavevo = threading.Thread(target=self._mintavetel, daemon=True)
+                self._mintavevo.start()
+
+    def _mintavetel(self):
+        while not self._leallitas.wait(self.mintaveteli_idokoz):
+            with self.zar:
+                aktiv = dict(self._aktiv_szalak)
+            if not aktiv:
+                continue
+            keretek = sys._current_frames()
+            for szal, (nev, gyoker) in aktiv.items():
+                keret = keretek.get(szal)
+                lanc = []
+                while keret is not None and keret is not gyoker:
+                    kod = keret.f_code
+                    lanc.append(f"{os.path.basename(kod.co_filename)}:{kod.co_name}")
+                    keret = keret.f_back
+                # A contextlib és a profilozó saját keretei nem érdekesek
+                lanc = [k for k in lanc if not k.startswith(("contextlib.py:", "profilozas.py:"))]
+                self.veremek[";".join([nev] + lanc[::-1])] += 1
+
+    def leallitas(self):
+        self._leallitas.set()
+        if self._mintavevo is not None:
+            self._mintavevo.join()
+
+    # --- Összesítés ---
+
+    def adatok(self) -> Dict:
+        """A mérések pickle-özhető alakban, a fő folyamatnak visszaküldéshez."""
+        self.leallitas()
+        with self.zar:
+            return {
+                "lapok": {lap: dict(szakaszok) for lap, szakaszok in self.lapok.items()},
+                "fuggvenyek": {nev: stats.stats for nev, stats in self.fuggvenyek.items()},
+                "veremek": dict(self.veremek),
+            }
+
+    def egyesites(self, adatok: Dict):
+        """Egy másik (pl. munkásfolyamatbeli) profilozó `adatok()` eredményének hozzáadása."""
+        with self.zar:
+            for lap, szakaszok in adatok["lapok"].items():
+                for nev, ido in szakaszok.items():
+                    self.lapok[lap][nev] += ido
+            for nev, stats in adatok["fuggvenyek"].items():
+                if nev in self.fuggvenyek:
+                    self.fuggvenyek[nev].add(_KeszStatisztika(stats))
+                else:
+                    self.fuggvenyek[nev] = pstats.Stats(_KeszStatisztika(stats))
+            self.veremek.update(adatok["veremek"])
+
+    def jelentes_irasa(self, mappa: str, top: int = 20) -> str:
+        """
+        A jelentés kiírása a mappába: jelentes.txt (szakaszok, leglassabb lapok és függvények),
+        veremek.folded (flamegraph.pl / speedscope bemenet) és profil.pstats (összes szakasz).
+        A jelentés útvonalát adja vissza.
+        """
+        self.leallitas()
+        os.makedirs(mappa, exist_ok=True)
+
+        with self.zar:
+            lapok = {lap: dict(szakaszok) for lap, szakaszok in self.lapok.items()}
+            osszes = pstats.Stats()
+            for stats in self.fuggvenyek.values():
+                osszes.add(stats)
+            veremek = dict(self.veremek)
+
+        with open(os.path.join(mappa, "veremek.folded"), 'w', encoding='utf-8') as f:
+            for lanc, darab in sorted(veremek.items()):
+                f.write(f"{lanc} {darab}\n")
+        if osszes.stats:
+            osszes.dump_stats(os.path.join(mappa, "profil.pstats"))
+
+        szakasz_idok = defaultdict(list)
+        for szakaszok in lapok.values():
+            for nev, ido in szakaszok.items():
+                szakasz_idok[nev].append(ido)
+
+        jelentes = io.StringIO()
+        jelentes.write(f"Profilozott lapok: {len(lapok)}\n\n")
+        jelentes.write("Szakaszok (s):\n")
+        jelentes.write(f"   {'szakasz':<24}{'összes':>10}{'átlag':>10}{'max':>10}\n")
+        for nev, idok in sorted(szakasz_idok.items(), key=lambda e: -sum(e[1])):
+            jelentes.write(f"   {nev:<24}{sum(idok):>10.3f}{sum(idok) / len(idok):>10.3f}{max(idok):>10.3f}\n")
+
+        jelentes.write(f"\nLeglassabb lapok (legfeljebb {top}):\n")
+        for lap, szakaszok in sorted(lapok.items(), key=lambda e: -sum(e[1].values()))[:top]:
+            bontas = ", ".join(f"{nev} {ido:.3f}" for nev, ido in sorted(szakaszok.items(), key=lambda e: -e[1]))
+            jelentes.write(f"   {sum(szakaszok.values()):8.3f} s  {lap}\n              {bontas}\n")
+
+        if osszes.stats:
+            jelentes.write("\nLeglassabb függvények, saját idő szerint:\n")
+            osszes.stream = jelentes
+            osszes.sort_stats(pstats.SortKey.TIME).print_stats(top)
+            jelentes.write("\nLeglassabb függvények, kumulált idő szerint:\n")
+            osszes.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+            for nev, stats in sorted(self.fuggvenyek.items()):
+                jelentes.write(f"\nSzakasz: {nev}\n")
+                stats.stream = jelentes
+                stats.sort_stats(pstats.SortKey.TIME).print_stats(min(top, 10))
+
+        utvonal = os.path.join(mappa, "jelentes.txt")
+        with open(utvonal, 'w', encoding='utf-8') as f:
+            f.write(jelentes.getvalue())
+        return utvonal
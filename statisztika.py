@@ -0,0 +1,254 @@
+"""
+Osztályzási statisztika a kiértékelt lapokból, folyamatosan frissítve.
+
+A lapok a javítókulccsal összevetve (`osszevetes`, ugyanaz, amiből a felület pontoz) érkeznek,
+és az `Eredmenystatisztika` minden laphoz csak futó összegeket frissít: pontszám-hisztogram,
+az összpontszám átlaga és szórása (Welford), kérdésenként a helyes válaszok száma és a
+válaszok eloszlása, valamint a KR-20 megbízhatósághoz szükséges összegek. Egy lap felvétele
+a lapok számától független idejű, így a futószalag az eredmények érkezésével együtt számolhat,
+és a mentett JSON-okat sem kell újra és újra beolvasni.
+
+    KR-20 = k / (k - 1) * (1 - sum(p_i * q_i) / var(összpontszám))
+
+ahol k a kérdések száma, p_i az i. kérdésre helyesen válaszolók aránya, q_i = 1 - p_i.
+
+    python statisztika.py eredmenyek/ --javitokulcs megoldolap.json
+    python statisztika.py eredmenyek/ --javitokulcs megoldolap.png --mentes statisztika.json
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import math
+import os
+import sys
+from collections import Counter
+from typing import Dict, Iterator, Tuple
+
+
+# A kiértékelő kérdéstípusai és a kérdésazonosítók előtagja (mint a pontossag.py-ban)
+KERDESTIPUSOK = (("igaz_hamis", "IH"), ("feleletvalasztos", "FV"))
+
+
+def valasz_szovege(tipus: str, valasz) -> str:
+    """A válasz olvasható alakja: feleletválasztósnál betű, -1 / -2 esetén a jelentése."""
+    if tipus == "feleletvalasztos" and isinstance(valasz, int):
+        if valasz >= 0:
+            return chr(65 + valasz)
+        return "Nincs válasz" if valasz == -1 else "Hibás (több válasz)"
+    return "Nincs válasz" if valasz is None else str(valasz)
+
+
+def osszevetes(kitoltott: Dict, javitokulcs: Dict) -> Dict:
+    """
+    A kitöltött lap összevetése a javítókulccsal. Visszaad: {"pont", "max_pont", "kerdesek":
+    {"IH 1": {"valasz", "helyes_valasz", "helyes"}, ...}}. Minden kulcsbeli kérdés egy pontot ér;
+    a lapról hiányzó kérdés rossz válasznak számít. A kérdéssorszámok lehetnek egészek (a
+    kiértékelőből) vagy szövegek (mentett JSON-ból).
+    """
+    kerdesek = {}
+    pont = 0
+    for tipus, elotag in KERDESTIPUSOK:
+        valaszok = {str(k): v for k, v in (kitoltott.get(tipus) or {}).items()}
+        for kerdes, helyes_valasz in (javitokulcs.get(tipus) or {}).items():
+            valasz = valaszok.get(str(kerdes))
+            helyes = str(kerdes) in valaszok and valasz == helyes_valasz
+            pont += helyes
+            kerdesek[f"{elotag} {kerdes}"] = {"valasz": valasz_szovege(tipus, valasz),
+                                              "helyes_valasz": valasz_szovege(tipus, helyes_valasz),
+                                              "helyes": helyes}
+    return {"pont": pont, "max_pont": len(kerdesek), "kerdesek": kerdesek}
+
+
+class _KerdesStatisztika:
+    __slots__ = ("lapok", "helyes", "helyes_valasz", "valaszok")
+
+    def __init__(self, helyes_valasz: str):
+        self.lapok = 0
+        self.helyes = 0
+        self.helyes_valasz = helyes_valasz
+        self.valaszok = Counter()
+
+
+class Eredmenystatisztika:
+    """Futó összesítés az összevetett lapokból (lásd `osszevetes`); laponként állandó idejű frissítés."""
+
+    def __init__(self):
+        self.lapok = 0
+        self.hisztogram = Counter()
+        # Welford: az összpontszám átlaga és a négyzetes eltérések összege
+        self._atlag = 0.0
+        self._m2 = 0.0
+        self.min_pont = self.max_pont = None
+        self.max_elerheto = 0
+        self.kerdesek: Dict[str, _KerdesStatisztika] = {}
+
+    def __len__(self) -> int:
+        return self.lapok
+
+    def hozzaadas(self, osszevetett: Dict):
+        """Egy összevetett lap felvétele."""
+        pont = osszevetett["pont"]
+        self.lapok += 1
+        self.hisztogram[pont] += 1
+        elteres = pont - self._atlag
+        self._atlag += elteres / self.lapok
+        self._m2 += elteres * (pont - self._atlag)
+        self.min_pont = pont if self.min_pont is None else min(self.min_pont, pont)
+        self.max_pont = pont if self.max_pont is None else max(self.max_pont, pont)
+        self.max_elerheto = max(self.max_elerheto, osszevetett["max_pont"])
+
+        for azonosito, kerdes in osszevetett["kerdesek"].items():
+            statisztika = self.kerdesek.get(azonosito)
+            if statisztika is None:
+                statisztika = self.kerdesek[azonosito] = _KerdesStatisztika(kerdes["helyes_valasz"])
+            statisztika.lapok += 1
+            statisztika.helyes += kerdes["helyes"]
+            statisztika.valaszok[kerdes["valasz"]] += 1
+
+    @property
+    def atlag(self) -> float:
+        return self._atlag if self.lapok else None
+
+    @property
+    def szoras(self) -> float:
+        """Az összpontszám (populációs) szórása."""
+        return math.sqrt(self._m2 / self.lapok) if self.lapok else None
+
+    def kr20(self) -> float:
+        """KR-20 megbízhatóság; None, ha kevés a lap vagy a kérdés, vagy a pontszámok nem szórnak."""
+        k = len(self.kerdesek)
+        if self.lapok < 2 or k < 2 or self._m2 <= 0:
+            return None
+        pq = sum((s.helyes / s.lapok) * (1 - s.helyes / s.lapok) for s in self.kerdesek.values())
+        return k / (k - 1) * (1 - pq / (self._m2 / self.lapok))
+
+    def osszesites(self) -> Dict:
+        """Az aktuális állapot JSON-ba menthető szótárként."""
+        kr20 = self.kr20()
+        return {
+            "lapok": self.lapok,
+            "max_elerheto": self.max_elerheto,
+            "atlag": round(self.atlag, 3) if self.lapok else None,
+            "szoras": round(self.szoras, 3) if self.lapok else None,
+            "min": self.min_pont,
+            "max": self.max_pont,
+            "kr20": round(kr20, 4) if kr20 is not None else None,
+            "hisztogram": {str(pont): db for pont, db in sorted(self.hisztogram.items())},
+            "kerdesek": {
+                azonosito: {
+                    "helyes_valasz": s.helyes_valasz,
+                    "helyes_arany": round(s.helyes / s.lapok, 4),
+                    "lapok": s.lapok,
+                    "valaszok": dict(s.valaszok.most_common()),
+                }
+                for azonosito, s in self.kerdesek.items()
+            },
+        }
+
+    def jelentes(self) -> str:
+        """Szöveges összefoglaló (a parancssor és a felület is ezt írja ki)."""
+        if not self.lapok:
+            return "Még nincs összevetett lap."
+        sorok = [f"Lapok: {self.lapok}",
+                 f"Átlag: {self.atlag:.2f} / {self.max_elerheto} ({self.atlag / max(1, self.max_elerheto):.1%}), "
+                 f"szórás: {self.szoras:.2f}, min: {self.min_pont}, max: {self.max_pont}"]
+        kr20 = self.kr20()
+        sorok.append(f"KR-20 megbízhatóság: {kr20:.3f}" if kr20 is not None else "KR-20 megbízhatóság: -")
+
+        sorok.append("\nPontszámok eloszlása:")
+        legtobb = max(self.hisztogram.values())
+        for pont in range(self.max_elerheto + 1):
+            db = self.hisztogram.get(pont, 0)
+            sorok.append(f"   {pont:>3} {'#' * round(30 * db / legtobb):<30} {db}")
+
+        sorok.append("\nKérdésenként (helyes arány, válaszok):")
+        for azonosito, s in self.kerdesek.items():
+            valaszok = ", ".join(f"{valasz}: {db}" for valasz, db in s.valaszok.most_common())
+            sorok.append(f"   {azonosito:<6} {s.helyes / s.lapok:7.1%}   (helyes: {s.helyes_valasz})   {valaszok}")
+        return "\n".join(sorok)
+
+    def mentes(self, utvonal: str):
+        with open(utvonal, 'w', encoding='utf-8') as f:
+            json.dump(self.osszesites(), f, ensure_ascii=False, indent=2)
+
+
+def javitokulcs_betoltese(utvonal: str, tesseract_path: str = None, perspektiva: bool = True,
+                          zajszures: bool = True) -> Dict:
+    """
+    A javítókulcs egy mentett eredmény (JSON; a felület mentéséből a "helyes_valaszok" rész),
+    vagy a megoldólap képe, amit itt értékelünk ki (Neptun kód nélkül).
+    """
+    if utvonal.lower().endswith(".json"):
+        with open(utvonal, 'r', encoding='utf-8') as f:
+            kulcs = json.load(f)
+        kulcs = kulcs.get("helyes_valaszok") or kulcs
+    else:
+        from kiertekelo import TesztlapKiertekelo
+        with contextlib.redirect_stdout(io.StringIO()):
+            kulcs = TesztlapKiertekelo(utvonal, tesseract_path, zajszures=zajszures).geometriai_kiertekeles(
+                perspektiva=perspektiva)
+    if not any(kulcs.get(tipus) for tipus, _ in KERDESTIPUSOK):
+        raise ValueError(f"A javítókulcsban nincsenek kérdések: {utvonal}")
+    return kulcs
+
+
+def eredmenyfajlok(mappa: str, javitokulcs: Dict = None) -> Iterator[Tuple[str, Dict, Dict]]:
+    """
+    A mappában mentett eredmények (a kiértékelő és a felület mentései): (fájl, kitöltött lap,
+    javítókulcs). A felület mentéseiben a javítókulcs is benne van; ha `javitokulcs` meg van
+    adva, az az elsőbb. A nem eredmény JSON-okat (pl. kalibracio.json) kihagyja.
+    """
+    for utvonal in sorted(glob.glob(os.path.join(mappa, "*.json"))):
+        try:
+            with open(utvonal, 'r', encoding='utf-8') as f:
+                adat = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[!] Nem olvasható: {utvonal}: {e}")
+            continue
+        if not isinstance(adat, dict):
+            continue
+        kitoltott, kulcs = adat, javitokulcs
+        if "kitoltott" in adat:
+            kitoltott, kulcs = adat["kitoltott"], javitokulcs or adat.get("helyes_valaszok") or None
+        if "igaz_hamis" not in kitoltott and "feleletvalasztos" not in kitoltott:
+            continue
+        yield utvonal, kitoltott, kulcs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Osztályzási statisztika a mentett eredményekből")
+    parser.add_argument("mappa", help="A mentett eredmények mappája (pl. eredmenyek)")
+    parser.add_argument("--javitokulcs", metavar="FAJL", default=None,
+                        help="Javítókulcs: mentett eredmény (JSON) vagy a megoldólap képe; a felület mentéseinél elhagyható")
+    parser.add_argument("--tesseract-path", default=None)
+    parser.add_argument("--mentes", metavar="JSON", default=None, help="Az összesítés mentése")
+    args = parser.parse_args()
+
+    javitokulcs = None
+    if args.javitokulcs:
+        try:
+            javitokulcs = javitokulcs_betoltese(args.javitokulcs, args.tesseract_path)
+        except (OSError, ValueError) as e:
+            print(f"[!] Hibás javítókulcs: {e}")
+            return 1
+
+    statisztika = Eredmenystatisztika()
+    kulcs_nelkul = 0
+    for _, kitoltott, kulcs in eredmenyfajlok(args.mappa, javitokulcs):
+        if kulcs is None:
+            kulcs_nelkul += 1
+            continue
+        statisztika.hozzaadas(osszevetes(kitoltott, kulcs))
+    if kulcs_nelkul:
+        print(f"[!] {kulcs_nelkul} eredmény kimaradt: nincs hozzá javítókulcs (--javitokulcs)")
+    print(statisztika.jelentes())
+    if args.mentes:
+        statisztika.mentes(args.mentes)
+        print(f"\n[+] Összesítés mentve: {args.mentes}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
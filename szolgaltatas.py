@@ -0,0 +1,435 @@
+"""
+Tartósan futó kiértékelő szolgáltatás helyi HTTP vagy Unix-socket végponttal.
+
+A munkásfolyamatok egyszer töltik be a cv2/numpy/pytesseract modulokat és
+indítják el a Tesseractet, utána a beérkező lapokat melegen dolgozzák fel.
+
+Végpontok:
+    POST /kiertekeles   - törzs: a képfájl bájtjai, vagy JSON: {"utvonal": "..."}
+                          opcionális query: perspektiva=0, zajszures=0
+    GET  /egeszseg      - élő-e a szolgáltatás, szabad helyek a sorban
+    GET  /metrikak      - feldolgozott / hibás / elutasított lapok, hibás kérések, átlagos idő
+
+Az első hibátlan lapból űrlapmodell készül (lásd urlapmodell.py), a további lapokat ehhez
+ellenőrizzük; `--urlapmodell FAJL` esetén a modell onnan töltődik be, vagy oda mentődik.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import socketserver
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Union
+from urllib.parse import urlparse, parse_qs
+
+from geometriaprofil import profil_betoltese
+from urlapmodell import Urlapmodell
+
+
+class BetoltesiHiba(ValueError):
+    """A kérésben kapott kép nem dekódolható (hibás vagy nem képfájl); a kliens hibája."""
+
+
+# Munkásfolyamatonként újrahasznált kiértékelők, (magasság, szélesség, zajszűrés, perspektíva, motor) szerint
+_kiertekelok: Dict[tuple, object] = {}
+
+
+def munkas_inicializalas(tesseract_path: str = None, neptun_motor: str = None, ocr: bool = True):
+    """
+    Munkásfolyamat bemelegítése: a nehéz modulok importja és a Tesseract indítása. A Tesseractet
+    csak akkor indítjuk, ha a munkás olvas Neptun kódot (`ocr=True`) és nem a beépített
+    felismerővel (`neptun_motor="knn"`).
+    """
+    global TesztlapKiertekelo
+    from kiertekelo import TesztlapKiertekelo
+
+    if not ocr:
+        return
+    if (neptun_motor or TesztlapKiertekelo.NEPTUN_MOTOR) == "knn":
+        from neptun_felismero import alap_felismero
+        alap_felismero()
+        return
+    import pytesseract
+    if tesseract_path:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_path
+    try:
+        pytesseract.get_tesseract_version()
+    except Exception as e:
+        print(f"[!] Tesseract nem érhető el a munkásban: {e}")
+
+
+def ujrahasznalhato_kiertekelo(magassag: int, szelesseg: int, tesseract_path: str = None,
+                              zajszures: bool = True, perspektiva: bool = True, neptun_motor: str = None):
+    """
+    Az adott lapmérethez tartozó, a munkásfolyamatban újrahasznált kiértékelő.
+    Egy kötegben a lapok mérete jellemzően azonos, így a pufferek lapról lapra megmaradnak.
+    """
+    from kiertekelo import UjrahasznalhatoKiertekelo
+
+    kulcs = (magassag, szelesseg, zajszures, perspektiva, neptun_motor)
+    kiertekelo = _kiertekelok.get(kulcs)
+    if kiertekelo is None:
+        if len(_kiertekelok) >= 4:
+            _kiertekelok.clear()  # vegyes lapméreteknél ne gyűljenek a pufferek
+        kiertekelo = UjrahasznalhatoKiertekelo(magassag, szelesseg, tesseract_path, zajszures, perspektiva,
+                                               neptun_motor)
+        _kiertekelok[kulcs] = kiertekelo
+    return kiertekelo
+
+
+def _kep_betoltese(forras: Union[str, bytes], nev: str = None):
+    """A lap dekódolása fájlból vagy bájtokból: (kép, név)."""
+    import cv2
+    import numpy as np
+
+    if isinstance(forras, bytes):
+        nev = nev or "<memoria>"
+        kep = cv2.imdecode(np.frombuffer(forras, dtype=np.uint8), cv2.IMREAD_COLOR)
+    else:
+        nev = forras
+        kep = cv2.imdecode(np.fromfile(forras, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if kep is None:
+        raise BetoltesiHiba(f"Nem sikerült betölteni a képet: {nev}")
+    return kep, nev
+
+
+def munkas_kiertekeles(forras: Union[str, bytes], tesseract_path: str = None,
+                       perspektiva: bool = True, zajszures: bool = True, nev: str = None,
+                       neptun_motor: str = None, geometria_profil: str = None,
+                       urlapmodell: Urlapmodell = None) -> Dict:
+    """
+    Egy lap kiértékelése a munkásfolyamatban. A kiértékelő konzolkimenetét elnyeljük.
+    Bájtok esetén a `nev` kerül az eredmény `kep_fajl` mezőjébe. A `geometria_profil` a
+    profilfájl útvonala (lásd geometriaprofil.py), a munkás folyamatonként egyszer olvassa be.
+    Az `urlapmodell` megadásakor a lapot ehhez ellenőrizzük (eltérések: `urlap_elteresek`).
+    """
+    kezdes = time.perf_counter()
+    kep, nev = _kep_betoltese(forras, nev)
+
+    kiertekelo = ujrahasznalhato_kiertekelo(kep.shape[0], kep.shape[1], tesseract_path, zajszures, perspektiva,
+                                            neptun_motor)
+    kiertekelo.profil = profil_betoltese(geometria_profil)
+    with contextlib.redirect_stdout(io.StringIO()):
+        eredmeny = kiertekelo.feldolgozas(kep, nev, urlapmodell=urlapmodell)
+    eredmeny["kep_fajl"] = nev
+    eredmeny["feldolgozasi_ido"] = round(time.perf_counter() - kezdes, 3)
+    return eredmeny
+
+
+def urlapmodell_munkas(forras: Union[str, bytes], perspektiva: bool = True, zajszures: bool = True,
+                       geometria_profil: str = None) -> Urlapmodell:
+    """
+    Űrlapmodell fordítása egy lapból (OCR nélküli geometriai kiértékeléssel). Csak hibátlan lapból
+    fordítunk: ha nincs kérdéskeret, vagy valamelyik keretben nem a várt számú négyzet van, ValueError.
+    """
+    kep, nev = _kep_betoltese(forras)
+    kiertekelo = ujrahasznalhato_kiertekelo(kep.shape[0], kep.shape[1], zajszures=zajszures, perspektiva=perspektiva)
+    kiertekelo.jeloles_kuszob = kiertekelo.JELOLES_KUSZOB
+    kiertekelo.profil = profil_betoltese(geometria_profil)
+    with contextlib.redirect_stdout(io.StringIO()):
+        kiertekelo.feldolgozas(kep, nev, ocr=False)
+    if not kiertekelo.urlapmodell or not kiertekelo.urlapmodell.kerdesek:
+        raise ValueError("nincs kérdéskeret a lapon")
+    if kiertekelo.urlap_elteresek:
+        raise ValueError(f"a lap eltér a várt űrlaptól: {kiertekelo.urlap_elteresek[0]}")
+    return kiertekelo.urlapmodell
+
+
+def urlapmodell_betoltese(utvonal: str) -> Urlapmodell:
+    """A mentett űrlapmodell, vagy None, ha nincs megadva, illetve még nem létezik (ilyenkor az első lapból készül)."""
+    if not utvonal or not os.path.exists(utvonal):
+        return None
+    modell = Urlapmodell.betoltes(utvonal)
+    print(f"[*] Űrlapmodell betöltve: {utvonal} ({len(modell.kerdesek)} kérdés)")
+    return modell
+
+
+def urlapmodell_mentese(modell: Urlapmodell, utvonal: str, forras: str):
+    """A frissen fordított modell naplózása, és ha van útvonal, mentése."""
+    print(f"[*] Űrlapmodell: {len(modell.kerdesek)} kérdés ({forras})")
+    if utvonal:
+        try:
+            os.makedirs(os.path.dirname(utvonal) or ".", exist_ok=True)
+            modell.mentes(utvonal)
+            print(f"[+] Űrlapmodell mentve: {utvonal}")
+        except OSError as e:
+            print(f"[!] Az űrlapmodell nem menthető ({utvonal}): {e}")
+
+
+class KiertekeloSzolgaltatas:
+    """Meleg munkáskészlet korlátos várakozási sorral."""
+
+    def __init__(self, munkasok: int = None, sor_meret: int = 16, tesseract_path: str = None,
+                 neptun_motor: str = None, urlapmodell: str = None, geometria_profil: str = None):
+        """
+        Az `urlapmodell` egy űrlapmodell fájl: ha létezik, a lapokat ehhez ellenőrizzük, ha nem, az
+        első hibátlan lapból fordított modell ide mentődik. Fájl nélkül is az első hibátlan lapból fordítunk.
+        A `geometria_profil` az űrlap geometriai profilja (lásd geometriaprofil.py), a munkások ezzel dolgoznak.
+        """
+        self.munkasok = munkasok or os.cpu_count() or 1
+        self.sor_meret = sor_meret
+        self.tesseract_path = tesseract_path
+        self.neptun_motor = neptun_motor
+        # Hibás profilnál már induláskor kiderül, ne csak a munkásokban, minden kérésnél
+        profil_betoltese(geometria_profil)
+        self.geometria_profil = geometria_profil
+        self.urlapmodell_fajl = urlapmodell
+        self.urlapmodell = urlapmodell_betoltese(urlapmodell)
+        self._urlapmodell_forditas = False
+        if neptun_motor == "knn":
+            from neptun_felismero import modell_ellenorzese
+            modell_ellenorzese()
+
+        self.keszlet = ProcessPoolExecutor(max_workers=self.munkasok, initializer=munkas_inicializalas,
+                                           initargs=(tesseract_path, neptun_motor))
+        # Egyszerre legfeljebb munkasok + sor_meret lap lehet a rendszerben, a többit elutasítjuk
+        self.helyek = threading.BoundedSemaphore(self.munkasok + self.sor_meret)
+
+        self.zar = threading.Lock()
+        self.inditas = time.time()
+        # "hibas": a kiértékelés (szerver oldali) hibái; "hibas_keres": a kliens hibái (400-as válaszok)
+        self.metrikak = {"feldolgozott": 0, "hibas": 0, "hibas_keres": 0, "elutasitott": 0, "folyamatban": 0,
+                         "ossz_ido": 0.0}
+
+    def bemelegites(self):
+        """Minden munkásfolyamat elindítása előre, hogy az első kérés ne fizesse meg az importot."""
+        list(self.keszlet.map(time.sleep, [0] * self.munkasok))
+
+    def kiertekeles(self, forras: Union[str, bytes], perspektiva: bool = True, zajszures: bool = True) -> Dict:
+        """Lap kiértékelése. Ha a sor tele van, None-t ad vissza (a hívó 503-mal válaszol)."""
+        if not self.helyek.acquire(blocking=False):
+            with self.zar:
+                self.metrikak["elutasitott"] += 1
+            return None
+
+        with self.zar:
+            self.metrikak["folyamatban"] += 1
+        try:
+            eredmeny = self.keszlet.submit(munkas_kiertekeles, forras, self.tesseract_path,
+                                           perspektiva, zajszures, None, self.neptun_motor,
+                                           self.geometria_profil, urlapmodell=self.urlapmodell).result()
+            with self.zar:
+                self.metrikak["feldolgozott"] += 1
+                self.metrikak["ossz_ido"] += eredmeny["feldolgozasi_ido"]
+            self._urlapmodell_forditasa(forras, perspektiva, zajszures)
+            return eredmeny
+        except BetoltesiHiba:
+            self.hibas_keres()
+            raise
+        except Exception:
+            with self.zar:
+                self.metrikak["hibas"] += 1
+            raise
+        finally:
+            with self.zar:
+                self.metrikak["folyamatban"] -= 1
+            self.helyek.release()
+
+    def _urlapmodell_forditasa(self, forras: Union[str, bytes], perspektiva: bool, zajszures: bool):
+        """
+        Ha még nincs űrlapmodell, az első sikeresen kiértékelt lapból fordítunk, egyszerre csak egyet. A
+        fordítás háttérszálon fut, így a kérés nem vár rá, és a várakozási sorban sem foglal helyet.
+        """
+        with self.zar:
+            if self.urlapmodell is not None or self._urlapmodell_forditas:
+                return
+            self._urlapmodell_forditas = True
+        threading.Thread(target=self._urlapmodell_forditasa_hatterben, args=(forras, perspektiva, zajszures),
+                         daemon=True).start()
+
+    def _urlapmodell_forditasa_hatterben(self, forras: Union[str, bytes], perspektiva: bool, zajszures: bool):
+        try:
+            modell = self.keszlet.submit(urlapmodell_munkas, forras, perspektiva, zajszures,
+                                         self.geometria_profil).result()
+        except Exception as e:
+            print(f"[!] Űrlapmodell nem fordítható ebből a lapból: {e}")
+        else:
+            self.urlapmodell = modell
+            urlapmodell_mentese(modell, self.urlapmodell_fajl, "az első hibátlan lapból")
+        finally:
+            with self.zar:
+                self._urlapmodell_forditas = False
+
+    def hibas_keres(self):
+        """Kliens oldali hiba (hibás kéréstörzs vagy fejléc) számlálása; nem a szolgáltatás hibája."""
+        with self.zar:
+            self.metrikak["hibas_keres"] += 1
+
+    def egeszseg(self) -> Dict:
+        with self.zar:
+            folyamatban = self.metrikak["folyamatban"]
+        return {
+            "allapot": "ok",
+            "munkasok": self.munkasok,
+            "folyamatban": folyamatban,
+            "szabad_helyek": self.munkasok + self.sor_meret - folyamatban,
+        }
+
+    def metrika_jelentes(self) -> Dict:
+        with self.zar:
+            m = dict(self.metrikak)
+        m["atlagos_ido"] = round(m["ossz_ido"] / m["feldolgozott"], 3) if m["feldolgozott"] else 0.0
+        m["ossz_ido"] = round(m["ossz_ido"], 3)
+        m["uzemido"] = round(time.time() - self.inditas, 1)
+        return m
+
+    def leallitas(self):
+        self.keszlet.shutdown(wait=True)
+
+
+class KeresKezelo(BaseHTTPRequestHandler):
+    """HTTP kéréskezelő; a szolgáltatást a szerver `szolgaltatas` attribútumából éri el."""
+
+    MAX_TORZS = 64 * 1024 * 1024
+
+    def address_string(self):
+        # Unix socketen nincs (host, port) pár
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def _valasz(self, kod: int, adat: Dict, fejlecek: Dict = None):
+        torzs = json.dumps(adat, ensure_ascii=False).encode("utf-8")
+        self.send_response(kod)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(torzs)))
+        for kulcs, ertek in (fejlecek or {}).items():
+            self.send_header(kulcs, ertek)
+        self.end_headers()
+        self.wfile.write(torzs)
+
+    def _hibas_keres(self, kod: int, hiba: str):
+        """Válasz a kliens hibájára, a metrikában külön számolva."""
+        self.server.szolgaltatas.hibas_keres()
+        self._valasz(kod, {"hiba": hiba})
+
+    def do_GET(self):
+        ut = urlparse(self.path).path
+        if ut == "/egeszseg":
+            self._valasz(200, self.server.szolgaltatas.egeszseg())
+        elif ut == "/metrikak":
+            self._valasz(200, self.server.szolgaltatas.metrika_jelentes())
+        else:
+            self._valasz(404, {"hiba": "Ismeretlen végpont"})
+
+    def do_POST(self):
+        keres = urlparse(self.path)
+        if keres.path != "/kiertekeles":
+            self._valasz(404, {"hiba": "Ismeretlen végpont"})
+            return
+
+        hossz = self.headers.get("Content-Length")
+        if hossz is None:
+            self._hibas_keres(411, "Hiányzik a Content-Length fejléc")
+            return
+        try:
+            hossz = int(hossz)
+        except ValueError:
+            self._hibas_keres(400, f"Hibás Content-Length: {hossz!r}")
+            return
+        if hossz <= 0 or hossz > self.MAX_TORZS:
+            self._hibas_keres(400, "Hiányzó vagy túl nagy kéréstörzs")
+            return
+        torzs = self.rfile.read(hossz)
+
+        parameterek = parse_qs(keres.query)
+        perspektiva = parameterek.get("perspektiva", ["1"])[0] != "0"
+        zajszures = parameterek.get("zajszures", ["1"])[0] != "0"
+
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            try:
+                forras = json.loads(torzs.decode("utf-8"))["utvonal"]
+            except (ValueError, KeyError, TypeError):
+                self._hibas_keres(400, "A JSON törzsnek 'utvonal' mezőt kell tartalmaznia")
+                return
+            if not isinstance(forras, str) or not os.path.isfile(forras):
+                self._hibas_keres(404, f"A fájl nem található: {forras}")
+                return
+        else:
+            forras = torzs
+
+        from kiertekelo import ElutasitottLap
+
+        try:
+            eredmeny = self.server.szolgaltatas.kiertekeles(forras, perspektiva=perspektiva, zajszures=zajszures)
+        except ElutasitottLap as e:
+            # Nem szerverhiba: a lap túl zajos, kézi feldolgozásra kell küldeni
+            self._valasz(422, {"hiba": str(e), "elutasitva": True})
+            return
+        except BetoltesiHiba as e:
+            # A kiertekeles már a hibás kérések közé számolta
+            self._valasz(400, {"hiba": str(e)})
+            return
+        except Exception as e:
+            traceback.print_exc()
+            self._valasz(500, {"hiba": str(e)})
+            return
+
+        if eredmeny is None:
+            self._valasz(503, {"hiba": "A várakozási sor megtelt"}, {"Retry-After": "1"})
+        else:
+            self._valasz(200, eredmeny)
+
+
+class UnixHTTPSzerver(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def szerver_letrehozasa(szolgaltatas: KiertekeloSzolgaltatas, host: str = "127.0.0.1", port: int = 8765,
+                        unix_socket: str = None):
+    """HTTP (TCP) vagy Unix-socket szerver létrehozása a szolgáltatás köré."""
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        szerver = UnixHTTPSzerver(unix_socket, KeresKezelo)
+    else:
+        szerver = ThreadingHTTPServer((host, port), KeresKezelo)
+    szerver.szolgaltatas = szolgaltatas
+    return szerver
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tesztlap kiértékelő szolgáltatás")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix-socket", help="Unix socket útvonala (TCP helyett)")
+    parser.add_argument("--munkasok", type=int, default=None, help="Munkásfolyamatok száma (alapértelmezés: CPU-k száma)")
+    parser.add_argument("--sor-meret", type=int, default=16, help="Várakozó lapok maximális száma")
+    parser.add_argument("--tesseract-path", default=None)
+    parser.add_argument("--neptun-motor", choices=["tesseract", "knn"], default=None,
+                        help="Neptun kód felismerő (alapértelmezés: tesseract)")
+    parser.add_argument("--urlapmodell", metavar="FAJL", default=None,
+                        help="Űrlapmodell: ha létezik, betölti, különben az első hibátlan lapból ide menti")
+    parser.add_argument("--geometria-profil", metavar="FAJL", default=None,
+                        help="Az űrlap geometriai profilja (JSON/TOML, lásd geometriaprofil.py)")
+    args = parser.parse_args()
+
+    try:
+        szolgaltatas = KiertekeloSzolgaltatas(args.munkasok, args.sor_meret, args.tesseract_path, args.neptun_motor,
+                                              args.urlapmodell, args.geometria_profil)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"[!] {e}")
+        return
+    print(f"[*] Munkásfolyamatok indítása: {szolgaltatas.munkasok}")
+    szolgaltatas.bemelegites()
+
+    szerver = szerver_letrehozasa(szolgaltatas, args.host, args.port, args.unix_socket)
+    cim = args.unix_socket if args.unix_socket else f"http://{args.host}:{args.port}"
+    print(f"[+] Szolgáltatás fut: {cim}")
+
+    try:
+        szerver.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[*] Leállítás...")
+    finally:
+        szerver.server_close()
+        szolgaltatas.leallitas()
+        if args.unix_socket and os.path.exists(args.unix_socket):
+            os.remove(args.unix_socket)
+
+
+if __name__ == "__main__":
+    main()
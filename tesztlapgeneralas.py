@@ -1,31 +1,41 @@
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfbase.pdfmetrics import registerFontFamily
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import cm
+"""
+Tesztlap generálása (PDF, és ha van Poppler, PNG) összekevert kérdéssorrenddel.
+
+Importáláskor nem csinál semmit: a reportlab és a pdf2image csak a generáláskor töltődik
+be, így a `--help` azonnali, és a kérdéslisták más modulokból is használhatók.
+
+    python tesztlapgeneralas.py --kimenet tesztkep.pdf --seed 42
+    python tesztlapgeneralas.py --kimenet fuzet_007.pdf --tobboldalas --sorozat 7
+"""
+import argparse
 import random
-from pdf2image import convert_from_path
 import os
 import sys
 
-# Próbáljuk meg megtalálni az Arial font-ot
-arial_font_path = None
-if sys.platform == "win32":
-    possible_paths = [
-        r"C:\Windows\Fonts\arial.ttf",
-        r"C:\Windows\Fonts\Arial.ttf"
-    ]
-    for path in possible_paths:
-        if os.path.exists(path):
-            arial_font_path = path
-            break
-
-if arial_font_path:
-    pdfmetrics.registerFont(TTFont('Arial', arial_font_path))
-else:
+
+def register_font() -> str:
+    """Az Arial regisztrálása, ha megtalálható; a használandó betűtípus nevét adja vissza."""
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    # Próbáljuk meg megtalálni az Arial font-ot
+    arial_font_path = None
+    if sys.platform == "win32":
+        possible_paths = [
+            r"C:\Windows\Fonts\arial.ttf",
+            r"C:\Windows\Fonts\Arial.ttf"
+        ]
+        for path in possible_paths:
+            if os.path.exists(path):
+                arial_font_path = path
+                break
+
+    if arial_font_path:
+        pdfmetrics.registerFont(TTFont('Arial', arial_font_path))
+        return "Arial"
     # Ha nem találjuk az Arial-t, használjuk a Helvetica-t (beépített)
     print("[WARNING] Arial font nem található, Helvetica használata...")
+    return "Helvetica"
 
 
 true_false_questions = [
@@ -43,143 +53,266 @@ multiple_choice_questions = [
     ("Melyik szín keverékéből lesz lila?", ["Piros + Kék", "Zöld + Sárga", "Kék + Sárga", "Fekete + Fehér"], 0),
 ]
 
-# ===== Kérdések összekeverése =====
-# Minden kérdést típussal együtt tároljunk
-all_questions = []
-
-# Igaz/Hamis kérdések hozzáadása
-for q in true_false_questions:
-    all_questions.append(("IH", q))
-
-# Feleletválasztós kérdések hozzáadása
-for q_data in multiple_choice_questions:
-    all_questions.append(("FV", q_data))
-
-# Kérdések véletlenszerű összekeverése
-random.shuffle(all_questions)
-
-# Fájl mentése az aktuális munkakönyvtárba
-file_path = os.path.join(os.getcwd(), "tesztkep.pdf")
-c = canvas.Canvas(file_path, pagesize=A4)
-
-width, height = A4
-margin = 2 * cm
-y = height - margin
-
-# ===== Sarokjelölők / Alignment boxok =====
-corner_size = 1 * cm
-c.setFillColorRGB(0, 0, 0)  # fekete kitöltés
-
-# Bal felső sarok
-c.rect(0.5 * cm, height - 1.5 * cm, corner_size, corner_size, fill=1, stroke=0)
-# Jobb felső sarok
-c.rect(width - 1.5 * cm, height - 1.5 * cm, corner_size, corner_size, fill=1, stroke=0)
-# Bal alsó sarok
-c.rect(0.5 * cm, 0.5 * cm, corner_size, corner_size, fill=1, stroke=0)
-# Jobb alsó sarok
-c.rect(width - 1.5 * cm, 0.5 * cm, corner_size, corner_size, fill=1, stroke=0)
-
-# ===== Cím (balra zárt) =====
-c.setFillColorRGB(0, 0, 0)
-c.setFont("Arial", 18)
-title_x = margin
-c.drawString(title_x, y, "Tudásfelmérő Tesztlap")
-
-# ===== Neptun azonosító mező =====
-neptun_box_width = 5.5 * cm
-neptun_box_height = 1.0 * cm
-
-# nagyobb távolság a címtől
-neptun_x = width - margin - neptun_box_width
-neptun_y = y - 0.3 * cm  # kb. a cím vonalával egy magasságban marad
-
-c.setLineWidth(1)
-c.rect(neptun_x, neptun_y - 0.2 * cm, neptun_box_width, neptun_box_height, stroke=1, fill=0)
-
-c.setFont("Arial", 10)
-c.drawRightString(neptun_x - 0.3 * cm, neptun_y + neptun_box_height / 2 - 0.1 * cm, "Neptun-kód:")
-
-y = neptun_y - 1.7 * cm  # továbblépünk a mező alá
-
-# ===== Szöveg beállítás =====
-c.setFont("Arial", 12)
-box_size = 10
-line_thickness = 1.8
-frame_padding_top = 6
-frame_padding_bottom = 6
-option_spacing = 0.6 * cm
-question_spacing = 0.8 * cm
-
-# ===== Kérdések kirajzolása (összekevert sorrendben) =====
-ih_counter = 1
-fv_counter = 1
-
-for q_type, q_data in all_questions:
-    if q_type == "IH":
-        # ===== Igaz / Hamis kérdés =====
-        q = q_data
-        content_height = question_spacing
-        box_height = content_height + frame_padding_top + frame_padding_bottom
-
-        c.setLineWidth(3.5)  # Keret vastagsága (kompromisszum 3 és 4 között)
-        c.rect(margin, y - box_height + frame_padding_bottom, width - 2 * margin, box_height, stroke=1, fill=0)
-
-        text_y = y - frame_padding_bottom - (box_height - frame_padding_top - frame_padding_bottom) / 2 + 4
-        c.drawString(margin + 4, text_y - 2, f"{ih_counter}. {q}")
-
-        # Igaz / Hamis jelölőnégyzetek
-        x_box_start = width - 7.2 * cm
-        c.setLineWidth(line_thickness)
-        c.rect(x_box_start, text_y - 3, box_size, box_size)
-        c.drawString(x_box_start + box_size + 4, text_y - 3, "Igaz")
-
-        x_hamis = x_box_start + box_size + 55
-        c.rect(x_hamis, text_y - 3, box_size, box_size)
-        c.drawString(x_hamis + box_size + 4, text_y - 2, "Hamis")
-
-        y -= box_height + 0.3 * cm
-        ih_counter += 1
-        
-    else:  # q_type == "FV"
-        # ===== Feleletválasztós kérdés =====
-        question, options, correct = q_data
-        content_height = question_spacing + option_spacing * len(options) + 0.3 * cm
-        box_height = content_height + frame_padding_top + frame_padding_bottom
-
-        c.setLineWidth(3.5)  # Keret vastagsága (kompromisszum 3 és 4 között)
-        c.rect(margin, y - box_height + frame_padding_bottom, width - 2 * margin, box_height, stroke=1, fill=0)
-
-        text_y = y - frame_padding_bottom - (box_height - frame_padding_top - frame_padding_bottom) / 2 + (
-            option_spacing * len(options)
-        ) / 2 + 2
-        c.drawString(margin + 4, text_y, f"{fv_counter}. {question}")
-
-        option_y = text_y - question_spacing
-        for option in options:
-            c.setLineWidth(line_thickness)
-            c.rect(margin + 0.4 * cm, option_y - 3, box_size, box_size)
-            c.drawString(margin + 0.4 * cm + box_size + 6, option_y - 2, option)
-            option_y -= option_spacing
 
-        y -= box_height + 0.3 * cm
-        fv_counter += 1
+def shuffled_questions(seed: int = None) -> list:
+    """Az összes kérdés (típus, adat) párokként, véletlen sorrendben."""
+    # Minden kérdést típussal együtt tároljunk
+    all_questions = []
 
-c.save()
-print(f"[OK] PDF generalva: {file_path}")
+    # Igaz/Hamis kérdések hozzáadása
+    for q in true_false_questions:
+        all_questions.append(("IH", q))
 
-# ===== PDF konvertálása PNG formátumba =====
-try:
-    png_path = file_path.replace('.pdf', '.png')
+    # Feleletválasztós kérdések hozzáadása
+    for q_data in multiple_choice_questions:
+        all_questions.append(("FV", q_data))
 
-    # PDF konvertálása képpé (300 DPI felbontással)
-    images = convert_from_path(file_path, dpi=300)
+    # Kérdések véletlenszerű összekeverése
+    random.Random(seed).shuffle(all_questions)
+    return all_questions
 
-    # Első oldal mentése PNG-ként
-    if images:
-        images[0].save(png_path, 'PNG')
-        print(f"[OK] PNG generalva: {png_path}")
 
-except Exception as e:
-    print(f"[WARNING] PNG konverzio hiba: {e}")
-    print("   Telepítsd a Poppler-t a PDF->PNG konverzióhoz:")
-    print("   https://github.com/oschwartz10612/poppler-windows/releases/")
+def _question_height(q_type: str, q_data, cm: float) -> float:
+    """Egy kérdés keretének magassága a következő kérdésig tartó térközzel együtt."""
+    frame_padding = 6 + 6
+    question_spacing = 0.8 * cm
+    if q_type == "IH":
+        return question_spacing + frame_padding + 0.3 * cm
+    _, options, _ = q_data
+    return question_spacing + 0.6 * cm * len(options) + 0.3 * cm + frame_padding + 0.3 * cm
+
+
+def paginate(all_questions: list, per_page: int = None) -> list:
+    """
+    A kérdések oldalakra bontása: egy oldalra annyi kerül, amennyi az oldaljelölő fölé
+    kifér (és legfeljebb `per_page`). Az első oldalon a Neptun mező is helyet foglal.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from tobboldalas import JELOLO_ALJA_CM, JELOLO_CELLA_CM
+
+    width, height = A4
+    # Az első oldalon a cím és a Neptun mező, a továbbiakon csak a cím van a kérdések fölött
+    first_top, next_top = height - 4.0 * cm, height - 3.0 * cm
+    bottom = (JELOLO_ALJA_CM + JELOLO_CELLA_CM + 0.3) * cm
+
+    pages, page, y = [], [], first_top
+    for q_type, q_data in all_questions:
+        needed = _question_height(q_type, q_data, cm)
+        if page and (y - needed < bottom or (per_page and len(page) >= per_page)):
+            pages.append(page)
+            page, y = [], next_top
+        page.append((q_type, q_data))
+        y -= needed
+    if page:
+        pages.append(page)
+    return pages
+
+
+def draw_page_marker(c, font: str, page: int, page_count: int, serial: int):
+    """Az oldaljelölő bitsor (lásd tobboldalas.py) és az olvasható oldalszám megrajzolása."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from tobboldalas import (JELOLO_ALJA_CM, JELOLO_BAL_CM, JELOLO_CELLA_CM, JELOLO_LEPES_CM,
+                             lapjelolo_bitjei)
+
+    width, _ = A4
+    c.setFillColorRGB(0, 0, 0)
+    for i, bit in enumerate(lapjelolo_bitjei(page, page_count, serial)):
+        if bit:
+            c.rect((JELOLO_BAL_CM + i * JELOLO_LEPES_CM) * cm, JELOLO_ALJA_CM * cm,
+                   JELOLO_CELLA_CM * cm, JELOLO_CELLA_CM * cm, fill=1, stroke=0)
+    c.setFont(font, 9)
+    c.drawCentredString(width / 2, 0.9 * cm, f"{page}. oldal / {page_count}  (#{serial})")
+
+
+def generate_pdf(file_path: str, all_questions: list, multi_page: bool = False, serial: int = 0,
+                 per_page: int = None) -> str:
+    """
+    A tesztlap PDF megrajzolása a megadott kérdéssorrenddel. `multi_page=True` esetén a kérdések
+    több oldalra kerülnek (lásd `paginate`), minden oldal alján oldaljelölővel; a `serial`
+    sorozatszám a füzetet azonosítja. A kérdések számozása oldalakon át folytonos, a Neptun
+    mező csak az első oldalon van.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    font = register_font()
+    c = canvas.Canvas(file_path, pagesize=A4)
+
+    pages = paginate(all_questions, per_page) if multi_page else [all_questions]
+    counters = {"IH": 1, "FV": 1}
+    for page, questions in enumerate(pages, start=1):
+        if page > 1:
+            c.showPage()
+        _draw_page(c, font, questions, counters, first=page == 1)
+        if multi_page:
+            draw_page_marker(c, font, page, len(pages), serial)
+
+    c.save()
+    print(f"[OK] PDF generalva: {file_path}" + (f" ({len(pages)} oldal)" if multi_page else ""))
+    return file_path
+
+
+def _draw_page(c, font: str, questions: list, counters: dict, first: bool = True):
+    """Egy oldal: sarokjelölők, cím, (az első oldalon) Neptun mező és a kérdések. A `counters` oldalról oldalra nő."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+
+    width, height = A4
+    margin = 2 * cm
+    y = height - margin
+
+    # ===== Sarokjelölők / Alignment boxok =====
+    corner_size = 1 * cm
+    c.setFillColorRGB(0, 0, 0)  # fekete kitöltés
+
+    # Bal felső sarok
+    c.rect(0.5 * cm, height - 1.5 * cm, corner_size, corner_size, fill=1, stroke=0)
+    # Jobb felső sarok
+    c.rect(width - 1.5 * cm, height - 1.5 * cm, corner_size, corner_size, fill=1, stroke=0)
+    # Bal alsó sarok
+    c.rect(0.5 * cm, 0.5 * cm, corner_size, corner_size, fill=1, stroke=0)
+    # Jobb alsó sarok
+    c.rect(width - 1.5 * cm, 0.5 * cm, corner_size, corner_size, fill=1, stroke=0)
+
+    # ===== Cím (balra zárt) =====
+    c.setFillColorRGB(0, 0, 0)
+    c.setFont(font, 18)
+    title_x = margin
+    c.drawString(title_x, y, "Tudásfelmérő Tesztlap" if first else "Tudásfelmérő Tesztlap (folytatás)")
+
+    if first:
+        # ===== Neptun azonosító mező =====
+        neptun_box_width = 5.5 * cm
+        neptun_box_height = 1.0 * cm
+
+        # nagyobb távolság a címtől
+        neptun_x = width - margin - neptun_box_width
+        neptun_y = y - 0.3 * cm  # kb. a cím vonalával egy magasságban marad
+
+        c.setLineWidth(1)
+        c.rect(neptun_x, neptun_y - 0.2 * cm, neptun_box_width, neptun_box_height, stroke=1, fill=0)
+
+        c.setFont(font, 10)
+        c.drawRightString(neptun_x - 0.3 * cm, neptun_y + neptun_box_height / 2 - 0.1 * cm, "Neptun-kód:")
+
+        y = neptun_y - 1.7 * cm  # továbblépünk a mező alá
+    else:
+        y -= 1.0 * cm
+
+    # ===== Szöveg beállítás =====
+    c.setFont(font, 12)
+    box_size = 10
+    line_thickness = 1.8
+    frame_padding_top = 6
+    frame_padding_bottom = 6
+    option_spacing = 0.6 * cm
+    question_spacing = 0.8 * cm
+
+    # ===== Kérdések kirajzolása (összekevert sorrendben) =====
+    for q_type, q_data in questions:
+        if q_type == "IH":
+            # ===== Igaz / Hamis kérdés =====
+            q = q_data
+            content_height = question_spacing
+            box_height = content_height + frame_padding_top + frame_padding_bottom
+
+            c.setLineWidth(3.5)  # Keret vastagsága (kompromisszum 3 és 4 között)
+            c.rect(margin, y - box_height + frame_padding_bottom, width - 2 * margin, box_height, stroke=1, fill=0)
+
+            text_y = y - frame_padding_bottom - (box_height - frame_padding_top - frame_padding_bottom) / 2 + 4
+            c.drawString(margin + 4, text_y - 2, f"{counters['IH']}. {q}")
+
+            # Igaz / Hamis jelölőnégyzetek
+            x_box_start = width - 7.2 * cm
+            c.setLineWidth(line_thickness)
+            c.rect(x_box_start, text_y - 3, box_size, box_size)
+            c.drawString(x_box_start + box_size + 4, text_y - 3, "Igaz")
+
+            x_hamis = x_box_start + box_size + 55
+            c.rect(x_hamis, text_y - 3, box_size, box_size)
+            c.drawString(x_hamis + box_size + 4, text_y - 2, "Hamis")
+
+            y -= box_height + 0.3 * cm
+            counters["IH"] += 1
+
+        else:  # q_type == "FV"
+            # ===== Feleletválasztós kérdés =====
+            question, options, correct = q_data
+            content_height = question_spacing + option_spacing * len(options) + 0.3 * cm
+            box_height = content_height + frame_padding_top + frame_padding_bottom
+
+            c.setLineWidth(3.5)  # Keret vastagsága (kompromisszum 3 és 4 között)
+            c.rect(margin, y - box_height + frame_padding_bottom, width - 2 * margin, box_height, stroke=1, fill=0)
+
+            text_y = y - frame_padding_bottom - (box_height - frame_padding_top - frame_padding_bottom) / 2 + (
+                option_spacing * len(options)
+            ) / 2 + 2
+            c.drawString(margin + 4, text_y, f"{counters['FV']}. {question}")
+
+            option_y = text_y - question_spacing
+            for option in options:
+                c.setLineWidth(line_thickness)
+                c.rect(margin + 0.4 * cm, option_y - 3, box_size, box_size)
+                c.drawString(margin + 0.4 * cm + box_size + 6, option_y - 2, option)
+                option_y -= option_spacing
+
+            y -= box_height + 0.3 * cm
+            counters["FV"] += 1
+
+
+def convert_to_png(file_path: str, dpi: int = 300) -> str:
+    """
+    A PDF oldalainak mentése PNG-ként (Poppler kell hozzá); több oldalnál `<név>_01.png`,
+    `<név>_02.png`, ... Az (első) PNG útvonalát adja vissza, hibánál None-t.
+    """
+    try:
+        from pdf2image import convert_from_path
+
+        png_path = os.path.splitext(file_path)[0] + '.png'
+
+        # PDF konvertálása képpé (alapértelmezés: 300 DPI)
+        images = convert_from_path(file_path, dpi=dpi)
+
+        if not images:
+            return None
+        if len(images) == 1:
+            images[0].save(png_path, 'PNG')
+            print(f"[OK] PNG generalva: {png_path}")
+        else:
+            # Oldalanként külön fájl, a beolvasási sorrendnek megfelelő nevekkel
+            base = os.path.splitext(file_path)[0]
+            for page, image in enumerate(images, start=1):
+                image.save(f"{base}_{page:02d}.png", 'PNG')
+            png_path = f"{base}_01.png"
+            print(f"[OK] {len(images)} PNG generalva: {base}_NN.png")
+
+    except Exception as e:
+        print(f"[WARNING] PNG konverzio hiba: {e}")
+        print("   Telepítsd a Poppler-t a PDF->PNG konverzióhoz:")
+        print("   https://github.com/oschwartz10612/poppler-windows/releases/")
+        return None
+    return png_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tesztlap generálása összekevert kérdéssorrenddel")
+    parser.add_argument("--kimenet", default=os.path.join(os.getcwd(), "tesztkep.pdf"), help="A PDF útvonala")
+    parser.add_argument("--seed", type=int, default=None, help="A kérdéssorrend véletlen magja (ismételhető lapokhoz)")
+    parser.add_argument("--dpi", type=int, default=300, help="A PNG felbontása")
+    parser.add_argument("--nincs-png", action="store_true", help="Csak PDF, PNG konverzió nélkül")
+    parser.add_argument("--tobboldalas", action="store_true",
+                        help="Több oldalra tördelt füzet, oldalanként oldaljelölővel")
+    parser.add_argument("--sorozat", type=int, default=0, help="A füzet sorozatszáma az oldaljelölőben (0-1023)")
+    parser.add_argument("--oldalankent", type=int, default=None, help="Legfeljebb ennyi kérdés egy oldalon")
+    args = parser.parse_args()
+
+    file_path = generate_pdf(args.kimenet, shuffled_questions(args.seed), multi_page=args.tobboldalas,
+                             serial=args.sorozat, per_page=args.oldalankent)
+    if not args.nincs_png:
+        convert_to_png(file_path, args.dpi)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Többoldalas dolgozatok: oldaljelölő és az oldalak összefűzése tanulónként.
+
+Minden oldal alján, a két alsó sarokjelölő fölött egy sor kis négyzetből álló bitsor van
+(a `tesztlapgeneralas.py --tobboldalas` rajzolja), balról jobbra:
+
+    1 őrbit (mindig fekete) | 4 bit: oldal | 4 bit: oldalak száma | 10 bit: sorozatszám | 1 paritásbit
+
+A sorozatszám a kinyomtatott füzetet (így a tanulót) azonosítja, a Neptun mező csak az első
+oldalon van. A négyzetek kisebbek a sarokjelölőknél, így a sarokkeresést nem zavarják. A jelölőt
+a sarokjelölőkre igazított kanonikus lapról olvassuk; ha az őrbit, a paritás vagy az oldalszám
+nem stimmel (vagy egy négyzet se nem egyértelműen üres, se nem egyértelműen fekete), a lapnak
+nincs oldaljelölője.
+
+Az oldalak egymástól függetlenül, párhuzamosan értékelődnek ki (mindegyik a saját kérdéseit
+1-től számozza); az összefűzés a beolvasási sorrendben érkező eredményekből sorozatszám szerint
+állítja össze a dolgozatokat, és a kérdéseket folytonosan számozza újra. A hiányzó, ismétlődő,
+rossz sorrendben vagy más füzet lapjai közé keveredve beolvasott oldalakat jelzi.
+"""
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+# A lap (A4) mérete és a sarokjelölők középpontjának távolsága a lap szélétől, cm-ben.
+# A kanonikus kép a sarokjelölők középpontjai által kifeszített téglalap.
+LAP_CM = (21.0, 29.7)
+SAROK_KOZEP_CM = 1.0
+
+# A bitsor: a négyzetek oldala, a lépésköz, az első négyzet bal széle és a sor alja (a lap aljától)
+JELOLO_BITEK = 20
+JELOLO_CELLA_CM = 0.4
+JELOLO_LEPES_CM = 0.6
+JELOLO_BAL_CM = (LAP_CM[0] - (JELOLO_BITEK - 1) * JELOLO_LEPES_CM - JELOLO_CELLA_CM) / 2
+JELOLO_ALJA_CM = 1.6
+
+OLDAL_BITEK = 4
+SOROZAT_BITEK = 10
+MAX_OLDAL = 2 ** OLDAL_BITEK - 1
+MAX_SOROZAT = 2 ** SOROZAT_BITEK - 1
+
+# Négyzetenkénti sötétség (0 = fehér, 1 = fekete): ez alatt üres, e fölött fekete, közte bizonytalan
+URES_SOTETSEG = 0.3
+TELI_SOTETSEG = 0.6
+
+
+def _bitek(ertek: int, hossz: int) -> List[int]:
+    return [(ertek >> i) & 1 for i in range(hossz - 1, -1, -1)]
+
+
+def _ertek(bitek: List[int]) -> int:
+    ertek = 0
+    for bit in bitek:
+        ertek = (ertek << 1) | bit
+    return ertek
+
+
+def lapjelolo_bitjei(oldal: int, oldalszam: int, sorozat: int) -> List[int]:
+    """Az oldaljelölő bitjei balról jobbra (1 = fekete négyzet)."""
+    if not 1 <= oldal <= oldalszam <= MAX_OLDAL:
+        raise ValueError(f"Érvénytelen oldal: {oldal}/{oldalszam} (legfeljebb {MAX_OLDAL} oldal)")
+    if not 0 <= sorozat <= MAX_SOROZAT:
+        raise ValueError(f"Érvénytelen sorozatszám: {sorozat} (0..{MAX_SOROZAT})")
+    bitek = [1] + _bitek(oldal, OLDAL_BITEK) + _bitek(oldalszam, OLDAL_BITEK) + _bitek(sorozat, SOROZAT_BITEK)
+    # Páros paritás: a fekete négyzetek száma mindig páros
+    return bitek + [sum(bitek) % 2]
+
+
+def lapjelolo_cellai(szelesseg: int, magassag: int) -> List[Tuple[int, int, int, int]]:
+    """A bitsor négyzeteinek (x, y, w, h) helye a megadott méretű kanonikus képen."""
+    cm_x = szelesseg / (LAP_CM[0] - 2 * SAROK_KOZEP_CM)
+    cm_y = magassag / (LAP_CM[1] - 2 * SAROK_KOZEP_CM)
+    y = (LAP_CM[1] - JELOLO_ALJA_CM - JELOLO_CELLA_CM - SAROK_KOZEP_CM) * cm_y
+    w, h = JELOLO_CELLA_CM * cm_x, JELOLO_CELLA_CM * cm_y
+    return [(int(round((JELOLO_BAL_CM + i * JELOLO_LEPES_CM - SAROK_KOZEP_CM) * cm_x)), int(round(y)),
+             int(round(w)), int(round(h))) for i in range(JELOLO_BITEK)]
+
+
+def lapjelolo_olvasasa(szurke: np.ndarray) -> Optional[Dict]:
+    """
+    Az oldaljelölő kiolvasása a kanonikus szürkeárnyalatos lapról.
+    Visszaad: {"oldal", "oldalszam", "sorozat"}, vagy None, ha nincs (érvényes) jelölő.
+    """
+    magassag, szelesseg = szurke.shape[:2]
+    bitek = []
+    for x, y, w, h in lapjelolo_cellai(szelesseg, magassag):
+        # Csak a négyzet belső fele számít, így pár pixeles igazítási hiba nem zavar
+        roi = szurke[y + h // 4:y + h - h // 4, x + w // 4:x + w - w // 4]
+        if roi.size == 0:
+            return None
+        sotetseg = 1.0 - float(roi.mean()) / 255.0
+        if URES_SOTETSEG < sotetseg < TELI_SOTETSEG:
+            return None
+        bitek.append(1 if sotetseg >= TELI_SOTETSEG else 0)
+
+    if bitek[0] != 1 or sum(bitek) % 2 != 0:
+        return None
+    eleje = 1
+    oldal = _ertek(bitek[eleje:eleje + OLDAL_BITEK])
+    oldalszam = _ertek(bitek[eleje + OLDAL_BITEK:eleje + 2 * OLDAL_BITEK])
+    sorozat = _ertek(bitek[eleje + 2 * OLDAL_BITEK:eleje + 2 * OLDAL_BITEK + SOROZAT_BITEK])
+    if not 1 <= oldal <= oldalszam:
+        return None
+    return {"oldal": oldal, "oldalszam": oldalszam, "sorozat": sorozat}
+
+
+def _kerdesszam(eredmeny: Dict) -> Tuple[int, int]:
+    return len(eredmeny.get("igaz_hamis") or {}), len(eredmeny.get("feleletvalasztos") or {})
+
+
+def _atszamozas(ertekek: Dict, eltolas: int) -> Dict:
+    return {int(sorszam) + eltolas: ertek for sorszam, ertek in (ertekek or {}).items()}
+
+
+def dolgozat_osszefuzese(oldalak: List[Dict], oldalszam: int,
+                         kerdesszamok: Dict[Tuple[int, int], Tuple[int, int]] = None) -> Dict:
+    """
+    Egy füzet oldalainak (oldalszám szerint rendezett, ismétlődés nélküli) eredményeiből egy dolgozat.
+    A kérdések típusonként folytonos számozást kapnak. Hiányzó oldal helyén a `kerdesszamok`
+    ((oldalszám, oldal) -> (IH db, FV db), más füzetekből) szerinti számú kérdést ugrunk át;
+    ha ez sem ismert, a további oldalak számozása bizonytalan ("folytonos_szamozas": False).
+    """
+    kerdesszamok = kerdesszamok or {}
+    meglevo = {e["oldal"]["oldal"]: e for e in oldalak}
+    igaz_hamis, feleletvalasztos = {}, {}
+    bizonyossag = {"igaz_hamis": {}, "feleletvalasztos": {}}
+    urlap_elteresek, oldal_adatok, hianyzo = [], [], []
+    ih_eltolas = fv_eltolas = 0
+    folytonos = True
+
+    for oldal in range(1, oldalszam + 1):
+        eredmeny = meglevo.get(oldal)
+        if eredmeny is None:
+            hianyzo.append(oldal)
+            if (oldalszam, oldal) in kerdesszamok:
+                ih_db, fv_db = kerdesszamok[(oldalszam, oldal)]
+            else:
+                ih_db = fv_db = 0
+                folytonos = False
+            ih_eltolas += ih_db
+            fv_eltolas += fv_db
+            continue
+
+        igaz_hamis.update(_atszamozas(eredmeny.get("igaz_hamis"), ih_eltolas))
+        feleletvalasztos.update(_atszamozas(eredmeny.get("feleletvalasztos"), fv_eltolas))
+        lap_bizonyossag = eredmeny.get("bizonyossag") or {}
+        bizonyossag["igaz_hamis"].update(_atszamozas(lap_bizonyossag.get("igaz_hamis"), ih_eltolas))
+        bizonyossag["feleletvalasztos"].update(_atszamozas(lap_bizonyossag.get("feleletvalasztos"), fv_eltolas))
+        urlap_elteresek.extend(f"{oldal}. oldal: {elteres}" for elteres in eredmeny.get("urlap_elteresek") or [])
+        ih_db, fv_db = _kerdesszam(eredmeny)
+        oldal_adatok.append({"oldal": oldal, "kep_fajl": eredmeny.get("kep_fajl"),
+                             "igaz_hamis": [ih_eltolas + 1, ih_eltolas + ih_db],
+                             "feleletvalasztos": [fv_eltolas + 1, fv_eltolas + fv_db]})
+        ih_eltolas += ih_db
+        fv_eltolas += fv_db
+
+    # A Neptun kód az első oldalról jön; ha az hiányzik, az első kiolvasott kódot vesszük
+    elso = oldalak[0]
+    for eredmeny in oldalak:
+        if eredmeny.get("neptun_kod"):
+            elso = eredmeny
+            break
+    dolgozat = {
+        "neptun_kod": elso.get("neptun_kod"),
+        "kiertekeles_idopont": max(e.get("kiertekeles_idopont") or "" for e in oldalak),
+        "igaz_hamis": igaz_hamis,
+        "feleletvalasztos": feleletvalasztos,
+        "bizonyossag": bizonyossag,
+        "urlap_elteresek": urlap_elteresek,
+        "sorozat": oldalak[0]["oldal"]["sorozat"],
+        "oldalszam": oldalszam,
+        "oldalak": oldal_adatok,
+        "hianyzo_oldalak": hianyzo,
+        "folytonos_szamozas": folytonos,
+    }
+    if "neptun_illesztes" in elso:
+        dolgozat["neptun_illesztes"] = elso["neptun_illesztes"]
+    if all("feldolgozasi_ido" in e for e in oldalak):
+        dolgozat["feldolgozasi_ido"] = round(sum(e["feldolgozasi_ido"] for e in oldalak), 3)
+    return dolgozat
+
+
+def dolgozatok_osszeallitasa(eredmenyek: Iterable[Dict], sorrend: List[str] = None) -> Tuple[List[Dict], List[str]]:
+    """
+    A lapok eredményeiből (tetszőleges, pl. befejezési sorrendben) tanulónkénti dolgozatok.
+    A `sorrend` a beolvasási sorrend (képútvonalak); enélkül a kapott sorrendet tekintjük annak.
+    Visszaad: (dolgozatok a füzetek első oldalának sorrendjében, problémák szöveges listája).
+    A dolgozatok "problemak" kulcsa a saját problémáikat is tartalmazza.
+    """
+    eredmenyek = list(eredmenyek)
+    if sorrend is not None:
+        helyek = {utvonal: i for i, utvonal in enumerate(sorrend)}
+        eredmenyek.sort(key=lambda e: helyek.get(e.get("kep_fajl"), len(helyek)))
+
+    problemak = []
+    fuzetek: Dict[int, List[Tuple[int, Dict]]] = OrderedDict()
+    # (oldalszám, oldal) -> a talált (IH db, FV db) előfordulásai, a hiányzó oldalak átugrásához
+    kerdesszamok: Dict[Tuple[int, int], Counter] = {}
+    for hely, eredmeny in enumerate(eredmenyek):
+        jelolo = eredmeny.get("oldal")
+        if not jelolo:
+            problemak.append(f"{eredmeny.get('kep_fajl')}: nincs oldaljelölő, kimarad az összefűzésből")
+            continue
+        fuzetek.setdefault(jelolo["sorozat"], []).append((hely, eredmeny))
+        kerdesszamok.setdefault((jelolo["oldalszam"], jelolo["oldal"]), Counter())[_kerdesszam(eredmeny)] += 1
+    gyakori_kerdesszamok = {kulcs: szamlalo.most_common(1)[0][0] for kulcs, szamlalo in kerdesszamok.items()}
+
+    dolgozatok = []
+    for sorozat, lapok in fuzetek.items():
+        sajat = []
+        oldalszamok = Counter(e["oldal"]["oldalszam"] for _, e in lapok)
+        oldalszam = oldalszamok.most_common(1)[0][0]
+        if len(oldalszamok) > 1:
+            sajat.append(f"eltérő oldalszámok: {', '.join(map(str, sorted(oldalszamok)))}")
+
+        beolvasott = [e["oldal"]["oldal"] for _, e in lapok]
+        if any(b < a for a, b in zip(beolvasott, beolvasott[1:])):
+            sajat.append(f"rossz sorrendben beolvasott oldalak: {', '.join(map(str, beolvasott))}")
+        helyek = [hely for hely, _ in lapok]
+        if helyek[-1] - helyek[0] + 1 != len(helyek):
+            sajat.append("az oldalak között más füzet lapjai is vannak")
+
+        oldalak = {}
+        for _, eredmeny in lapok:
+            oldal = eredmeny["oldal"]["oldal"]
+            if eredmeny["oldal"]["oldalszam"] != oldalszam:
+                sajat.append(f"{eredmeny.get('kep_fajl')}: más oldalszámú füzetből, kimarad")
+            elif oldal in oldalak:
+                sajat.append(f"{oldal}. oldal többször ({eredmeny.get('kep_fajl')}), az elsőt használjuk")
+            else:
+                oldalak[oldal] = eredmeny
+
+        dolgozat = dolgozat_osszefuzese([oldalak[o] for o in sorted(oldalak)], oldalszam, gyakori_kerdesszamok)
+        if dolgozat["hianyzo_oldalak"]:
+            sajat.append(f"hiányzó oldalak: {', '.join(map(str, dolgozat['hianyzo_oldalak']))}")
+        if not dolgozat["folytonos_szamozas"]:
+            sajat.append("a hiányzó oldal kérdésszáma nem ismert, a további oldalak számozása bizonytalan")
+        dolgozat["problemak"] = sajat
+        problemak.extend(f"{sorozat}. füzet ({dolgozat['neptun_kod']}): {p}" for p in sajat)
+        dolgozatok.append(dolgozat)
+    return dolgozatok, problemak
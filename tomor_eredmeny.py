@@ -0,0 +1,369 @@
+"""
+Tömör, tömbökre épülő eredménytároló nagy (több ezer lapos) kötegekhez.
+
+Laponként egy rögzített szélességű rekord kerül egy numpy strukturált tömbbe: a válaszok
+kis egész kódok, a bizonyosság és az időmérések ezredekben tárolt egészek. A
+jelölőnégyzetek geometriája és kitöltési aránya párhuzamos tömbökben van, a lapok
+rekordjai csak a kezdőindexet és a darabszámot tárolják.
+
+Ami nem fér a rögzített szerkezetbe (ritka mezők, eltérő kérdésszám, hosszú Neptun kód),
+laponként egy kis kiegészítő szótárba kerül, így a `json_eredmeny` mindig pontosan
+a kiértékelő mai JSON eredményét adja vissza.
+"""
+import json
+from datetime import datetime
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from geometriaprofil import MAX_FV_VALASZOK
+
+
+# Igaz/Hamis válaszkódok. A feleletválasztós válaszokat változatlanul tároljuk
+# (-2: többszörös, -1: nincs válasz, 0..: A.., a profil max_valaszok értékéig).
+IH_KODOK = {
+    "Nincs válasz": 0,
+    "Igaz": 1,
+    "Hamis": 2,
+    "Hibás (mindkettő bejelölve)": 3,
+    "Nem található négyzet": 4,
+}
+IH_SZOVEGEK = {kod: szoveg for szoveg, kod in IH_KODOK.items()}
+
+# Jelölőnégyzet típuskódok (a debug_checkboxok 7. eleme); a meglévő kódok (IH, FV-A..FV-D) nem változnak
+NEGYZET_TIPUSOK = ["IH"] + [f"FV-{chr(65 + j)}" for j in range(MAX_FV_VALASZOK)]
+NEGYZET_TIPUS_KODOK = {tipus: kod for kod, tipus in enumerate(NEGYZET_TIPUSOK)}
+
+# A mai eredmény kulcsai, amelyeket a rekord tárol; a többi a kiegészítésbe kerül
+ALAP_KULCSOK = ("neptun_kod", "kiertekeles_idopont", "igaz_hamis", "feleletvalasztos", "bizonyossag",
+                "urlap_elteresek", "kep_fajl", "feldolgozasi_ido", "ocr_ido")
+
+NEPTUN_HOSSZ = 12
+IDOPONT_FORMATUM = "%Y-%m-%d %H:%M:%S"
+HIANYZO = -1
+
+
+def rekord_tipus(max_ih: int, max_fv: int) -> np.dtype:
+    """A laponkénti rekord szerkezete adott maximális kérdésszámokkal."""
+    return np.dtype([
+        ("neptun_kod", f"U{NEPTUN_HOSSZ}"),
+        ("idopont", "datetime64[s]"),
+        ("ih_db", np.int8),
+        ("fv_db", np.int8),
+        ("ih", np.int8, (max_ih,)),
+        ("fv", np.int8, (max_fv,)),
+        # Bizonyosság és idők ezredekben; HIANYZO, ha nincs érték
+        ("ih_bizonyossag", np.int16, (max_ih,)),
+        ("fv_bizonyossag", np.int16, (max_fv,)),
+        ("feldolgozasi_ido", np.int32),
+        ("ocr_ido", np.int32),
+        ("negyzet_kezdet", np.int64),
+        ("negyzet_db", np.int16),
+    ])
+
+
+def _ezred(ertek) -> int:
+    """Legfeljebb 3 tizedes értékű szám ezredekben; None vagy pontatlan érték esetén HIANYZO."""
+    if not isinstance(ertek, float):
+        return HIANYZO
+    egesz = int(round(ertek * 1000))
+    if egesz < 0 or egesz / 1000 != ertek:
+        return HIANYZO
+    return egesz
+
+
+class TomorEredmenyek:
+    """Lapok eredményei tömör formában. A tömbök kétszeres növeléssel bővülnek."""
+
+    def __init__(self, kapacitas: int = 1024, max_ih: int = 32, max_fv: int = 32):
+        self.max_ih = max_ih
+        self.max_fv = max_fv
+        self.db = 0
+        self.rekordok = np.zeros(kapacitas, dtype=rekord_tipus(max_ih, max_fv))
+        # Jelölőnégyzetek párhuzamos tömbjei (x, y, w, h), kitöltési arány, bejelölt-e, típuskód
+        self.negyzet_db = 0
+        self.negyzet_geometria = np.zeros((kapacitas * 16, 4), dtype=np.int32)
+        self.negyzet_arany = np.zeros(kapacitas * 16, dtype=np.float32)
+        self.negyzet_bejelolve = np.zeros(kapacitas * 16, dtype=bool)
+        self.negyzet_tipus = np.zeros(kapacitas * 16, dtype=np.int8)
+        # Kis, ritkán kitöltött laponkénti adatok
+        self.kep_fajlok: List[str] = []
+        self.urlap_elteresek: Dict[int, List[str]] = {}
+        self.kiegeszitesek: Dict[int, Dict] = {}
+        # A köteg jelölési küszöbének kalibrációja (kalibracio.kalibralas eredménye), ha volt
+        self.kalibracio: Dict = None
+
+    def __len__(self) -> int:
+        return self.db
+
+    @staticmethod
+    def _bovites(tomb: np.ndarray, min_meret: int) -> np.ndarray:
+        uj = np.zeros((max(min_meret, 2 * len(tomb)),) + tomb.shape[1:], dtype=tomb.dtype)
+        uj[:len(tomb)] = tomb
+        return uj
+
+    def _valaszok_kodolasa(self, valaszok: Dict, bizonyossag: Dict, max_db: int, kodolo) -> Tuple:
+        """Sorszám -> válasz szótár kódolása. None-t ad, ha nem fér a rögzített szerkezetbe."""
+        if not isinstance(valaszok, dict) or not isinstance(bizonyossag, dict):
+            return None
+        if list(valaszok) != list(range(1, len(valaszok) + 1)) or len(valaszok) > max_db:
+            return None
+        if list(bizonyossag) != list(valaszok):
+            return None
+        kodok = []
+        for valasz in valaszok.values():
+            kod = kodolo(valasz)
+            if kod is None:
+                return None
+            kodok.append(kod)
+        ezredek = [_ezred(b) for b in bizonyossag.values()]
+        if HIANYZO in ezredek:
+            return None
+        return kodok, ezredek
+
+    @staticmethod
+    def _ih_kod(valasz):
+        return IH_KODOK.get(valasz) if isinstance(valasz, str) else None
+
+    @staticmethod
+    def _fv_kod(valasz):
+        return valasz if type(valasz) is int and -2 <= valasz < MAX_FV_VALASZOK else None
+
+    def hozzaadas(self, eredmeny: Dict, negyzetek: Sequence[Tuple] = None) -> int:
+        """
+        Egy lap eredményének (a kiértékelő JSON-ja) felvétele, opcionálisan a jelölőnégyzetekkel
+        (`debug_checkboxok`). A lap indexét adja vissza.
+        """
+        if self.db == len(self.rekordok):
+            self.rekordok = self._bovites(self.rekordok, self.db + 1)
+        i = self.db
+        r = self.rekordok[i]
+        kiegeszites = {k: v for k, v in eredmeny.items() if k not in ALAP_KULCSOK}
+        # A kulcsok eredeti sorrendje, ha eltér a megszokottól
+        kulcsok = list(eredmeny)
+        if kulcsok != [k for k in ALAP_KULCSOK + tuple(kiegeszites) if k in eredmeny]:
+            kiegeszites["_kulcsok"] = kulcsok
+        hianyzo = [k for k in ("neptun_kod", "bizonyossag", "urlap_elteresek") if k not in eredmeny]
+        if hianyzo:
+            kiegeszites["_hianyzo"] = hianyzo
+
+        neptun_kod = eredmeny.get("neptun_kod")
+        if isinstance(neptun_kod, str) and 0 < len(neptun_kod) <= NEPTUN_HOSSZ and neptun_kod == neptun_kod.strip("\0"):
+            r["neptun_kod"] = neptun_kod
+        elif "neptun_kod" in eredmeny:
+            kiegeszites["neptun_kod"] = neptun_kod
+
+        idopont = eredmeny.get("kiertekeles_idopont")
+        try:
+            r["idopont"] = np.datetime64(datetime.strptime(idopont, IDOPONT_FORMATUM), "s")
+        except (TypeError, ValueError):
+            r["idopont"] = np.datetime64("NaT")
+            if "kiertekeles_idopont" in eredmeny:
+                kiegeszites["kiertekeles_idopont"] = idopont
+
+        bizonyossag = eredmeny.get("bizonyossag")
+        if not isinstance(bizonyossag, dict) or list(bizonyossag) != ["igaz_hamis", "feleletvalasztos"]:
+            bizonyossag = None
+        for mezo, elotag, max_db, kodolo in (("igaz_hamis", "ih", self.max_ih, self._ih_kod),
+                                             ("feleletvalasztos", "fv", self.max_fv, self._fv_kod)):
+            kodolt = None
+            if mezo in eredmeny and bizonyossag is not None:
+                kodolt = self._valaszok_kodolasa(eredmeny[mezo], bizonyossag[mezo], max_db, kodolo)
+            if kodolt is None:
+                r[f"{elotag}_db"] = HIANYZO
+                if mezo in eredmeny:
+                    kiegeszites[mezo] = eredmeny[mezo]
+                continue
+            kodok, ezredek = kodolt
+            r[f"{elotag}_db"] = len(kodok)
+            r[elotag][:len(kodok)] = kodok
+            r[f"{elotag}_bizonyossag"][:len(kodok)] = ezredek
+        if bizonyossag is None or r["ih_db"] == HIANYZO or r["fv_db"] == HIANYZO:
+            if "bizonyossag" in eredmeny:
+                kiegeszites["bizonyossag"] = eredmeny["bizonyossag"]
+
+        elteresek = eredmeny.get("urlap_elteresek")
+        if isinstance(elteresek, list) and all(isinstance(e, str) for e in elteresek):
+            if elteresek:
+                self.urlap_elteresek[i] = list(elteresek)
+        elif "urlap_elteresek" in eredmeny:
+            kiegeszites["urlap_elteresek"] = elteresek
+
+        kep_fajl = eredmeny.get("kep_fajl")
+        self.kep_fajlok.append(kep_fajl if isinstance(kep_fajl, str) else "")
+        if "kep_fajl" in eredmeny and not self.kep_fajlok[-1]:
+            kiegeszites["kep_fajl"] = kep_fajl
+
+        for mezo in ("feldolgozasi_ido", "ocr_ido"):
+            r[mezo] = _ezred(eredmeny.get(mezo))
+            if mezo in eredmeny and r[mezo] == HIANYZO:
+                kiegeszites[mezo] = eredmeny[mezo]
+
+        self._negyzetek_hozzaadasa(r, negyzetek or [])
+        if kiegeszites:
+            self.kiegeszitesek[i] = kiegeszites
+        self.db += 1
+        return i
+
+    def _negyzetek_hozzaadasa(self, r, negyzetek: Sequence[Tuple]):
+        n = len(negyzetek)
+        vege = self.negyzet_db + n
+        if vege > len(self.negyzet_arany):
+            self.negyzet_geometria = self._bovites(self.negyzet_geometria, vege)
+            self.negyzet_arany = self._bovites(self.negyzet_arany, vege)
+            self.negyzet_bejelolve = self._bovites(self.negyzet_bejelolve, vege)
+            self.negyzet_tipus = self._bovites(self.negyzet_tipus, vege)
+        r["negyzet_kezdet"] = self.negyzet_db
+        r["negyzet_db"] = n
+        for j, (x, y, w, h, bejelolve, arany, tipus) in enumerate(negyzetek, start=self.negyzet_db):
+            self.negyzet_geometria[j] = (x, y, w, h)
+            self.negyzet_arany[j] = arany
+            self.negyzet_bejelolve[j] = bejelolve
+            self.negyzet_tipus[j] = NEGYZET_TIPUS_KODOK[tipus]
+        self.negyzet_db = vege
+
+    def negyzetek(self, i: int) -> List[Tuple]:
+        """Az i. lap jelölőnégyzetei a `debug_checkboxok` formájában (az arány float32 pontosságú)."""
+        r = self.rekordok[i]
+        tol = int(r["negyzet_kezdet"])
+        ig = tol + int(r["negyzet_db"])
+        return [(*map(int, self.negyzet_geometria[j]), bool(self.negyzet_bejelolve[j]),
+                 float(self.negyzet_arany[j]), NEGYZET_TIPUSOK[self.negyzet_tipus[j]]) for j in range(tol, ig)]
+
+    def json_eredmeny(self, i: int) -> Dict:
+        """Az i. lap eredménye pontosan abban a formában, ahogy a kiértékelő adta."""
+        if not 0 <= i < self.db:
+            raise IndexError(i)
+        r = self.rekordok[i]
+        kiegeszites = self.kiegeszitesek.get(i, {})
+        eredmeny = {}
+
+        eredmeny["neptun_kod"] = kiegeszites.get("neptun_kod", str(r["neptun_kod"]))
+        if np.isnat(r["idopont"]):
+            if "kiertekeles_idopont" in kiegeszites:
+                eredmeny["kiertekeles_idopont"] = kiegeszites["kiertekeles_idopont"]
+        else:
+            eredmeny["kiertekeles_idopont"] = r["idopont"].astype(datetime).strftime(IDOPONT_FORMATUM)
+
+        bizonyossag = {}
+        for mezo, elotag, dekodolo in (("igaz_hamis", "ih", IH_SZOVEGEK.__getitem__), ("feleletvalasztos", "fv", int)):
+            db = int(r[f"{elotag}_db"])
+            if db == HIANYZO:
+                if mezo in kiegeszites:
+                    eredmeny[mezo] = kiegeszites[mezo]
+                continue
+            eredmeny[mezo] = {k + 1: dekodolo(int(r[elotag][k])) for k in range(db)}
+            bizonyossag[mezo] = {k + 1: int(r[f"{elotag}_bizonyossag"][k]) / 1000 for k in range(db)}
+        if "bizonyossag" in kiegeszites:
+            eredmeny["bizonyossag"] = kiegeszites["bizonyossag"]
+        else:
+            eredmeny["bizonyossag"] = bizonyossag
+
+        if "urlap_elteresek" in kiegeszites:
+            eredmeny["urlap_elteresek"] = kiegeszites["urlap_elteresek"]
+        else:
+            eredmeny["urlap_elteresek"] = list(self.urlap_elteresek.get(i, []))
+
+        if "kep_fajl" in kiegeszites:
+            eredmeny["kep_fajl"] = kiegeszites["kep_fajl"]
+        elif self.kep_fajlok[i]:
+            eredmeny["kep_fajl"] = self.kep_fajlok[i]
+        for mezo in ("feldolgozasi_ido", "ocr_ido"):
+            if mezo in kiegeszites:
+                eredmeny[mezo] = kiegeszites[mezo]
+            elif r[mezo] != HIANYZO:
+                eredmeny[mezo] = int(r[mezo]) / 1000
+
+        for kulcs, ertek in kiegeszites.items():
+            if kulcs not in ALAP_KULCSOK and not kulcs.startswith("_"):
+                eredmeny[kulcs] = ertek
+        for kulcs in kiegeszites.get("_hianyzo", []):
+            del eredmeny[kulcs]
+        if "_kulcsok" in kiegeszites:
+            eredmeny = {k: eredmeny[k] for k in kiegeszites["_kulcsok"]}
+        return eredmeny
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(self.db):
+            yield self.json_eredmeny(i)
+
+    def hasznalt_rekordok(self) -> np.ndarray:
+        return self.rekordok[:self.db]
+
+    def pontszamok(self, javitokulcs: Dict) -> Tuple[np.ndarray, int]:
+        """
+        Minden lap pontszáma a javítókulcshoz (megoldólap eredménye) képest, vektorizáltan.
+        Ugyanaz a szabály, mint a felület pontozásánál: kérdésenként 1 pont az egyező válaszért.
+        """
+        r = self.hasznalt_rekordok()
+        pont = np.zeros(self.db, dtype=np.int32)
+        max_pont = 0
+        for mezo, elotag, kodolo, max_db in (("igaz_hamis", "ih", self._ih_kod, self.max_ih),
+                                             ("feleletvalasztos", "fv", self._fv_kod, self.max_fv)):
+            for sorszam, helyes in javitokulcs.get(mezo, {}).items():
+                max_pont += 1
+                kod = kodolo(helyes)
+                if kod is None or not 1 <= sorszam <= max_db:
+                    continue
+                van = r[f"{elotag}_db"] >= sorszam
+                pont += (van & (r[elotag][:, sorszam - 1] == kod)).astype(np.int32)
+        # A rögzített szerkezetbe nem férő lapok a szótáras úton pontozódnak
+        for i in self.kiegeszitesek:
+            if "igaz_hamis" in self.kiegeszitesek[i] or "feleletvalasztos" in self.kiegeszitesek[i]:
+                eredmeny = self.json_eredmeny(i)
+                pont[i] = sum(
+                    1 for mezo in ("igaz_hamis", "feleletvalasztos")
+                    for k, helyes in javitokulcs.get(mezo, {}).items()
+                    if k in eredmeny.get(mezo, {}) and eredmeny[mezo][k] == helyes)
+        return pont, max_pont
+
+    def mentes(self, utvonal: str):
+        """Mentés egyetlen .npz fájlba (a ritka adatok JSON-ként kerülnek mellé)."""
+        ritka = {
+            "max_ih": self.max_ih,
+            "max_fv": self.max_fv,
+            "kep_fajlok": self.kep_fajlok,
+            "urlap_elteresek": {str(i): e for i, e in self.urlap_elteresek.items()},
+            "kiegeszitesek": {str(i): k for i, k in self.kiegeszitesek.items()},
+            "kalibracio": self.kalibracio,
+        }
+        np.savez_compressed(
+            utvonal,
+            rekordok=self.hasznalt_rekordok(),
+            negyzet_geometria=self.negyzet_geometria[:self.negyzet_db],
+            negyzet_arany=self.negyzet_arany[:self.negyzet_db],
+            negyzet_bejelolve=self.negyzet_bejelolve[:self.negyzet_db],
+            negyzet_tipus=self.negyzet_tipus[:self.negyzet_db],
+            ritka=np.frombuffer(json.dumps(ritka, ensure_ascii=False).encode("utf-8"), dtype=np.uint8),
+        )
+
+    @classmethod
+    def betoltes(cls, utvonal: str) -> "TomorEredmenyek":
+        with np.load(utvonal) as adat:
+            ritka = json.loads(adat["ritka"].tobytes().decode("utf-8"))
+            tomor = cls(kapacitas=max(1, len(adat["rekordok"])), max_ih=ritka["max_ih"], max_fv=ritka["max_fv"])
+            tomor.db = len(adat["rekordok"])
+            tomor.rekordok[:tomor.db] = adat["rekordok"]
+            tomor.negyzet_db = len(adat["negyzet_arany"])
+            tomor.negyzet_geometria = adat["negyzet_geometria"].copy()
+            tomor.negyzet_arany = adat["negyzet_arany"].copy()
+            tomor.negyzet_bejelolve = adat["negyzet_bejelolve"].copy()
+            tomor.negyzet_tipus = adat["negyzet_tipus"].copy()
+        tomor.kep_fajlok = ritka["kep_fajlok"]
+        tomor.urlap_elteresek = {int(i): e for i, e in ritka["urlap_elteresek"].items()}
+        # A JSON a sorszám kulcsokat szöveggé alakítja: a válaszszótárakat visszaalakítjuk
+        tomor.kiegeszitesek = {int(i): _egesz_kulcsok(k) for i, k in ritka["kiegeszitesek"].items()}
+        tomor.kalibracio = ritka.get("kalibracio")
+        return tomor
+
+
+def _egesz_kulcsok(kiegeszites: Dict) -> Dict:
+    for mezo in ("igaz_hamis", "feleletvalasztos"):
+        if isinstance(kiegeszites.get(mezo), dict):
+            kiegeszites[mezo] = {int(k) if k.lstrip("-").isdigit() else k: v for k, v in kiegeszites[mezo].items()}
+    if isinstance(kiegeszites.get("bizonyossag"), dict):
+        kiegeszites["bizonyossag"] = {
+            mezo: {int(k) if k.lstrip("-").isdigit() else k: v for k, v in ertekek.items()}
+            if isinstance(ertekek, dict) else ertekek
+            for mezo, ertekek in kiegeszites["bizonyossag"].items()}
+    return kiegeszites
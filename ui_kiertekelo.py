@@ -1,12 +1,14 @@
+import argparse
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from PIL import Image, ImageTk
-import cv2
 import os
 import json
 import traceback
 from datetime import datetime
-from kiertekelo import TesztlapKiertekelo
+from statisztika import Eredmenystatisztika, eredmenyfajlok, osszevetes
+# A kiértékelő (cv2, numpy) és a pytesseract csak az első kiértékeléskor töltődik be,
+# így az ablak azonnal megjelenik
 
 class TesztlapKiertekeloUI:
     def __init__(self, root):
@@ -19,6 +21,9 @@ class TesztlapKiertekeloUI:
         self.eredmeny = None
         self.javitokulcs_eredmeny = None
         self.kiertekelo = None
+        # A kiértékelt lapok statisztikája; a megoldólap cseréjekor újraindul
+        self.statisztika = Eredmenystatisztika()
+        self.statisztika_megoldolap = None
 
         self.setup_ui()
 
@@ -70,6 +75,8 @@ class TesztlapKiertekeloUI:
         self.save_button = ttk.Button(button_frame, text="Eredmény mentése", command=self.mentes_eredmeny, state=tk.DISABLED)
         self.save_button.pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Debug kép megnyitása", command=self.megnyit_debug_kepet).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Ellenőrzési sor...", command=self.megnyit_ellenorzesi_sort).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Statisztika...", command=self.megnyit_statisztikat).pack(side=tk.LEFT, padx=5)
 
 
         content_frame = ttk.Frame(main_frame)
@@ -143,23 +150,35 @@ class TesztlapKiertekeloUI:
             self.root.update()
 
 
-            self.kiertekelo = TesztlapKiertekelo(self.kep_utvonal, self.tesseract_path_var.get(), zajszures=self.zajszures_var.get())
-            self.eredmeny = self.kiertekelo.teljes_kiertekeles(debug=self.debug_var.get(), perspektiva=self.perspektiva_var.get())
-            self.kiertekelo.debug_kep_mentese("debug_output.png")
-
+            from kiertekelo import TesztlapKiertekelo
 
+            # A megoldólapot értékeljük ki először: az űrlapmodelljét a tesztlap ellenőrzéséhez használjuk
+            urlapmodell = None
             if self.megoldolap_utvonal:
                 kiertekelo_j = TesztlapKiertekelo(self.megoldolap_utvonal, self.tesseract_path_var.get(), zajszures=self.zajszures_var.get())
                 self.javitokulcs_eredmeny = kiertekelo_j.teljes_kiertekeles(debug=False, perspektiva=self.perspektiva_var.get())
+                urlapmodell = kiertekelo_j.urlapmodell
             else:
                 self.javitokulcs_eredmeny = None
 
 
+            self.kiertekelo = TesztlapKiertekelo(self.kep_utvonal, self.tesseract_path_var.get(), zajszures=self.zajszures_var.get())
+            self.eredmeny = self.kiertekelo.teljes_kiertekeles(debug=self.debug_var.get(), perspektiva=self.perspektiva_var.get(),
+                                                               urlapmodell=urlapmodell)
+            self.kiertekelo.debug_kep_mentese("debug_output.png")
+
+
             self.megjelenitni_eredmeny()
 
             self.betolt_debug_kepet("debug_output.png")
             self.save_button.config(state=tk.NORMAL)
             self.status_var.set("Kiértékelés befejezve")
+            if self.javitokulcs_eredmeny:
+                if self.statisztika_megoldolap != self.megoldolap_utvonal:
+                    self.statisztika = Eredmenystatisztika()
+                    self.statisztika_megoldolap = self.megoldolap_utvonal
+                self.statisztika.hozzaadas(osszevetes(self.eredmeny, self.javitokulcs_eredmeny))
+                self.status_var.set(f"Kiértékelés befejezve (statisztika: {len(self.statisztika)} lap)")
 
         except Exception as e:
             messagebox.showerror("Hiba", f"Hiba történt: {str(e)}")
@@ -174,6 +193,13 @@ class TesztlapKiertekeloUI:
         self.eredmeny_text.insert(tk.END,f"Neptun kód: {self.eredmeny.get('neptun_kod','N/A')}\n")
         self.eredmeny_text.insert(tk.END,f"Kiértékelés időpontja: {self.eredmeny.get('kiertekeles_idopont','N/A')}\n\n")
 
+        elteresek = self.eredmeny.get("urlap_elteresek", [])
+        if elteresek:
+            self.eredmeny_text.insert(tk.END,"Eltérések a megoldólap űrlapjától:\n")
+            for elteres in elteresek:
+                self.eredmeny_text.insert(tk.END,f"   {elteres}\n")
+            self.eredmeny_text.insert(tk.END,"\n")
+
 
         self.eredmeny_text.insert(tk.END,"Igaz/Hamis kérdések:\n"+"-"*60+"\n")
         for k,v in sorted(self.eredmeny["igaz_hamis"].items()):
@@ -199,26 +225,16 @@ class TesztlapKiertekeloUI:
 
         self.eredmeny_text.insert(tk.END,"\n"+"="*60+"\n")
 
-        pont, max_pont = self.pontozas(self.eredmeny, self.javitokulcs_eredmeny)
-        self.eredmeny_text.insert(tk.END, f"\nÖsszpontszám: {pont} / {max_pont}\n")
+        # Megoldólap nélkül nincs mihez pontozni
+        if self.javitokulcs_eredmeny:
+            pont, max_pont = self.pontozas(self.eredmeny, self.javitokulcs_eredmeny)
+            self.eredmeny_text.insert(tk.END, f"\nÖsszpontszám: {pont} / {max_pont}\n")
 
 
     def pontozas(self, kitoltott, javitokulcs):
-        pont = 0
-        max_pont = 0
-
-
-        for k, helyes in javitokulcs["igaz_hamis"].items():
-            max_pont += 1
-            if k in kitoltott["igaz_hamis"] and kitoltott["igaz_hamis"][k] == helyes:
-                pont += 1
-
-        for k, helyes_index in javitokulcs["feleletvalasztos"].items():
-            max_pont += 1
-            if k in kitoltott["feleletvalasztos"] and kitoltott["feleletvalasztos"][k] == helyes_index:
-                pont += 1
-
-        return pont, max_pont
+        # A kérdésenkénti összevetés a statisztikában is ugyanez (statisztika.osszevetes)
+        osszevetett = osszevetes(kitoltott, javitokulcs)
+        return osszevetett["pont"], osszevetett["max_pont"]
 
     def betolt_debug_kepet(self, kep_utvonal):
         if not os.path.exists(kep_utvonal):
@@ -237,6 +253,23 @@ class TesztlapKiertekeloUI:
             messagebox.showwarning("Figyelmeztetés","Debug kép nem található!")
 
 
+    def megnyit_ellenorzesi_sort(self):
+        mappa = filedialog.askdirectory(title="Ellenőrzési sor mappája")
+        if not mappa:
+            return
+        from attekintes import EllenorzesiSor
+        tetelek = EllenorzesiSor.betoltes(mappa)
+        if not tetelek:
+            messagebox.showinfo("Ellenőrzési sor", "A sor üres (nincs index.jsonl vagy nincs tétel).")
+            return
+        EllenorzesiSorAblak(self.root, mappa, tetelek)
+        self.status_var.set(f"Ellenőrzési sor: {len(tetelek)} tétel")
+
+
+    def megnyit_statisztikat(self):
+        StatisztikaAblak(self.root, self)
+
+
     def mentes_eredmeny(self):
         if not self.eredmeny:
             messagebox.showwarning("Figyelmeztetés","Nincs kiértékelt eredmény!")
@@ -265,9 +298,115 @@ class TesztlapKiertekeloUI:
         except Exception as e:
             messagebox.showerror("Hiba", f"Hiba történt a mentés során:\n{str(e)}")
 
+class EllenorzesiSorAblak:
+    """A kézi ellenőrzési sor lapozója: egyszerre csak az aktuális kis kivágást tölti be."""
+
+    def __init__(self, szulo, mappa, tetelek):
+        self.mappa = mappa
+        self.tetelek = tetelek
+        self.index = 0
+
+        self.ablak = tk.Toplevel(szulo)
+        self.ablak.title(f"Ellenőrzési sor - {mappa}")
+        self.info_var = tk.StringVar()
+        ttk.Label(self.ablak, textvariable=self.info_var, padding="10").pack(fill=tk.X)
+        self.kep_label = ttk.Label(self.ablak, padding="10")
+        self.kep_label.pack()
+
+        gombok = ttk.Frame(self.ablak, padding="10")
+        gombok.pack()
+        ttk.Button(gombok, text="< Előző", command=lambda: self.lapozas(-1)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(gombok, text="Következő >", command=lambda: self.lapozas(1)).pack(side=tk.LEFT, padx=5)
+        self.ablak.bind("<Left>", lambda e: self.lapozas(-1))
+        self.ablak.bind("<Right>", lambda e: self.lapozas(1))
+
+        self.megjelenites()
+
+    def lapozas(self, irany):
+        self.index = max(0, min(len(self.tetelek) - 1, self.index + irany))
+        self.megjelenites()
+
+    def megjelenites(self):
+        tetel = self.tetelek[self.index]
+        self.info_var.set(f"{self.index + 1} / {len(self.tetelek)}   {os.path.basename(tetel['kep_fajl'] or '')}   "
+                          f"Neptun: {tetel['neptun_kod']}   {tetel['tipus']} {tetel['kerdes']}. kérdés: "
+                          f"{tetel['valasz']}   ({tetel['ok']}, bizonyosság: {tetel['bizonyossag']})")
+        utvonal = os.path.join(self.mappa, tetel["kivagas"])
+        if not os.path.exists(utvonal):
+            self.kep_label.configure(image="", text="A kivágás nem található")
+            return
+        img = Image.open(utvonal)
+        # A kivágások kicsik: a jobb olvashatóságért kétszeresre nagyítjuk
+        img = img.resize((img.width * 2, img.height * 2), Image.NEAREST)
+        self.photo = ImageTk.PhotoImage(img)
+        self.kep_label.configure(image=self.photo, text="")
+
+
+class StatisztikaAblak:
+    """A kiértékelt lapok összesítése (statisztika.py); mentett eredmények mappájával bővíthető."""
+
+    def __init__(self, szulo, app):
+        self.app = app
+
+        self.ablak = tk.Toplevel(szulo)
+        self.ablak.title("Statisztika")
+        self.ablak.geometry("800x700")
+        gombok = ttk.Frame(self.ablak, padding="10")
+        gombok.pack(fill=tk.X)
+        ttk.Button(gombok, text="Mappa hozzáadása...", command=self.mappa_hozzaadasa).pack(side=tk.LEFT, padx=5)
+        ttk.Button(gombok, text="Mentés...", command=self.mentes).pack(side=tk.LEFT, padx=5)
+        ttk.Button(gombok, text="Nullázás", command=self.nullazas).pack(side=tk.LEFT, padx=5)
+        self.szoveg = scrolledtext.ScrolledText(self.ablak, wrap=tk.NONE, font=("Courier", 10))
+        self.szoveg.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+
+        self.megjelenites()
+
+    def megjelenites(self):
+        self.szoveg.delete(1.0, tk.END)
+        self.szoveg.insert(tk.END, self.app.statisztika.jelentes())
+
+    def mappa_hozzaadasa(self):
+        mappa = filedialog.askdirectory(title="Mentett eredmények mappája")
+        if not mappa:
+            return
+        # A felület mentéseiben benne van a javítókulcs; a többihez az aktuális megoldólap kell
+        kihagyott = 0
+        for _, kitoltott, kulcs in eredmenyfajlok(mappa, self.app.javitokulcs_eredmeny):
+            if kulcs is None:
+                kihagyott += 1
+                continue
+            self.app.statisztika.hozzaadas(osszevetes(kitoltott, kulcs))
+        if kihagyott:
+            messagebox.showwarning("Statisztika", f"{kihagyott} eredmény kimaradt: nincs hozzá megoldólap.")
+        self.megjelenites()
+
+    def mentes(self):
+        utvonal = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")])
+        if utvonal:
+            self.app.statisztika.mentes(utvonal)
+
+    def nullazas(self):
+        self.app.statisztika = Eredmenystatisztika()
+        self.megjelenites()
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Tesztlap kiértékelő grafikus felület")
+    parser.add_argument("--kep", default=None, help="Előre kiválasztott tesztlap kép")
+    parser.add_argument("--megoldolap", default=None, help="Előre kiválasztott megoldólap kép")
+    parser.add_argument("--tesseract-path", default=None, help="A tesseract program útvonala")
+    args = parser.parse_args()
+
     root = tk.Tk()
     app = TesztlapKiertekeloUI(root)
+    if args.kep:
+        app.kep_path_var.set(args.kep)
+        app.kep_utvonal = args.kep
+    if args.megoldolap:
+        app.megoldolap_path_var.set(args.megoldolap)
+        app.megoldolap_utvonal = args.megoldolap
+    if args.tesseract_path:
+        app.tesseract_path_var.set(args.tesseract_path)
     root.mainloop()
 
 if __name__=="__main__":
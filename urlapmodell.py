@@ -0,0 +1,70 @@
+import json
+from typing import List, Tuple, Dict
+
+
+class Urlapmodell:
+    """
+    Előre lefordított űrlapmodell: a kérdések sorrendje, típusa és a várt
+    jelölőnégyzetek száma. Egy kötegben az első sikeresen kiértékelt lapból
+    (vagy a megoldólapból) készül, a további lapokat ehhez ellenőrizzük.
+    """
+
+    VART_NEGYZETEK = {"IH": 2, "FV": 4}
+
+    def __init__(self, kerdesek: List[Dict]):
+        # Minden kérdés: {"tipus": "IH"/"FV", "sorszam": típuson belüli sorszám, "negyzetek": várt darabszám}
+        self.kerdesek = kerdesek
+
+    @classmethod
+    def keretekbol(cls, tipusok: List[str], fv_negyzetek: int = None) -> "Urlapmodell":
+        """
+        Modell készítése a keretek (y szerint rendezett) típuslistájából. Az `fv_negyzetek` a
+        feleletválasztós kérdések válaszainak száma (a geometriai profilból), alapértelmezés: 4.
+        """
+        vart = dict(cls.VART_NEGYZETEK)
+        if fv_negyzetek is not None:
+            vart["FV"] = fv_negyzetek
+        kerdesek = []
+        szamlalok = {"IH": 0, "FV": 0}
+        for tipus in tipusok:
+            szamlalok[tipus] += 1
+            kerdesek.append({
+                "tipus": tipus,
+                "sorszam": szamlalok[tipus],
+                "negyzetek": vart[tipus]
+            })
+        return cls(kerdesek)
+
+    def ellenorzes(self, tipusok: List[str]) -> List[str]:
+        """A lapon talált keretek típuslistájának összevetése a modellel. Az eltérések listáját adja vissza."""
+        elteresek = []
+        if len(tipusok) != len(self.kerdesek):
+            elteresek.append(f"Keretek száma eltér: várt {len(self.kerdesek)}, talált {len(tipusok)}")
+        for i, (kerdes, tipus) in enumerate(zip(self.kerdesek, tipusok)):
+            if kerdes["tipus"] != tipus:
+                elteresek.append(f"{i + 1}. keret típusa eltér: várt {kerdes['tipus']}, talált {tipus}")
+        return elteresek
+
+    def illeszkedik(self, keretek_szama: int) -> bool:
+        """A modell csak akkor alkalmazható egy lapra, ha a keretek száma megegyezik."""
+        return keretek_szama == len(self.kerdesek)
+
+    def kiosztas(self) -> List[Tuple[str, int, int]]:
+        """(típus, sorszám, várt négyzetszám) hármasok a keretek sorrendjében."""
+        return [(k["tipus"], k["sorszam"], k["negyzetek"]) for k in self.kerdesek]
+
+    def to_dict(self) -> Dict:
+        return {"verzio": 1, "kerdesek": self.kerdesek}
+
+    @classmethod
+    def from_dict(cls, adat: Dict) -> "Urlapmodell":
+        return cls(adat["kerdesek"])
+
+    def mentes(self, utvonal: str):
+        with open(utvonal, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=4)
+
+    @classmethod
+    def betoltes(cls, utvonal: str) -> "Urlapmodell":
+        with open(utvonal, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))